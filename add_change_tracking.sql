@@ -0,0 +1,35 @@
+-- AI Baba Admin System - Change tracking migration
+-- Run this SQL in your Supabase SQL Editor after create_table.sql
+-- Lets the wisdom search index sync only rows changed or deleted since its last run
+
+-- 1. Fetch rows in (updated_at, id) order from a watermark
+CREATE INDEX IF NOT EXISTS idx_advice_updated_at ON advice_dataset (updated_at, id);
+
+-- 2. Log of deleted ids, filled by a trigger so every delete path is covered
+CREATE TABLE IF NOT EXISTS advice_dataset_deletions (
+    id BIGINT PRIMARY KEY,
+    deleted_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW())
+);
+CREATE INDEX IF NOT EXISTS idx_advice_deletions_at ON advice_dataset_deletions (deleted_at, id);
+
+-- SECURITY DEFINER so the log is written whatever policies the deleting role has
+CREATE OR REPLACE FUNCTION log_advice_dataset_deletion() RETURNS trigger
+SECURITY DEFINER SET search_path = public AS $$
+BEGIN
+    INSERT INTO advice_dataset_deletions (id) VALUES (OLD.id)
+    ON CONFLICT (id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_advice_dataset_deletions ON advice_dataset;
+CREATE TRIGGER trg_advice_dataset_deletions AFTER DELETE ON advice_dataset
+    FOR EACH ROW EXECUTE FUNCTION log_advice_dataset_deletion();
+
+-- 3. Read-only for clients, like advice_dataset under fix_rls_issue.sql
+ALTER TABLE public.advice_dataset_deletions ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS advice_deletions_select ON public.advice_dataset_deletions;
+CREATE POLICY advice_deletions_select ON public.advice_dataset_deletions
+    FOR SELECT
+    TO authenticated
+    USING (true);
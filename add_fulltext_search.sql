@@ -0,0 +1,47 @@
+-- AI Baba Admin System - Full-text search migration
+-- Run this SQL in your Supabase SQL Editor after create_table.sql
+-- Adds a generated tsvector column with a GIN index and a ranked search function
+
+-- 1. Generated search vector (information weighted above original_text).
+--    original_text is capped so very long transcripts stay under the tsvector size limit.
+ALTER TABLE advice_dataset
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(information, '')), 'A') ||
+        setweight(to_tsvector('english', left(coalesce(original_text, ''), 200000)), 'B')
+    ) STORED;
+
+-- 2. GIN index for the search vector
+CREATE INDEX IF NOT EXISTS idx_advice_search_vector ON advice_dataset USING GIN (search_vector);
+
+-- 3. Ranked search, callable through PostgREST as rpc('search_advice', ...)
+CREATE OR REPLACE FUNCTION search_advice(search_query TEXT, max_results INT DEFAULT 20)
+RETURNS TABLE (
+    id INT,
+    category TEXT,
+    subcategories TEXT,
+    information TEXT,
+    original_text TEXT,
+    confidence_score FLOAT,
+    processing_metadata JSONB,
+    admin_confirmed BOOLEAN,
+    created_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE,
+    rank REAL
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT a.id, a.category, a.subcategories, a.information, a.original_text,
+           a.confidence_score, a.processing_metadata, a.admin_confirmed,
+           a.created_at, a.updated_at,
+           ts_rank(a.search_vector, q) AS rank
+    FROM advice_dataset a, websearch_to_tsquery('english', search_query) q
+    WHERE a.search_vector @@ q
+    ORDER BY rank DESC, a.id DESC
+    LIMIT max_results;
+$$;
+
+GRANT EXECUTE ON FUNCTION search_advice(TEXT, INT) TO anon, authenticated, service_role;
+
+-- Verify the index exists
+SELECT indexname FROM pg_indexes WHERE tablename = 'advice_dataset' AND indexname = 'idx_advice_search_vector';
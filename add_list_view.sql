@@ -0,0 +1,37 @@
+-- AI Baba Admin System - List view migration
+-- Run this SQL in your Supabase SQL Editor after add_fulltext_search.sql
+-- Lets admin tables fetch a short preview instead of whole transcripts
+
+-- 1. Computed field: PostgREST exposes this as a virtual 'preview' column,
+--    so select('id,category,preview') returns 200 characters instead of the full text
+CREATE OR REPLACE FUNCTION preview(advice_dataset)
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE
+AS $$
+    SELECT left($1.information, 200);
+$$;
+
+-- 2. Ranked search returning list-view rows only
+CREATE OR REPLACE FUNCTION search_advice_preview(search_query TEXT, max_results INT DEFAULT 20)
+RETURNS TABLE (
+    id INT,
+    category TEXT,
+    subcategories TEXT,
+    admin_confirmed BOOLEAN,
+    created_at TIMESTAMP WITH TIME ZONE,
+    preview TEXT,
+    rank REAL
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT a.id, a.category, a.subcategories, a.admin_confirmed, a.created_at,
+           left(a.information, 200) AS preview,
+           ts_rank(a.search_vector, q) AS rank
+    FROM advice_dataset a, websearch_to_tsquery('english', search_query) q
+    WHERE a.search_vector @@ q
+    ORDER BY rank DESC, a.id DESC
+    LIMIT max_results;
+$$;
+
+GRANT EXECUTE ON FUNCTION preview(advice_dataset) TO anon, authenticated, service_role;
+GRANT EXECUTE ON FUNCTION search_advice_preview(TEXT, INT) TO anon, authenticated, service_role;
@@ -0,0 +1,12 @@
+-- AI Baba Admin System - Transcript passage migration
+-- Run this SQL in your Supabase SQL Editor to store YouTube transcripts as
+-- timestamped passages (one row each) linked by their video id
+
+-- 1. Passage columns (NULL for ordinary text entries)
+ALTER TABLE advice_dataset ADD COLUMN IF NOT EXISTS source_video_id TEXT;
+ALTER TABLE advice_dataset ADD COLUMN IF NOT EXISTS passage_index INT;
+ALTER TABLE advice_dataset ADD COLUMN IF NOT EXISTS start_seconds FLOAT;
+ALTER TABLE advice_dataset ADD COLUMN IF NOT EXISTS end_seconds FLOAT;
+
+-- 2. Fetch or replace all passages of a video in order
+CREATE INDEX IF NOT EXISTS idx_advice_source_video ON advice_dataset (source_video_id, passage_index);
@@ -2,6 +2,8 @@ import streamlit as st
 from datetime import datetime
 import sys
 import os
+import shutil
+import tempfile
 from typing import Dict, List, Optional
 
 # Add paths for our admin system imports
@@ -12,10 +14,16 @@ try:
     from utils.text_processor import TextProcessor
     from models.text_classifier import TextClassifier
     from admin_system.database import DatabaseManager
+    from admin_system.write_queue import get_write_queue
     from utils.categories import get_all_categories, get_all_subcategories, CATEGORIES_STRUCTURE
     from config.supabase_config import test_connection
     # Import YouTubeTranscriber for video processing
     from utils.youtube_transcriber import YouTubeTranscriber
+    from utils.asr_models import get_asr_registry
+    from utils.transcription_jobs import get_job_manager
+    from utils.playlist_ingest import expand_source_url, get_playlist_ingestor
+    from utils.local_media import expand_local_path, MEDIA_EXTENSIONS
+    from models.wisdom_retriever import get_wisdom_retriever
     ADMIN_SYSTEM_AVAILABLE = True
 except ImportError as e:
     print(f"Admin system components not available: {e}")
@@ -87,16 +95,31 @@ def show_user_interface():
         with col_btn1:
             if st.button("🔮 Seek Wisdom", type="primary"):
                 if user_problem:
-                    st.info("🧙‍♂️ AI Baba is contemplating your question...")
-                    # Placeholder for chatbot response logic
-                    st.success("Feature will be implemented soon!")
+                    with st.spinner("🧙‍♂️ AI Baba is contemplating your question..."):
+                        st.session_state.wisdom_response = seek_wisdom(user_problem)
                 else:
                     st.warning("Please share your problem first!")
         
         with col_btn2:
             if st.button("🗑️ Clear"):
+                st.session_state.pop('wisdom_response', None)
                 st.rerun()
         
+        # Retrieved wisdom for the last question
+        wisdom = st.session_state.get('wisdom_response')
+        if wisdom:
+            st.markdown("---")
+            st.subheader("🔮 AI Baba's Wisdom")
+            if not wisdom['success']:
+                st.error(f"❌ {wisdom['message']}")
+            elif not wisdom['passages']:
+                st.info("AI Baba has no wisdom on this yet. Try describing your situation differently.")
+            else:
+                st.caption(wisdom['message'])
+                for i, passage in enumerate(wisdom['passages'], 1):
+                    st.markdown(f"**{i}. {passage['category']}** · relevance {passage['score']:.2f}")
+                    st.info(passage['information'])
+        
         # Conversation history placeholder
         st.markdown("---")
         st.subheader("📜 Conversation History")
@@ -123,6 +146,22 @@ def show_user_interface():
             value="😐 Neutral"
         )
 
+def seek_wisdom(user_problem: str, top_k: int = 3) -> Dict:
+    """Retrieve the passages closest to the user's problem within its likely categories, building the index on first use"""
+    if not ADMIN_SYSTEM_AVAILABLE:
+        return {'success': False, 'message': "Wisdom retrieval is not available", 'passages': []}
+    
+    retriever = get_wisdom_retriever()
+    if not retriever.is_ready():
+        success, message, _ = retriever.build()
+        if not success:
+            return {'success': False, 'message': message, 'passages': []}
+    # Keep the index in step with admin edits from here on
+    retriever.start_auto_sync()
+    
+    success, message, passages = retriever.routed_search(user_problem, k=top_k)
+    return {'success': success, 'message': message, 'passages': passages}
+
 def show_admin_interface():
     """Display the enhanced admin interface panel"""
     st.title("⚙️ AI Baba Admin Control Panel")
@@ -306,7 +345,7 @@ def show_data_collection_interface():
     # Input method selection
     input_method = st.radio(
         "Select input method:",
-        ["Text Input", "YouTube Video"],
+        ["Text Input", "YouTube Video", "YouTube Playlist / Channel", "Local Audio / Video"],
         horizontal=True
     )
     
@@ -332,16 +371,68 @@ def show_data_collection_interface():
             preserve_formatting = st.checkbox("Preserve original formatting", True)
             detect_duplicates = st.checkbox("Check for duplicates", True)
             auto_categorize = st.checkbox("Auto-categorize with AI", True)
+            background_save = st.checkbox("Save in background", False, help="Queue the save and keep working; status appears below")
             
             # Processing button
             process_button = st.button("🚀 Process Text", type="primary")
         
         # Process text when button clicked
         if process_button and input_text.strip():
-            process_admin_text_workflow(input_text, components, preserve_formatting, detect_duplicates, auto_categorize)
+            process_admin_text_workflow(input_text, components, preserve_formatting, detect_duplicates, auto_categorize, background_save)
         elif process_button:
             st.error("⚠️ Please enter some text to process")
     
+    elif input_method == "YouTube Playlist / Channel":
+        source_url = st.text_input(
+            "Enter YouTube playlist or channel URL:",
+            placeholder="https://www.youtube.com/playlist?list=... or https://www.youtube.com/@channel"
+        )
+        
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            preserve_formatting = st.checkbox("Preserve original formatting", True)
+            detect_duplicates = st.checkbox("Check for duplicates", True)
+            auto_categorize = st.checkbox("Auto-categorize with AI", True)
+            background_save = st.checkbox("Save in background", True, help="Queue each save so the next video starts processing immediately")
+            max_videos = st.number_input("Maximum videos", min_value=1, max_value=500, value=20)
+        
+        with col2:
+            process_source_button = st.button("📚 Process All Videos", type="primary")
+        
+        if process_source_button and source_url.strip():
+            process_youtube_source(source_url, int(max_videos), components, preserve_formatting, detect_duplicates, auto_categorize, background_save)
+        elif process_source_button:
+            st.error("⚠️ Please enter a playlist or channel URL")
+    
+    elif input_method == "Local Audio / Video":
+        local_path = st.text_input(
+            "File or folder on the server:",
+            placeholder="/data/lectures or /data/lectures/talk.mp3"
+        )
+        uploaded_files = st.file_uploader(
+            "...or upload files:",
+            type=[ext.lstrip('.') for ext in MEDIA_EXTENSIONS],
+            accept_multiple_files=True
+        )
+        
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            preserve_formatting = st.checkbox("Preserve original formatting", True)
+            detect_duplicates = st.checkbox("Check for duplicates", True)
+            auto_categorize = st.checkbox("Auto-categorize with AI", True)
+            background_save = st.checkbox("Save in background", True, help="Queue each save so the next file starts processing immediately")
+            include_subfolders = st.checkbox("Include subfolders", True)
+        
+        with col2:
+            process_local_button = st.button("🎧 Process Files", type="primary")
+        
+        if process_local_button and (local_path.strip() or uploaded_files):
+            process_local_media(local_path, uploaded_files, include_subfolders, components, preserve_formatting, detect_duplicates, auto_categorize, background_save)
+        elif process_local_button:
+            st.error("⚠️ Please enter a path or upload files")
+    
     else:  # YouTube Video input method
         # Create a styled container for the entire YouTube section
         st.markdown("""
@@ -365,13 +456,29 @@ def show_data_collection_interface():
             preserve_formatting = st.checkbox("Preserve original formatting", True)
             detect_duplicates = st.checkbox("Check for duplicates", True)
             auto_categorize = st.checkbox("Auto-categorize with AI", True)
+            background_save = st.checkbox("Save in background", False, help="Queue the save and keep working; status appears below")
+            background_transcribe = st.checkbox("Transcribe in background", False, help="Run download and transcription as a job; collect the transcript below when it finishes")
+            stream_transcript = st.checkbox("Stream transcript", False, help="Show, clean and classify the transcript 30 seconds at a time while the video is still being transcribed")
+            store_passages = st.checkbox("Store as timestamped passages", False, help="Save one entry per ~1 minute passage linked to the video instead of one entry for the whole transcript")
         
         with col2:
             # Processing button
             process_video_button = st.button("🎬 Process YouTube Video", type="primary")
         
+        # Queue a background job instead of transcribing in this request
+        if process_video_button and youtube_url.strip() and background_transcribe:
+            valid, msg = YouTubeTranscriber().validate_youtube_url(youtube_url)
+            if valid:
+                job_id = get_job_manager().submit(youtube_url)
+                st.success(f"✅ Transcription job `{job_id[:8]}` queued - track it under Transcription Jobs")
+            else:
+                st.error(f"❌ {msg}")
+        
+        elif process_video_button and youtube_url.strip() and stream_transcript:
+            process_streaming_youtube(youtube_url, components, preserve_formatting, detect_duplicates, auto_categorize, background_save)
+        
         # Process YouTube video when button clicked
-        if process_video_button and youtube_url.strip():
+        elif process_video_button and youtube_url.strip():
             # Create progress placeholder
             progress_placeholder = st.empty()
             
@@ -396,11 +503,21 @@ def show_data_collection_interface():
                     success, message, transcript = transcriber.generate_transcript(youtube_url, update_progress)
                     
                     if success:
-                        # Format transcript with video metadata
-                        formatted_transcript = transcriber.format_transcript_for_processing(transcript, video_info)
+                        transcript_source = transcriber.last_transcript_details.get('source', 'asr')
+                        st.caption(f"Transcript source: {transcript_source.replace('_', ' ')}")
+                        vad_stats = transcriber.last_transcript_details.get('vad')
+                        if vad_stats:
+                            st.caption(f"Voice activity detection skipped {vad_stats['skipped_fraction']:.0%} of the audio "
+                                       f"(about {vad_stats['estimated_seconds_saved']:.0f}s of transcription saved)")
                         
-                        # Process the transcript text
-                        process_admin_text_workflow(formatted_transcript, components, preserve_formatting, detect_duplicates, auto_categorize)
+                        if store_passages:
+                            save_transcript_passages(transcriber, transcript, video_info, components)
+                        else:
+                            # Format transcript with video metadata
+                            formatted_transcript = transcriber.format_transcript_for_processing(transcript, video_info)
+                            
+                            # Process the transcript text
+                            process_admin_text_workflow(formatted_transcript, components, preserve_formatting, detect_duplicates, auto_categorize, background_save)
                     else:
                         st.error(f"❌ {message}")
                 else:
@@ -409,12 +526,222 @@ def show_data_collection_interface():
                 st.error(f"❌ {msg}")
         elif process_video_button:
             st.error("⚠️ Please enter a YouTube URL")
+        
+        show_transcription_jobs(components, preserve_formatting, detect_duplicates, auto_categorize, background_save)
     
     
     # Add entry management section
     show_entry_management_section()
+    show_background_save_status(components)
+
+def save_transcript_passages(transcriber, transcript: str, video_info: Dict, components: Dict, confirmed: bool = True):
+    """Clean, classify and store each timestamped passage of a transcript as its own entry"""
+    passages = transcriber.get_passages(transcript)
+    video_id = video_info.get('video_id') or transcriber.last_transcript_details.get('video_id')
+    if not passages or not video_id:
+        st.error("❌ No passages to store for this video")
+        return
+    
+    status_text = st.empty()
+    progress_bar = st.progress(0)
+    entries = []
+    for passage in passages:
+        status_text.text(f"🏷️ Classifying passage {passage['passage_index'] + 1} of {len(passages)}...")
+        cleaning_result = components['text_processor'].clean_text(passage['text'])
+        cleaned_text = cleaning_result['cleaned_text'] if cleaning_result.get('is_valid') else passage['text']
+        classification_result = components['classifier'].ensemble_classify(cleaned_text)
+        
+        entries.append({
+            'category': classification_result['category'],
+            'subcategories': classification_result.get('subcategories', []),
+            'cleaned_text': cleaned_text,
+            'original_text': passage['text'],
+            'confidence_score': classification_result.get('confidence', 0.0),
+            'processing_metadata': {
+                'processing_timestamp': datetime.now().isoformat(),
+                'admin_processed': True,
+                'passage_save': True,
+                'video_title': video_info.get('title'),
+                'video_author': video_info.get('author'),
+                'transcript_source': transcriber.last_transcript_details.get('source', 'asr'),
+                'cleaning_stats': cleaning_result.get('statistics', {}),
+                'methods_used': classification_result.get('methods_used', []),
+                'confidence_score': classification_result.get('confidence', 0.0),
+                'processed_by_admin': True
+            },
+            'admin_confirmed': confirmed,
+            'passage_index': passage['passage_index'],
+            'start_seconds': passage['start'],
+            'end_seconds': passage['end']
+        })
+        progress_bar.progress((passage['passage_index'] + 1) / len(passages))
+    
+    status_text.text("💾 Saving passages...")
+    success, message, inserted_ids = components['db_manager'].insert_video_passages(video_id, entries)
+    progress_bar.empty()
+    status_text.empty()
+    
+    if not success:
+        st.error(f"❌ {message}")
+        return
+    
+    st.success(f"🎉 {message}")
+    st.session_state.last_saved_entry_id = inserted_ids[-1]
+    
+    def format_time(seconds):
+        if seconds is None:
+            return "-"
+        return f"{int(seconds)//60}:{int(seconds)%60:02d}"
+    
+    st.dataframe([{
+        'ID': entry_id,
+        'Time': f"{format_time(entry['start_seconds'])}-{format_time(entry['end_seconds'])}",
+        'Category': entry['category'],
+        'Preview': entry['cleaned_text'][:120]
+    } for entry_id, entry in zip(inserted_ids, entries)], use_container_width=True)
+
+def process_streaming_youtube(youtube_url: str, components: Dict, preserve_formatting: bool, detect_duplicates: bool, auto_categorize: bool, background_save: bool):
+    """Transcribe a video window by window, cleaning and classifying each piece as it arrives"""
+    transcriber = YouTubeTranscriber()
+    
+    valid, msg = transcriber.validate_youtube_url(youtube_url)
+    if not valid:
+        st.error(f"❌ {msg}")
+        return
+    success, message, video_info = transcriber.get_video_info(youtube_url)
+    if not success:
+        st.error(f"❌ {message}")
+        return
+    st.success(f"✅ Video found: {video_info['title']}")
+    
+    progress_placeholder = st.empty()
+    category_placeholder = st.empty()
+    st.markdown("**Live Transcript**")
+    
+    texts = []
+    category_scores = {}
+    try:
+        for piece in transcriber.stream_transcript(youtube_url, progress_placeholder.info):
+            texts.append(piece['text'])
+            
+            # Downstream work starts on each finished piece instead of the whole video
+            cleaning_result = components['text_processor'].clean_text(piece['text'])
+            cleaned_text = cleaning_result['cleaned_text'] if cleaning_result.get('is_valid') else piece['text']
+            
+            piece_category = None
+            if auto_categorize:
+                matches = components['classifier'].classify_with_embeddings(cleaned_text, top_k=1) or \
+                    components['classifier'].classify_with_keywords(cleaned_text, top_k=1)
+                if matches:
+                    piece_category = matches[0]['category']
+                    category_scores[piece_category] = category_scores.get(piece_category, 0) + matches[0]['confidence']
+            
+            start = int(piece['start'] or 0)
+            label = f" · {piece_category}" if piece_category else ""
+            st.markdown(f"`{start//60}:{start%60:02d}`{label}  \n{cleaned_text}")
+            
+            if category_scores:
+                leading = sorted(category_scores.items(), key=lambda item: item[1], reverse=True)[:3]
+                category_placeholder.info("🏷️ Leading categories so far: " + ", ".join(category for category, _ in leading))
+    except Exception as e:
+        st.error(f"❌ {str(e)}")
+        if not texts:
+            return
+        st.warning("⚠️ Continuing with the part of the transcript received so far")
+    
+    progress_placeholder.empty()
+    transcript = " ".join(texts)
+    if not transcript:
+        st.error("❌ Transcription produced empty result")
+        return
+    
+    # Final pass over the whole transcript for originality checks and saving
+    formatted_transcript = transcriber.format_transcript_for_processing(transcript, video_info)
+    process_admin_text_workflow(formatted_transcript, components, preserve_formatting, detect_duplicates, auto_categorize, background_save)
+
+def process_youtube_source(source_url: str, max_videos: int, components: Dict, preserve_formatting: bool, detect_duplicates: bool, auto_categorize: bool, background_save: bool):
+    """Transcribe every video in a playlist/channel and run each transcript through the text pipeline"""
+    success, message, video_urls = expand_source_url(source_url, max_videos)
+    if not success:
+        st.error(f"❌ {message}")
+        return
+    st.success(f"✅ {message}")
+    
+    progress_placeholder = st.empty()
+    overall_progress = st.progress(0)
+    transcriber = YouTubeTranscriber()
+    succeeded, failed = 0, []
+    
+    for done, result in enumerate(get_playlist_ingestor().ingest(video_urls, progress_placeholder.info), start=1):
+        overall_progress.progress(done / len(video_urls))
+        title = (result.get('video_info') or {}).get('title', result['video_url'])
+        
+        if not result['success']:
+            failed.append(f"{title}: {result['message']}")
+            continue
+        
+        succeeded += 1
+        with st.expander(f"🎬 {title} ({(result['source'] or 'asr').replace('_', ' ')})"):
+            formatted_transcript = transcriber.format_transcript_for_processing(result['transcript'], result['video_info'])
+            process_admin_text_workflow(formatted_transcript, components, preserve_formatting, detect_duplicates, auto_categorize, background_save)
+    
+    progress_placeholder.empty()
+    st.info(f"📚 Processed {succeeded} of {len(video_urls)} videos")
+    if failed:
+        with st.expander(f"❌ {len(failed)} videos failed"):
+            for line in failed:
+                st.write(f"• {line}")
+
+def process_local_media(local_path: str, uploaded_files: list, include_subfolders: bool, components: Dict, preserve_formatting: bool, detect_duplicates: bool, auto_categorize: bool, background_save: bool):
+    """Transcribe local or uploaded media files (already-transcribed files come from the cache) and process each transcript"""
+    file_paths = []
+    if local_path.strip():
+        success, message, file_paths = expand_local_path(local_path, recursive=include_subfolders)
+        if not success:
+            st.error(f"❌ {message}")
+            return
+        st.success(f"✅ {message}")
+    
+    upload_dir = None
+    if uploaded_files:
+        upload_dir = tempfile.mkdtemp(prefix="ai_baba_upload_")
+        for uploaded in uploaded_files:
+            upload_path = os.path.join(upload_dir, os.path.basename(uploaded.name))
+            with open(upload_path, 'wb') as f:
+                f.write(uploaded.getbuffer())
+            file_paths.append(upload_path)
+    
+    progress_placeholder = st.empty()
+    overall_progress = st.progress(0)
+    transcriber = YouTubeTranscriber()
+    succeeded, failed = 0, []
+    
+    try:
+        for done, result in enumerate(get_playlist_ingestor().ingest(file_paths, progress_placeholder.info), start=1):
+            overall_progress.progress(done / len(file_paths))
+            title = (result.get('video_info') or {}).get('title', os.path.basename(result['video_url']))
+            
+            if not result['success']:
+                failed.append(f"{title}: {result['message']}")
+                continue
+            
+            succeeded += 1
+            cached = " - cached" if "cached" in (result['message'] or '').lower() else ""
+            with st.expander(f"🎧 {title}{cached}"):
+                formatted_transcript = transcriber.format_transcript_for_processing(result['transcript'], result['video_info'])
+                process_admin_text_workflow(formatted_transcript, components, preserve_formatting, detect_duplicates, auto_categorize, background_save)
+    finally:
+        if upload_dir:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+    
+    progress_placeholder.empty()
+    st.info(f"🎧 Processed {succeeded} of {len(file_paths)} files")
+    if failed:
+        with st.expander(f"❌ {len(failed)} files failed"):
+            for line in failed:
+                st.write(f"• {line}")
 
-def process_admin_text_workflow(input_text: str, components: Dict, preserve_formatting: bool, detect_duplicates: bool, auto_categorize: bool):
+def process_admin_text_workflow(input_text: str, components: Dict, preserve_formatting: bool, detect_duplicates: bool, auto_categorize: bool, background_save: bool = False):
     """Complete admin text processing workflow - FIXED VERSION"""
     
     # Progress tracking
@@ -491,6 +818,15 @@ def process_admin_text_workflow(input_text: str, components: Dict, preserve_form
             status_text.text("💾 Step 4: Auto-saving processed data...")
             progress_bar.progress(85)
             
+            if background_save:
+                ticket = queue_save_to_database(input_text, cleaning_result, classification_result, components, confirmed=True)
+                status_text.text("✅ Processing completed - save queued in background")
+                progress_bar.progress(100)
+                st.success(f"📨 **PROCESSING COMPLETE!** Save queued (ticket `{ticket[:8]}`). Status is shown below.")
+                progress_bar.empty()
+                status_text.empty()
+                return
+            
             st.info("💾 Auto-saving processed data to knowledge base...")
             
             # Use bulletproof save functionality
@@ -917,6 +1253,116 @@ def bulletproof_save_to_database(input_text: str, cleaning_result: Dict, classif
         progress_container.empty()
         status_container.empty()
 
+def queue_save_to_database(input_text: str, cleaning_result: Dict, classification_result: Dict, components: Dict, confirmed: bool = True) -> str:
+    """Hand the save to the write-behind queue and return its ticket id"""
+    subcategories = classification_result.get('subcategories', [])
+    if isinstance(subcategories, str):
+        subcategories = [subcategories]
+    
+    processing_metadata = {
+        'processing_timestamp': datetime.now().isoformat(),
+        'admin_processed': True,
+        'write_behind_save': True,
+        'cleaning_stats': cleaning_result.get('statistics', {}),
+        'changes_made': cleaning_result.get('changes_made', []),
+        'preserved_terms': cleaning_result.get('preserved_terms', {}),
+        'classification_metadata': classification_result.get('metadata', {}),
+        'methods_used': classification_result.get('methods_used', []),
+        'confidence_score': classification_result.get('confidence', 0.0),
+        'processed_by_admin': True
+    }
+    
+    ticket = get_write_queue(components['db_manager']).submit({
+        'category': classification_result['category'],
+        'subcategories': subcategories,
+        'cleaned_text': cleaning_result.get('cleaned_text', input_text.strip()),
+        'original_text': input_text,
+        'confidence_score': classification_result.get('confidence', 1.0),
+        'processing_metadata': processing_metadata,
+        'admin_confirmed': confirmed
+    })
+    
+    st.session_state.setdefault('queued_save_tickets', []).append(ticket)
+    return ticket
+
+def show_background_save_status(components: Dict):
+    """Poll the write-behind queue for saves submitted in this session"""
+    tickets = st.session_state.get('queued_save_tickets', [])
+    if not tickets:
+        return
+    
+    write_queue = get_write_queue(components['db_manager'])
+    
+    st.markdown("---")
+    st.subheader("📨 Background Saves")
+    st.caption(f"{write_queue.pending_count()} entries waiting to be written")
+    
+    status_icons = {'pending': '⏳', 'retrying': '🔁', 'saved': '✅', 'failed': '❌'}
+    for ticket in reversed(tickets[-10:]):
+        status = write_queue.get_status(ticket)
+        if not status:
+            continue
+        icon = status_icons.get(status['state'], '•')
+        st.write(f"{icon} `{ticket[:8]}` - {status['message']}")
+        if status['state'] == 'saved':
+            st.session_state.last_saved_entry_id = status['entry_id']
+    
+    if st.button("🔄 Refresh Save Status", key="refresh_background_saves"):
+        st.rerun()
+
+def remove_transcription_job(job_manager, job_id: str):
+    """Delete a finished job, or explain why it can't be removed yet"""
+    success, message = job_manager.delete_job(job_id)
+    if success:
+        st.rerun()
+    else:
+        st.error(f"❌ {message}")
+
+def show_transcription_jobs(components: Dict, preserve_formatting: bool, detect_duplicates: bool, auto_categorize: bool, background_save: bool):
+    """Poll background transcription jobs and process finished transcripts"""
+    job_manager = get_job_manager()
+    jobs = job_manager.list_jobs(limit=10)
+    if not jobs:
+        return
+    
+    st.markdown("---")
+    st.subheader("🎧 Transcription Jobs")
+    
+    status_icons = {'queued': '⏳', 'running': '🔄', 'completed': '✅', 'failed': '❌'}
+    for job in jobs:
+        title = (job.get('video_info') or {}).get('title') or job['video_url']
+        icon = status_icons.get(job['status'], '•')
+        with st.expander(f"{icon} {title} - {job['status']}", expanded=job['status'] == 'running'):
+            st.caption(f"Job `{job['id'][:8]}` · submitted {job['created_at'][:19]}")
+            st.write(job['message'] or "")
+            
+            if job['status'] == 'completed':
+                col1, col2 = st.columns(2)
+                with col1:
+                    process_job = st.button("📝 Process Transcript", key=f"process_job_{job['id']}")
+                with col2:
+                    remove_job = st.button("🗑️ Remove Job", key=f"remove_job_{job['id']}")
+                
+                if remove_job:
+                    remove_transcription_job(job_manager, job['id'])
+            elif job['status'] == 'failed':
+                process_job = False
+                if st.button("🗑️ Remove Job", key=f"remove_job_{job['id']}"):
+                    remove_transcription_job(job_manager, job['id'])
+            else:
+                process_job = False
+        
+        if process_job:
+            success, message, transcript, video_info = job_manager.get_result(job['id'])
+            if success:
+                formatted_transcript = YouTubeTranscriber().format_transcript_for_processing(transcript, video_info)
+                process_admin_text_workflow(formatted_transcript, components, preserve_formatting, detect_duplicates, auto_categorize, background_save)
+            else:
+                st.error(f"❌ {message}")
+    
+    if st.button("🔄 Refresh Jobs", key="refresh_transcription_jobs"):
+        st.rerun()
+
 def show_entry_management_section():
     """Show entry management section in main app"""
     if hasattr(st.session_state, 'last_saved_entry_id'):
@@ -1108,25 +1554,41 @@ def show_database_management():
             search_term = st.text_input("Search term:")
             
             if search_term:
-                success, message, results = components['db_manager'].search_entries(search_term)
+                success, message, results = search_database(search_term, components)
                 
                 if success and results:
                     st.write(f"Found {len(results)} entries:")
+                    st.caption(message)
                     display_admin_entries_table(results)
                 else:
                     st.info("No results found")
 
 
+def search_database(search_term: str, components: Dict):
+    """Hybrid keyword + semantic search from the local index, or the database's own search without one"""
+    retriever = get_wisdom_retriever()
+    if retriever.is_ready():
+        # Picks up edits made since the last sync, at most one round trip per 30s
+        retriever.sync_if_stale()
+        success, message, results = retriever.search_entry_list(search_term)
+        if success:
+            return success, message, results
+    return components['db_manager'].search_entry_list(search_term)
+
 def display_admin_entries_table(entries: List[Dict]):
     """Display entries table in admin interface"""
     
     # Prepare display data
     display_data = []
     for entry in entries:
+        if 'preview' in entry:
+            preview = entry['preview']
+        else:
+            preview = entry['information'][:80] + '...' if len(entry['information']) > 80 else entry['information']
         display_data.append({
             'ID': entry['id'],
             'Category': entry['category'],
-            'Text Preview': entry['information'][:80] + '...' if len(entry['information']) > 80 else entry['information'],
+            'Text Preview': preview,
             'Status': '✅ Confirmed' if entry['admin_confirmed'] else '⏳ Pending',
             'Date': entry['created_at'][:10]
         })
@@ -1297,6 +1759,65 @@ def show_system_settings():
                     st.success("✅ Zero-shot Classifier: Ready")
                 else:
                     st.warning("⚠️ Zero-shot Classifier: Not loaded")
+            
+            st.markdown("**Transcription Models (shared across YouTube jobs)**")
+            asr_metrics = get_asr_registry().get_metrics()
+            if asr_metrics:
+                for model_key, metrics in asr_metrics.items():
+                    load_time = f"{metrics['last_load_seconds']:.1f}s" if metrics['last_load_seconds'] else "n/a"
+                    state = "✅ Loaded" if metrics['loaded'] else "💤 Evicted"
+                    st.write(f"{state} **{model_key}** - loads: {metrics['loads']}, reuses: {metrics['hits']}, last load: {load_time}")
+            else:
+                st.info("No transcription model loaded yet - the first video pays the load cost")
+            
+            st.markdown("**Wisdom Retrieval Index**")
+            retriever = get_wisdom_retriever()
+            index_stats = retriever.get_stats()
+            if index_stats.get('entries'):
+                built_at = datetime.fromtimestamp(index_stats['built_at']).strftime('%Y-%m-%d %H:%M')
+                avg_ms = f"{index_stats['avg_ms']:.1f} ms" if index_stats['avg_ms'] else "n/a"
+                layout = f"{index_stats['ivf_lists']} IVF lists" if index_stats['ivf_lists'] else "flat"
+                st.write(f"✅ {index_stats['entries']} passages ({index_stats['index_bytes'] / 1e6:.1f} MB, {layout}), "
+                         f"built {built_at}, avg search {avg_ms}")
+                if index_stats['routed']:
+                    st.write(f"🧭 {index_stats['routed']} questions routed to their categories "
+                             f"(avg {index_stats['avg_routed_share']:.0%} of the index searched), "
+                             f"{index_stats['route_fallbacks']} fell back to the whole index")
+                cache_stats = index_stats['cache']
+                if cache_stats['lookups']:
+                    avg_saved = cache_stats['saved_ms'] / cache_stats['hits'] if cache_stats['hits'] else 0.0
+                    st.write(f"💾 Answer cache: {cache_stats['hit_rate']:.0%} hit rate "
+                             f"({cache_stats['hits']}/{cache_stats['lookups']} questions), "
+                             f"{cache_stats['saved_ms'] / 1000:.1f}s saved (avg {avg_saved:.1f} ms per hit), "
+                             f"{cache_stats['entries']} answers cached, {cache_stats['invalidated']} invalidated by edits")
+                last_sync = index_stats.get('last_sync')
+                if last_sync:
+                    synced_at = datetime.fromtimestamp(index_stats['last_sync_at']).strftime('%Y-%m-%d %H:%M')
+                    st.write(f"🔁 Last sync {synced_at}: {last_sync['changed']} changed rows, "
+                             f"{last_sync['embedded']} embedded, {last_sync['removed'] + last_sync['deleted']} removed, "
+                             f"{index_stats['tombstones']} tombstones awaiting compaction")
+                    if not last_sync['deletions_tracked']:
+                        st.warning("⚠️ Deleted entries are not tracked - run add_change_tracking.sql")
+            else:
+                st.info("Wisdom index not built yet - the first question builds it")
+            
+            sync_col, rebuild_col = st.columns(2)
+            with sync_col:
+                if st.button("🔁 Sync Wisdom Index"):
+                    with st.spinner("Embedding changed entries..."):
+                        success, message, _ = retriever.sync()
+                    if success:
+                        st.success(f"✅ {message}")
+                    else:
+                        st.error(f"❌ {message}")
+            with rebuild_col:
+                if st.button("🔄 Rebuild Wisdom Index"):
+                    with st.spinner("Embedding confirmed entries..."):
+                        success, message, _ = retriever.build()
+                    if success:
+                        st.success(f"✅ {message}")
+                    else:
+                        st.error(f"❌ {message}")
         
         with st.expander("💾 Database Configuration"):
             st.markdown("**Supabase Connection**")
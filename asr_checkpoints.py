@@ -0,0 +1,218 @@
+"""
+Checkpoints for long AI Baba transcriptions
+Keeps the decoded audio and every finished chunk transcript in a job directory
+per video, so a crash or restart resumes from the last completed chunk instead
+of re-downloading and re-transcribing the whole video. One run at a time holds
+a video's job; another run of the same video waits for it
+"""
+import os
+import re
+import json
+import time
+import shutil
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_JOBS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "asr_jobs"
+)
+
+class ASRCheckpointJob:
+    """On-disk state of one video's transcription"""
+
+    def __init__(self, job_dir: str, model_name: str, params: Dict, release: Optional[Callable] = None):
+        """
+        Args:
+            release: Called once by close() or finish() to give up the video's job lock
+        """
+        self.job_dir = job_dir
+        self.model_name = model_name
+        self.params = params
+        self._release = release
+        self.audio_path = os.path.join(job_dir, "audio.f32")
+        self.partial_audio_path = self.audio_path + ".part"
+        self._meta_path = os.path.join(job_dir, "meta.json")
+        self._chunks_path = os.path.join(job_dir, "chunks.jsonl")
+
+        os.makedirs(job_dir, exist_ok=True)
+        self.meta = self._load_meta()
+        if (self.meta.get('model_name'), self.meta.get('params')) != (model_name, params):
+            # Chunks from another model or settings can't be mixed in; the audio is still good
+            self._remove(self._chunks_path)
+            self.meta = {'model_name': model_name, 'params': params, 'spans': None, 'created_at': time.time()}
+            self._save_meta()
+
+    def _load_meta(self) -> Dict:
+        try:
+            with open(self._meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_meta(self):
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def restart(self, model_name: str, params: Dict):
+        """Discard finished chunks to continue under another model; the audio and chunk boundaries stay"""
+        self._remove(self._chunks_path)
+        self.model_name = model_name
+        self.params = params
+        self.meta.update(model_name=model_name, params=params)
+        self._save_meta()
+
+    def has_audio(self) -> bool:
+        return os.path.exists(self.audio_path) and os.path.getsize(self.audio_path) >= 4
+
+    def commit_audio(self):
+        """Promote a fully decoded .part file; a partial decode is never resumed from"""
+        os.replace(self.partial_audio_path, self.audio_path)
+
+    def load_audio(self) -> np.ndarray:
+        return np.memmap(self.audio_path, dtype=np.float32, mode='r')
+
+    @property
+    def spans(self) -> Optional[List[Tuple[int, int]]]:
+        """Chunk boundaries as (start_sample, end_sample), fixed on first run so resumes line up"""
+        spans = self.meta.get('spans')
+        return [tuple(span) for span in spans] if spans else None
+
+    def set_spans(self, spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        self.meta['spans'] = [list(span) for span in spans]
+        self._save_meta()
+        return spans
+
+    def completed_chunks(self) -> Dict[int, Dict]:
+        """Finished chunk records by index (a line torn by a crash is ignored)"""
+        chunks = {}
+        try:
+            with open(self._chunks_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    chunks[record['index']] = record
+        except OSError:
+            pass
+        return chunks
+
+    def record_chunk(self, index: int, record: Dict):
+        """Durably append one finished chunk"""
+        line = json.dumps(dict(record, index=index), default=str)
+        with open(self._chunks_path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def finish(self):
+        """Delete the job directory once its transcript is safely cached"""
+        shutil.rmtree(self.job_dir, ignore_errors=True)
+        self.close()
+
+    def close(self):
+        """Let the next run of this video open the job (safe to call more than once)"""
+        release, self._release = self._release, None
+        if release:
+            release()
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+class ASRCheckpointStore:
+    """Job directories keyed by video id, with retention-based garbage collection"""
+
+    def __init__(self, root: str = DEFAULT_JOBS_DIR, retention_seconds: float = 72 * 3600):
+        self.root = root
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        # Job dir name -> [lock, runs holding or waiting for it]; dropped when unused
+        self._job_locks: Dict[str, list] = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    def open_job(self, video_id: str, model_name: str, params: Dict) -> ASRCheckpointJob:
+        """
+        Open (or resume) the job for a video
+
+        Blocks while another run holds the same video's job, since both would
+        decode into and delete the same directory. Call close() or finish()
+        on the returned job when done with it.
+        """
+        self.gc()
+        safe_id = re.sub(r'[^A-Za-z0-9_-]', '_', video_id)
+        with self._lock:
+            entry = self._job_locks.setdefault(safe_id, [threading.Lock(), 0])
+            entry[1] += 1
+        entry[0].acquire()
+        try:
+            return ASRCheckpointJob(os.path.join(self.root, safe_id), model_name, params,
+                                    release=lambda: self._release_job(safe_id))
+        except Exception:
+            self._release_job(safe_id)
+            raise
+
+    def _release_job(self, safe_id: str):
+        with self._lock:
+            entry = self._job_locks[safe_id]
+            entry[0].release()
+            entry[1] -= 1
+            if not entry[1]:
+                del self._job_locks[safe_id]
+
+    def gc(self) -> int:
+        """Remove abandoned jobs untouched for longer than the retention window"""
+        removed = 0
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            for name in os.listdir(self.root):
+                job_dir = os.path.join(self.root, name)
+                if not os.path.isdir(job_dir) or name in self._job_locks:
+                    continue
+                try:
+                    last_modified = max(
+                        [os.path.getmtime(job_dir)] +
+                        [os.path.getmtime(os.path.join(job_dir, f)) for f in os.listdir(job_dir)]
+                    )
+                except OSError:
+                    continue
+                if last_modified < cutoff:
+                    shutil.rmtree(job_dir, ignore_errors=True)
+                    removed += 1
+        return removed
+
+    def list_jobs(self) -> List[Dict]:
+        """Unfinished jobs with their progress"""
+        jobs = []
+        for name in sorted(os.listdir(self.root)):
+            job_dir = os.path.join(self.root, name)
+            meta_path = os.path.join(job_dir, "meta.json")
+            if not os.path.exists(meta_path):
+                continue
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            job = ASRCheckpointJob(job_dir, meta.get('model_name'), meta.get('params'))
+            jobs.append({
+                'video_id': name,
+                'model_name': meta.get('model_name'),
+                'chunks_done': len(job.completed_chunks()),
+                'chunks_total': len(job.spans or []),
+                'has_audio': job.has_audio()
+            })
+        return jobs
+
+# Global checkpoint store, retention from ASR_CHECKPOINT_RETENTION_HOURS
+checkpoint_store = ASRCheckpointStore(
+    retention_seconds=float(os.getenv("ASR_CHECKPOINT_RETENTION_HOURS", "72")) * 3600
+)
+
+def get_checkpoint_store() -> ASRCheckpointStore:
+    """Get global ASR checkpoint store"""
+    return checkpoint_store
@@ -0,0 +1,217 @@
+"""
+Process-wide ASR model registry for AI Baba
+Keeps one loaded speech-recognition pipeline per (model, dtype, device) so
+every YouTubeTranscriber shares it instead of reloading Whisper per video
+"""
+import os
+import time
+import threading
+from typing import Dict, Optional, Tuple
+
+import torch
+from transformers import pipeline
+
+# Don't retry a model that just failed to load for this many seconds
+LOAD_FAILURE_COOLDOWN = 600
+
+# Speed/accuracy presets; int8 dynamic quantization only applies on CPU
+ASR_PROFILES = {
+    'fast': {'model_name': 'openai/whisper-base', 'quantize': True},
+    'balanced': {'model_name': 'distil-whisper/distil-large-v3', 'quantize': True},
+    'accurate': {'model_name': 'openai/whisper-large-v3', 'quantize': False},
+    # Loaded in float32 when a profile's model fails to load; never auto-selected
+    'fallback': {'model_name': 'openai/whisper-base', 'quantize': False},
+}
+# Most accurate first
+ASR_PROFILE_ORDER = ['accurate', 'balanced', 'fast']
+
+def select_asr_profile(duration_seconds: Optional[float] = None, cpu_count: Optional[int] = None,
+                       cuda_available: Optional[bool] = None) -> str:
+    """
+    Pick a profile that keeps transcription near real time on this machine
+
+    Args:
+        duration_seconds: Audio length, when known
+        cpu_count: Cores available (defaults to os.cpu_count())
+        cuda_available: Whether a GPU is usable (defaults to torch.cuda.is_available())
+    """
+    if cuda_available is None:
+        cuda_available = torch.cuda.is_available()
+    if cuda_available:
+        return 'accurate'
+
+    cpu_count = cpu_count or os.cpu_count() or 1
+    duration_minutes = (duration_seconds or 0) / 60
+
+    # large-v3 on CPU only pays off for short clips on big machines
+    if cpu_count >= 16 and duration_minutes <= 5:
+        return 'accurate'
+    if cpu_count >= 4 and duration_minutes <= 30:
+        return 'balanced'
+    return 'fast'
+
+def quantize_pipeline(asr):
+    """Swap the pipeline model's Linear layers for int8 dynamically quantized ones (CPU only)"""
+    asr.model = torch.quantization.quantize_dynamic(asr.model, {torch.nn.Linear}, dtype=torch.qint8)
+    return asr
+
+class ASRModelRegistry:
+    """Thread-safe, lazily populated cache of ASR pipelines"""
+
+    def __init__(self, idle_timeout: Optional[float] = None):
+        """
+        Args:
+            idle_timeout: Evict a model after this many unused seconds (None keeps models forever)
+        """
+        self.idle_timeout = idle_timeout
+        self._models: Dict[Tuple, object] = {}
+        self._key_locks: Dict[Tuple, threading.Lock] = {}
+        # id(pipeline) -> lock held while it runs; HF pipelines are not safe to call from several threads
+        self._inference_locks: Dict[int, threading.Lock] = {}
+        self._failures: Dict[Tuple, Tuple[float, str]] = {}
+        self._metrics: Dict[Tuple, Dict] = {}
+        self._lock = threading.Lock()
+        self._janitor = None
+
+        if idle_timeout:
+            self._start_janitor()
+
+    @staticmethod
+    def make_key(model_name: str, torch_dtype, device, quantize: bool = False) -> Tuple:
+        dtype = "int8-dynamic" if quantize else str(torch_dtype).replace("torch.", "")
+        return (model_name, dtype, str(device))
+
+    def get_pipeline(self, model_name: str, torch_dtype=torch.float32, device=-1, model_kwargs: Dict = None,
+                     quantize: bool = False):
+        """
+        Get a loaded ASR pipeline, loading it on first use
+
+        quantize applies int8 dynamic quantization after loading (ignored off CPU).
+        Raises the load error (or a cached one during the failure cooldown)
+        """
+        quantize = quantize and device == -1
+        key = self.make_key(model_name, torch_dtype, device, quantize)
+
+        with self._lock:
+            metrics = self._metrics.setdefault(key, {
+                'loads': 0, 'hits': 0, 'load_seconds': 0.0,
+                'last_load_seconds': None, 'last_used': None, 'evictions': 0
+            })
+            if key in self._models:
+                metrics['hits'] += 1
+                metrics['last_used'] = time.time()
+                return self._models[key]
+
+            failure = self._failures.get(key)
+            if failure and time.time() - failure[0] < LOAD_FAILURE_COOLDOWN:
+                raise RuntimeError(f"{model_name} failed to load recently: {failure[1]}")
+
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other models stay available;
+        # the per-key lock makes concurrent callers wait for one load
+        with key_lock:
+            with self._lock:
+                if key in self._models:
+                    metrics['hits'] += 1
+                    metrics['last_used'] = time.time()
+                    return self._models[key]
+
+            print(f"Loading transcription model {model_name} ({key[1]}, device {key[2]})...")
+            start = time.perf_counter()
+            try:
+                asr = pipeline(
+                    "automatic-speech-recognition",
+                    model=model_name,
+                    device=device,
+                    torch_dtype=torch_dtype,
+                    model_kwargs=model_kwargs or {}
+                )
+                if quantize:
+                    asr = quantize_pipeline(asr)
+            except Exception as e:
+                with self._lock:
+                    self._failures[key] = (time.time(), str(e))
+                raise
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self._models[key] = asr
+                self._failures.pop(key, None)
+                metrics['loads'] += 1
+                metrics['load_seconds'] += elapsed
+                metrics['last_load_seconds'] = elapsed
+                metrics['last_used'] = time.time()
+
+            print(f"✅ Model {model_name} loaded in {elapsed:.1f}s")
+            return asr
+
+    def inference_lock(self, asr) -> threading.Lock:
+        """
+        Lock to hold while calling a shared pipeline
+
+        Inline runs, background jobs and the playlist consumer can all hold the
+        same pipeline; calls into one model are serialized, different models
+        still run side by side
+        """
+        with self._lock:
+            return self._inference_locks.setdefault(id(asr), threading.Lock())
+
+    def evict_idle(self) -> int:
+        """Drop models unused for longer than idle_timeout; returns how many were evicted"""
+        if not self.idle_timeout:
+            return 0
+
+        now = time.time()
+        evicted = 0
+        with self._lock:
+            for key in list(self._models):
+                last_used = self._metrics[key]['last_used'] or 0
+                if now - last_used > self.idle_timeout:
+                    # Transcribers still holding the pipeline keep the lock they already took
+                    self._inference_locks.pop(id(self._models.pop(key)), None)
+                    self._metrics[key]['evictions'] += 1
+                    evicted += 1
+
+        if evicted and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        return evicted
+
+    def clear(self):
+        """Unload every model"""
+        with self._lock:
+            self._models.clear()
+            self._inference_locks.clear()
+            self._failures.clear()
+
+    def loaded_models(self) -> list:
+        with self._lock:
+            return [key[0] for key in self._models]
+
+    def get_metrics(self) -> Dict[str, Dict]:
+        """Load/hit counters and timings per model key"""
+        with self._lock:
+            return {
+                f"{name} [{dtype}, device {device}]": dict(m, loaded=(name, dtype, device) in self._models)
+                for (name, dtype, device), m in self._metrics.items()
+            }
+
+    def _start_janitor(self):
+        def run():
+            interval = max(self.idle_timeout / 2, 5)
+            while True:
+                time.sleep(interval)
+                evicted = self.evict_idle()
+                if evicted:
+                    print(f"🧹 Evicted {evicted} idle transcription model(s)")
+
+        self._janitor = threading.Thread(target=run, name="asr-model-janitor", daemon=True)
+        self._janitor.start()
+
+# Global registry instance, idle timeout from ASR_MODEL_IDLE_TIMEOUT (seconds)
+_idle_timeout = os.getenv("ASR_MODEL_IDLE_TIMEOUT")
+asr_registry = ASRModelRegistry(idle_timeout=float(_idle_timeout) if _idle_timeout else None)
+
+def get_asr_registry() -> ASRModelRegistry:
+    """Get global ASR model registry"""
+    return asr_registry
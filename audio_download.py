@@ -0,0 +1,260 @@
+"""
+Audio stream selection and download for AI Baba transcription
+ASR resamples everything to 16 kHz mono, so the lowest audio bitrate that is
+still adequate for speech is picked, then fetched with concurrent byte-range
+requests over a pooled HTTP session into a resumable .part file
+"""
+import os
+import re
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_DOWNLOAD_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "downloads"
+)
+
+# Speech stays fully intelligible well below this; higher bitrates only add bytes
+MIN_ASR_AUDIO_KBPS = float(os.getenv("ASR_AUDIO_MIN_KBPS", "48"))
+# Abandoned partial downloads are removed after this long
+PARTIAL_RETENTION_SECONDS = 24 * 3600
+
+def stream_kbps(stream) -> float:
+    """Audio bitrate of a pytubefix stream in kbps (0 when unknown)"""
+    match = re.match(r"([\d.]+)", str(getattr(stream, 'abr', None) or ''))
+    return float(match.group(1)) if match else 0.0
+
+def select_asr_stream(yt, min_kbps: float = MIN_ASR_AUDIO_KBPS):
+    """
+    Lowest-bitrate audio-only stream at or above min_kbps
+
+    Falls back to the best stream below the bar, then to any stream with
+    audio; returns None when the video has no audio at all.
+    """
+    audio_streams = [s for s in yt.streams.filter(only_audio=True) if stream_kbps(s) > 0]
+    adequate = sorted((s for s in audio_streams if stream_kbps(s) >= min_kbps), key=stream_kbps)
+    if adequate:
+        return adequate[0]
+    if audio_streams:
+        return max(audio_streams, key=stream_kbps)
+    return (yt.streams.filter(only_audio=True).first() or
+            yt.streams.filter(adaptive=True, file_extension='mp4').order_by('abr').desc().first())
+
+class RangeNotSupported(RuntimeError):
+    """The server answered a byte-range request with something other than that range"""
+
+class RangedDownloader:
+    """Concurrent byte-range downloads through one pooled, retrying HTTP session"""
+
+    def __init__(self, connections: int = 4, part_size: int = 2 * 1024 * 1024,
+                 download_dir: str = DEFAULT_DOWNLOAD_DIR, timeout: float = 30):
+        """
+        Args:
+            connections: Parallel range requests per download
+            part_size: Bytes per range request (and resume granularity)
+            download_dir: Where .part files and finished downloads live
+            timeout: Seconds to wait on a connection before retrying
+        """
+        self.connections = max(1, connections)
+        self.part_size = part_size
+        self.download_dir = download_dir
+        self.timeout = timeout
+        self._session = self._build_session()
+        # dest_path -> [lock, downloads holding or waiting for it]; dropped when unused
+        self._path_locks: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._metrics = {'downloads': 0, 'bytes': 0, 'resumed_bytes': 0, 'seconds': 0.0, 'last_mbps': None}
+        os.makedirs(self.download_dir, exist_ok=True)
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset(['GET', 'HEAD']))
+        # One keep-alive connection per worker thread, reused across parts and videos
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.connections * 2, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def download_path(self, name: str) -> str:
+        """Stable path for a download, so a retry finds its .part file"""
+        return os.path.join(self.download_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', name))
+
+    def download(self, url: str, dest_path: str, total_size: Optional[int] = None,
+                 progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """
+        Download url to dest_path
+
+        Parts already in dest_path + ".part" from an earlier attempt are kept.
+        Servers that ignore Range get a single streamed request instead.
+
+        Returns:
+            Stats: bytes, resumed_bytes, seconds, mbps (downloaded this run), connections
+        Raises:
+            requests.RequestException or RuntimeError when the download fails;
+            the .part file is left in place for the next attempt
+        """
+        self._remove_stale_partials()
+        with self._lock:
+            path_lock = self._path_locks.setdefault(dest_path, [threading.Lock(), 0])
+            path_lock[1] += 1
+
+        try:
+            with path_lock[0]:
+                start = time.perf_counter()
+                total_size = total_size or self._content_length(url)
+                if not total_size:
+                    fetched, resumed, connections = self._download_single(url, dest_path), 0, 1
+                else:
+                    try:
+                        fetched, resumed = self._download_ranges(url, dest_path, total_size, progress_callback)
+                        connections = self.connections
+                    except RangeNotSupported:
+                        fetched, resumed, connections = self._download_single(url, dest_path), 0, 1
+                elapsed = time.perf_counter() - start
+        finally:
+            with self._lock:
+                path_lock[1] -= 1
+                if not path_lock[1]:
+                    del self._path_locks[dest_path]
+
+        stats = {
+            'bytes': fetched,
+            'resumed_bytes': resumed,
+            'seconds': elapsed,
+            'mbps': fetched * 8 / elapsed / 1e6 if elapsed else 0.0,
+            'connections': connections
+        }
+        with self._lock:
+            self._metrics['downloads'] += 1
+            self._metrics['bytes'] += fetched
+            self._metrics['resumed_bytes'] += resumed
+            self._metrics['seconds'] += elapsed
+            self._metrics['last_mbps'] = stats['mbps']
+        return stats
+
+    def _content_length(self, url: str) -> Optional[int]:
+        try:
+            response = self._session.head(url, allow_redirects=True, timeout=self.timeout)
+            response.raise_for_status()
+            return int(response.headers.get('Content-Length') or 0) or None
+        except (requests.RequestException, ValueError):
+            return None
+
+    def _download_ranges(self, url: str, dest_path: str, total_size: int,
+                         progress_callback=None) -> Tuple[int, int]:
+        part_path = dest_path + ".part"
+        state_path = dest_path + ".part.json"
+        parts = [(offset, min(offset + self.part_size, total_size) - 1)
+                 for offset in range(0, total_size, self.part_size)]
+
+        done = self._load_done_parts(state_path, part_path, total_size)
+        if not os.path.exists(part_path) or os.path.getsize(part_path) != total_size:
+            done = set()
+            with open(part_path, 'wb') as f:
+                f.truncate(total_size)
+        resumed = sum(parts[i][1] - parts[i][0] + 1 for i in done)
+
+        state_lock = threading.Lock()
+        progress = {'bytes': resumed}
+
+        def fetch(index: int) -> int:
+            first, last = parts[index]
+            response = self._session.get(url, headers={'Range': f"bytes={first}-{last}"},
+                                         timeout=self.timeout)
+            response.raise_for_status()
+            if response.status_code != 206 or len(response.content) != last - first + 1:
+                raise RangeNotSupported(f"Server ignored byte range {first}-{last} (status {response.status_code})")
+            with open(part_path, 'r+b') as f:
+                f.seek(first)
+                f.write(response.content)
+                # On disk before the state file claims it, or a crash could resume over a hole
+                f.flush()
+                os.fsync(f.fileno())
+            with state_lock:
+                done.add(index)
+                progress['bytes'] += len(response.content)
+                self._save_done_parts(state_path, done, total_size)
+                if progress_callback:
+                    progress_callback(progress['bytes'], total_size)
+            return len(response.content)
+
+        pending = [i for i in range(len(parts)) if i not in done]
+        with ThreadPoolExecutor(max_workers=self.connections, thread_name_prefix="audio-download") as executor:
+            fetched = sum(executor.map(fetch, pending))
+
+        os.replace(part_path, dest_path)
+        self._remove(state_path)
+        return fetched, resumed
+
+    def _download_single(self, url: str, dest_path: str) -> int:
+        """Plain streamed GET for servers that don't report a size"""
+        part_path = dest_path + ".part"
+        fetched = 0
+        with self._session.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            with open(part_path, 'wb') as f:
+                for block in response.iter_content(chunk_size=256 * 1024):
+                    f.write(block)
+                    fetched += len(block)
+        os.replace(part_path, dest_path)
+        self._remove(dest_path + ".part.json")
+        return fetched
+
+    @staticmethod
+    def _load_done_parts(state_path: str, part_path: str, total_size: int) -> set:
+        try:
+            with open(state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return set()
+        # A different size means a different stream; start over
+        if state.get('total_size') != total_size or not os.path.exists(part_path):
+            return set()
+        return set(state.get('done', []))
+
+    @staticmethod
+    def _save_done_parts(state_path: str, done: set, total_size: int):
+        tmp_path = state_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'total_size': total_size, 'done': sorted(done)}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, state_path)
+
+    def _remove_stale_partials(self):
+        cutoff = time.time() - PARTIAL_RETENTION_SECONDS
+        for name in os.listdir(self.download_dir):
+            path = os.path.join(self.download_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get_metrics(self) -> Dict:
+        """Totals across downloads, with average throughput in Mbit/s"""
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics['avg_mbps'] = metrics['bytes'] * 8 / metrics['seconds'] / 1e6 if metrics['seconds'] else None
+        return metrics
+
+# Global downloader (DOWNLOAD_CONNECTIONS parallel ranges per file)
+audio_downloader = RangedDownloader(connections=int(os.getenv("DOWNLOAD_CONNECTIONS", "4")))
+
+def get_audio_downloader() -> RangedDownloader:
+    """Get global audio downloader"""
+    return audio_downloader
@@ -0,0 +1,255 @@
+"""
+Audio fingerprints for AI Baba transcription
+Hashes pairs of spectral peaks from a few minutes of decoded audio (landmark
+fingerprinting) and keeps them in a local SQLite index, so a discourse
+re-uploaded under another video id is recognised and its existing transcript
+reused instead of running Whisper again. A match has to line up across most
+of the fingerprinted audio, so videos that merely share a channel intro or
+jingle are not taken for copies
+"""
+import os
+import time
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from utils.audio_utils import SAMPLING_RATE
+
+DEFAULT_INDEX_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "audio_fingerprints.db"
+)
+
+# Audio fingerprinted per recording...
+FINGERPRINT_SECONDS = float(os.getenv("AUDIO_FINGERPRINT_SECONDS", "120"))
+# ...starting this far in (when the recording is long enough), past most intros
+FINGERPRINT_SKIP_SECONDS = float(os.getenv("AUDIO_FINGERPRINT_SKIP_SECONDS", "30"))
+
+# Spectrogram: 64 ms windows every 32 ms at 16 kHz
+FFT_SIZE = 1024
+HOP_SIZE = 512
+# Frequency bands (FFT bins) that each contribute their strongest bin per frame
+FREQUENCY_BANDS = ((4, 16), (16, 32), (32, 64), (64, 128), (128, 256), (256, 512))
+# A band peak must be the loudest in the band within this many frames either side...
+PEAK_NEIGHBORHOOD = 3
+# ...and stand this far (natural log, about 26 dB) above the frame's average level,
+# so background noise, which differs between copies, yields no peaks
+PEAK_MIN_PROMINENCE = 3.0
+# Each peak is paired with this many following peaks...
+FAN_OUT = 3
+# ...no more than this many frames later
+MAX_PAIR_FRAMES = 63
+
+# Matching: the fingerprinted audio is split into buckets of this many frames
+# (about 5 s), and aligned matches must fall in at least MIN_MATCH_COVERAGE of
+# the buckets holding query hashes, so a shared intro, outro or jingle that
+# only covers part of the audio never makes two recordings the same
+COVERAGE_BUCKET_FRAMES = 156
+MIN_MATCH_COVERAGE = 0.6
+
+FINGERPRINT_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS fingerprinted_media (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_id TEXT UNIQUE NOT NULL,
+    hash_count INTEGER,
+    created_at REAL
+);
+CREATE TABLE IF NOT EXISTS fingerprint_hashes (
+    hash INTEGER NOT NULL,
+    media_id INTEGER NOT NULL,
+    frame INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fingerprint_hash ON fingerprint_hashes (hash);
+CREATE INDEX IF NOT EXISTS idx_fingerprint_media ON fingerprint_hashes (media_id);
+"""
+
+def _spectrogram(samples: np.ndarray) -> np.ndarray:
+    """Log-magnitude spectrogram, frames x bins"""
+    frame_count = 1 + (len(samples) - FFT_SIZE) // HOP_SIZE
+    if frame_count <= 0:
+        return np.empty((0, FFT_SIZE // 2 + 1))
+    strides = (samples.strides[0] * HOP_SIZE, samples.strides[0])
+    frames = np.lib.stride_tricks.as_strided(samples, shape=(frame_count, FFT_SIZE), strides=strides)
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(FFT_SIZE), axis=1))
+    return np.log(spectrum + 1e-6)
+
+def compute_fingerprint(audio: np.ndarray, seconds: float = FINGERPRINT_SECONDS,
+                        sampling_rate: int = SAMPLING_RATE,
+                        skip_seconds: float = FINGERPRINT_SKIP_SECONDS) -> np.ndarray:
+    """
+    Landmark hashes for seconds of audio, starting skip_seconds in
+
+    The start moves earlier for recordings too short to fill the window
+    after skipping (down to the very start), so short clips are still
+    fingerprinted in full.
+
+    Returns:
+        int64 array of shape (n, 2): (hash, anchor_frame) rows, frames
+        counted from the start of the recording. Hashes pack both peak
+        frequencies and their frame distance, so they survive re-encoding,
+        volume changes and a shifted start.
+    """
+    total_seconds = len(audio) / sampling_rate
+    start_frame = int(max(0.0, min(skip_seconds, total_seconds - seconds)) * sampling_rate) // HOP_SIZE
+    start = start_frame * HOP_SIZE
+    samples = np.asarray(audio[start:start + int(seconds * sampling_rate)], dtype=np.float32)
+    spectrogram = _spectrogram(samples)
+    if len(spectrogram) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    # Strongest bin per band per frame, kept where it stands out from the frame's
+    # average level and is a local maximum over time within its band
+    frame_mean = spectrogram.mean(axis=1)
+    peaks = []
+    for low, high in FREQUENCY_BANDS:
+        band = spectrogram[:, low:high]
+        bins = band.argmax(axis=1)
+        level = band[np.arange(len(band)), bins]
+        padded = np.pad(level, PEAK_NEIGHBORHOOD, constant_values=-np.inf)
+        window = np.lib.stride_tricks.sliding_window_view(padded, 2 * PEAK_NEIGHBORHOOD + 1)
+        is_peak = (level >= window.max(axis=1)) & (level > frame_mean + PEAK_MIN_PROMINENCE)
+        for frame in np.flatnonzero(is_peak):
+            peaks.append((int(frame), int(bins[frame]) + low))
+    peaks.sort()
+
+    hashes = []
+    for i, (anchor_frame, anchor_bin) in enumerate(peaks):
+        paired = 0
+        for target_frame, target_bin in peaks[i + 1:]:
+            distance = target_frame - anchor_frame
+            if distance == 0:
+                continue
+            if distance > MAX_PAIR_FRAMES or paired >= FAN_OUT:
+                break
+            hashes.append(((anchor_bin << 16) | (target_bin << 6) | distance, start_frame + anchor_frame))
+            paired += 1
+
+    if not hashes:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.array(hashes, dtype=np.int64), axis=0)
+
+class FingerprintIndex:
+    """SQLite-backed landmark index: which stored recording does this audio match?"""
+
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH, min_matches: int = 25, min_match_ratio: float = 0.2,
+                 min_coverage: float = MIN_MATCH_COVERAGE):
+        """
+        Args:
+            db_path: SQLite file holding the index
+            min_matches: Time-aligned hash matches needed to call two recordings the same
+            min_match_ratio: ...the share of the query's hashes they must make up
+            min_coverage: ...and the share of the query's duration they must span
+        """
+        self.db_path = db_path
+        self.min_matches = min_matches
+        self.min_match_ratio = min_match_ratio
+        self.min_coverage = min_coverage
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(FINGERPRINT_SCHEMA_SQL)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def add(self, video_id: str, fingerprint: np.ndarray):
+        """Store (or replace) the fingerprint of a transcribed recording"""
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT id FROM fingerprinted_media WHERE video_id = ?", (video_id,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM fingerprint_hashes WHERE media_id = ?", (row[0],))
+                conn.execute("UPDATE fingerprinted_media SET hash_count = ?, created_at = ? WHERE id = ?",
+                             (len(fingerprint), time.time(), row[0]))
+                media_id = row[0]
+            else:
+                media_id = conn.execute(
+                    "INSERT INTO fingerprinted_media (video_id, hash_count, created_at) VALUES (?, ?, ?)",
+                    (video_id, len(fingerprint), time.time())
+                ).lastrowid
+            conn.executemany(
+                "INSERT INTO fingerprint_hashes (hash, media_id, frame) VALUES (?, ?, ?)",
+                ((int(h), media_id, int(frame)) for h, frame in fingerprint)
+            )
+
+    def match(self, fingerprint: np.ndarray, exclude_video_id: Optional[str] = None) -> Optional[Tuple[str, Dict]]:
+        """
+        Best stored recording matching this fingerprint
+
+        Matching hashes only count when they agree on one time offset, so
+        a shifted start still matches while chance collisions don't, and
+        they must be spread over most of the query's duration, so a shared
+        intro alone doesn't match.
+
+        Returns:
+            (video_id, {'matches', 'match_ratio', 'coverage', 'offset_seconds'}) or None
+        """
+        if len(fingerprint) == 0:
+            return None
+        query_frames = defaultdict(list)
+        for h, frame in fingerprint:
+            query_frames[int(h)].append(int(frame))
+
+        # media_id -> offset -> query frames of the hashes agreeing on that offset
+        offsets = defaultdict(lambda: defaultdict(list))
+        hashes = list(query_frames)
+        with self._connect() as conn:
+            excluded = conn.execute("SELECT id FROM fingerprinted_media WHERE video_id = ?", (exclude_video_id,)).fetchone()
+            excluded_id = excluded[0] if excluded else None
+            for start in range(0, len(hashes), 500):
+                batch = hashes[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT hash, media_id, frame FROM fingerprint_hashes WHERE hash IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                for h, media_id, frame in rows:
+                    if media_id == excluded_id:
+                        continue
+                    for query_frame in query_frames[h]:
+                        offsets[media_id][frame - query_frame].append(query_frame)
+
+            best = None
+            for media_id, aligned in offsets.items():
+                # Re-encoding can shift peaks by a frame, so neighbouring offsets pool their votes
+                offset, count = max(((o, len(frames) + len(aligned.get(o + 1, ()))) for o, frames in aligned.items()),
+                                    key=lambda oc: oc[1])
+                if best is None or count > best[2]:
+                    best = (media_id, offset, count, aligned[offset] + aligned.get(offset + 1, []))
+            if best is None:
+                return None
+
+            media_id, offset, count, matched_frames = best
+            ratio = count / len(fingerprint)
+            query_buckets = set((fingerprint[:, 1] // COVERAGE_BUCKET_FRAMES).tolist())
+            coverage = len({frame // COVERAGE_BUCKET_FRAMES for frame in matched_frames}) / len(query_buckets)
+            if count < self.min_matches or ratio < self.min_match_ratio or coverage < self.min_coverage:
+                return None
+            row = conn.execute("SELECT video_id FROM fingerprinted_media WHERE id = ?", (media_id,)).fetchone()
+
+        if not row:
+            return None
+        return row[0], {'matches': count, 'match_ratio': ratio, 'coverage': coverage,
+                        'offset_seconds': offset * HOP_SIZE / SAMPLING_RATE}
+
+    def remove(self, video_id: str):
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT id FROM fingerprinted_media WHERE video_id = ?", (video_id,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM fingerprint_hashes WHERE media_id = ?", (row[0],))
+                conn.execute("DELETE FROM fingerprinted_media WHERE id = ?", (row[0],))
+
+    def get_stats(self) -> Dict:
+        with self._connect() as conn:
+            media, hashes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hash_count), 0) FROM fingerprinted_media"
+            ).fetchone()
+        return {'recordings': media, 'hashes': hashes}
+
+# Global fingerprint index instance
+fingerprint_index = FingerprintIndex()
+
+def get_fingerprint_index() -> FingerprintIndex:
+    """Get global audio fingerprint index"""
+    return fingerprint_index
@@ -0,0 +1,243 @@
+"""
+Audio helpers for AI Baba transcription
+Decodes audio to 16 kHz mono float32 and finds speech regions with an
+energy-based voice activity detector, so silence and quiet intros never
+reach Whisper
+"""
+import os
+import subprocess
+from typing import List, Tuple, Dict, Iterator
+
+import numpy as np
+
+SAMPLING_RATE = 16000
+
+def load_audio(path: str, sampling_rate: int = SAMPLING_RATE) -> np.ndarray:
+    """
+    Decode any ffmpeg-readable file to a mono float32 array
+
+    Raises RuntimeError if ffmpeg is missing or cannot decode the file
+    """
+    command = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-i", path,
+        "-ac", "1", "-ar", str(sampling_rate), "-f", "f32le", "-"
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, check=True)
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg was not found; install it to decode audio")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffmpeg could not decode {path}: {e.stderr.decode(errors='ignore').strip()}")
+
+    return np.frombuffer(result.stdout, dtype=np.float32)
+
+def decode_audio(source: str, sampling_rate: int = SAMPLING_RATE, memmap_path: str = None) -> np.ndarray:
+    """
+    Decode a file or stream URL once into mono float32 samples
+
+    With memmap_path ffmpeg writes the raw samples to that file and a read-only
+    memory map of it is returned, which keeps long videos out of RAM; otherwise
+    the samples are piped straight into memory.
+
+    Raises RuntimeError if ffmpeg is missing or cannot decode the source
+    """
+    if memmap_path is None:
+        return load_audio(source, sampling_rate)
+
+    command = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", source,
+        "-ac", "1", "-ar", str(sampling_rate), "-f", "f32le", memmap_path
+    ]
+    try:
+        subprocess.run(command, capture_output=True, check=True)
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg was not found; install it to decode audio")
+    except subprocess.CalledProcessError as e:
+        release_audio_file(memmap_path)
+        raise RuntimeError(f"ffmpeg could not decode {source}: {e.stderr.decode(errors='ignore').strip()}")
+
+    if not os.path.exists(memmap_path) or os.path.getsize(memmap_path) < 4:
+        release_audio_file(memmap_path)
+        raise RuntimeError(f"ffmpeg decoded no audio from {source}")
+    return np.memmap(memmap_path, dtype=np.float32, mode='r')
+
+def close_audio(audio):
+    """Unmap a memory-mapped buffer, keeping its file"""
+    mapping = getattr(audio, '_mmap', None)
+    if isinstance(audio, np.memmap) and mapping is not None:
+        try:
+            mapping.close()  # Windows can't delete or replace a file that is still mapped
+        except (BufferError, ValueError):
+            pass
+
+def release_audio(audio):
+    """Close and delete the backing file of a memory-mapped buffer from decode_audio"""
+    if isinstance(audio, np.memmap) and audio.filename:
+        close_audio(audio)
+        release_audio_file(audio.filename)
+
+def release_audio_file(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def iter_audio_windows(source: str, window_s: float = 30.0, sampling_rate: int = SAMPLING_RATE,
+                       boundary_search_s: float = 2.0) -> Iterator[Tuple[float, np.ndarray]]:
+    """
+    Decode incrementally and yield (start_seconds, samples) windows of about window_s
+
+    source may be a file path or a stream URL; with a URL ffmpeg downloads as
+    we read, so the first window is ready long before the file would be. Each
+    window ends at the quietest point of its last boundary_search_s seconds so
+    words are rarely cut in half.
+
+    Raises RuntimeError if ffmpeg is missing or decodes nothing
+    """
+    command = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-i", source,
+        "-ac", "1", "-ar", str(sampling_rate), "-f", "f32le", "-"
+    ]
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg was not found; install it to decode audio")
+
+    window = int(window_s * sampling_rate)
+    search = min(int(boundary_search_s * sampling_rate), window // 2)
+    buffer = np.empty(0, dtype=np.float32)
+    offset = 0
+    try:
+        while True:
+            data = process.stdout.read(window * 4)
+            if data:
+                usable = len(data) - len(data) % 4
+                buffer = np.concatenate((buffer, np.frombuffer(data[:usable], dtype=np.float32)))
+
+            while len(buffer) >= window or (not data and len(buffer)):
+                split = _quietest_split(buffer[:window], search, sampling_rate) if len(buffer) >= window else len(buffer)
+                yield offset / sampling_rate, buffer[:split]
+                offset += split
+                buffer = buffer[split:]
+
+            if not data:
+                break
+
+        process.wait()
+        if offset == 0:
+            error = process.stderr.read().decode(errors='ignore').strip()
+            raise RuntimeError(f"ffmpeg decoded no audio from {source}: {error or 'empty stream'}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+def split_at_quiet_points(audio: np.ndarray, chunk_s: float, sampling_rate: int = SAMPLING_RATE,
+                          boundary_search_s: float = 2.0) -> List[Tuple[int, int]]:
+    """(start_sample, end_sample) chunks of about chunk_s, each ending at a quiet frame"""
+    chunk = int(chunk_s * sampling_rate)
+    search = min(int(boundary_search_s * sampling_rate), chunk // 2)
+    spans = []
+    start = 0
+    while start < len(audio):
+        if len(audio) - start <= chunk:
+            end = len(audio)
+        else:
+            end = start + _quietest_split(audio[start:start + chunk], search, sampling_rate)
+        spans.append((start, end))
+        start = end
+    return spans
+
+def _quietest_split(samples: np.ndarray, search: int, sampling_rate: int) -> int:
+    """Index of the lowest-energy 20 ms frame in the last search samples"""
+    frame = int(sampling_rate * 0.02)
+    tail = samples[len(samples) - search:]
+    frame_count = len(tail) // frame
+    if frame_count == 0:
+        return len(samples)
+    energy = np.mean(tail[:frame_count * frame].reshape(frame_count, frame) ** 2, axis=1)
+    return len(samples) - search + int(np.argmin(energy)) * frame + frame // 2
+
+def detect_speech_regions(audio: np.ndarray, sampling_rate: int = SAMPLING_RATE,
+                          frame_ms: int = 30, threshold_db: float = 12.0,
+                          min_speech_s: float = 0.3, min_silence_s: float = 1.0,
+                          pad_s: float = 0.25) -> List[Tuple[float, float]]:
+    """
+    Energy-based voice activity detection
+
+    A frame counts as speech when its RMS level is threshold_db above the
+    estimated noise floor (10th percentile of frame levels). Gaps shorter than
+    min_silence_s are bridged so sentences aren't split mid-pause.
+
+    Args:
+        audio: Mono float32 samples
+        sampling_rate: Sample rate of audio
+        frame_ms: Analysis frame length in milliseconds
+        threshold_db: Level above the noise floor that counts as speech
+        min_speech_s: Drop speech regions shorter than this
+        min_silence_s: Merge regions separated by less than this
+        pad_s: Padding added around each region
+
+    Returns:
+        List of (start_seconds, end_seconds) speech regions
+    """
+    frame_length = int(sampling_rate * frame_ms / 1000)
+    frame_count = len(audio) // frame_length
+    if frame_count == 0:
+        return []
+
+    frames = audio[:frame_count * frame_length].reshape(frame_count, frame_length)
+    rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+    level_db = 20 * np.log10(rms + 1e-10)
+
+    noise_floor = np.percentile(level_db, 10)
+    # Never treat near-digital-silence as speech, even in very quiet recordings
+    is_speech = level_db > max(noise_floor + threshold_db, -60.0)
+
+    # Frame runs -> (start, end) in seconds
+    frame_s = frame_length / sampling_rate
+    edges = np.diff(np.concatenate(([0], is_speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1) * frame_s
+    ends = np.flatnonzero(edges == -1) * frame_s
+
+    regions = []
+    for start, end in zip(starts, ends):
+        if regions and start - regions[-1][1] < min_silence_s:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+
+    duration = len(audio) / sampling_rate
+    return [
+        (float(max(0.0, start - pad_s)), float(min(duration, end + pad_s)))
+        for start, end in regions
+        if end - start >= min_speech_s
+    ]
+
+def is_silent(audio: np.ndarray, sampling_rate: int = SAMPLING_RATE, frame_ms: int = 30,
+              threshold_db: float = -45.0, min_loud_fraction: float = 0.02) -> bool:
+    """
+    True when almost no frame rises above an absolute level
+
+    Unlike detect_speech_regions this needs no noise floor, so it is safe on
+    short windows that may be all speech or all silence.
+    """
+    frame_length = int(sampling_rate * frame_ms / 1000)
+    frame_count = len(audio) // frame_length
+    if frame_count == 0:
+        return True
+
+    frames = audio[:frame_count * frame_length].reshape(frame_count, frame_length)
+    level_db = 20 * np.log10(np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1)) + 1e-10)
+    return np.mean(level_db > threshold_db) < min_loud_fraction
+
+def speech_coverage(regions: List[Tuple[float, float]], duration: float) -> Dict:
+    """Summary of how much audio the regions keep"""
+    speech_seconds = sum(end - start for start, end in regions)
+    return {
+        'audio_seconds': duration,
+        'speech_seconds': speech_seconds,
+        'skipped_seconds': max(0.0, duration - speech_seconds),
+        'skipped_fraction': max(0.0, 1 - speech_seconds / duration) if duration else 0.0,
+        'regions': len(regions)
+    }
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+ASR profile benchmark for AI Baba
+Transcribes a local audio file with each ASR profile and reports load time,
+real-time factor (transcription seconds / audio seconds) and, when a reference
+transcript is given, word error rate. With --workers it also reports real-time factor
+against the number of ASR worker processes
+
+Usage:
+    python benchmark_asr.py --audio talk.wav --reference talk.txt --profiles fast balanced
+    python benchmark_asr.py --audio talk.wav --profiles fast --workers 1 2 4 8
+"""
+import os
+import re
+import sys
+import time
+import argparse
+from typing import List, Dict, Optional
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.asr_models import ASRModelRegistry, ASR_PROFILES, ASR_PROFILE_ORDER, select_asr_profile
+from utils.audio_utils import SAMPLING_RATE, load_audio
+from utils.parallel_asr import ParallelASR
+
+GENERATION_PARAMS = {'chunk_length_s': 30, 'stride_length_s': 5, 'task': 'transcribe', 'language': 'en'}
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercase, strip punctuation and split so formatting doesn't count as errors"""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """(substitutions + deletions + insertions) / reference words"""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+def run_profile(profile_name: str, audio, reference: Optional[str], device: int) -> Dict:
+    profile = ASR_PROFILES[profile_name]
+    # A private registry so every profile pays its own load cost
+    registry = ASRModelRegistry()
+
+    start = time.perf_counter()
+    asr = registry.get_pipeline(profile['model_name'], device=device, quantize=profile['quantize'])
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = asr(
+        {'raw': audio, 'sampling_rate': SAMPLING_RATE},
+        chunk_length_s=GENERATION_PARAMS['chunk_length_s'],
+        stride_length_s=GENERATION_PARAMS['stride_length_s'],
+        generate_kwargs={"task": GENERATION_PARAMS['task'], "language": GENERATION_PARAMS['language']}
+    )
+    transcribe_seconds = time.perf_counter() - start
+
+    text = result["text"] if isinstance(result, dict) else str(result)
+    audio_seconds = len(audio) / SAMPLING_RATE
+    return {
+        'profile': profile_name,
+        'model_name': profile['model_name'],
+        'quantized': profile['quantize'] and device == -1,
+        'load_seconds': load_seconds,
+        'rtf': transcribe_seconds / audio_seconds if audio_seconds else float('inf'),
+        'wer': word_error_rate(reference, text) if reference is not None else None,
+        'text': text.strip()
+    }
+
+def run_workers(profile_name: str, audio, reference: Optional[str], workers: int) -> Dict:
+    """Transcribe on a fresh pool of worker processes (CPU); model loading is timed separately"""
+    profile = ASR_PROFILES[profile_name]
+    parallel = ParallelASR(workers)
+    try:
+        load_seconds = parallel.warm_up(profile['model_name'], profile['quantize'], GENERATION_PARAMS)
+
+        start = time.perf_counter()
+        text, _ = parallel.transcribe(audio, profile['model_name'], profile['quantize'], GENERATION_PARAMS)
+        transcribe_seconds = time.perf_counter() - start
+    finally:
+        parallel.shutdown()
+
+    audio_seconds = len(audio) / SAMPLING_RATE
+    return {
+        'workers': workers,
+        'threads_per_worker': parallel.threads_per_worker,
+        'load_seconds': load_seconds,
+        'rtf': transcribe_seconds / audio_seconds if audio_seconds else float('inf'),
+        'wer': word_error_rate(reference, text) if reference is not None else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AI Baba ASR profiles")
+    parser.add_argument("--audio", required=True, help="Local audio file (anything ffmpeg can decode)")
+    parser.add_argument("--reference", help="Text file with the reference transcript for WER")
+    parser.add_argument("--profiles", nargs="+", default=ASR_PROFILE_ORDER, choices=ASR_PROFILE_ORDER)
+    parser.add_argument("--seconds", type=float, help="Only benchmark the first N seconds of audio")
+    parser.add_argument("--device", type=int, default=-1, help="-1 for CPU, or a CUDA device index")
+    parser.add_argument("--workers", type=int, nargs="+", help="Also benchmark these ASR worker process counts (CPU)")
+    args = parser.parse_args()
+
+    audio = load_audio(args.audio)
+    if args.seconds:
+        audio = audio[:int(args.seconds * SAMPLING_RATE)]
+    reference = None
+    if args.reference:
+        with open(args.reference, encoding='utf-8') as f:
+            reference = f.read()
+
+    audio_seconds = len(audio) / SAMPLING_RATE
+    print(f"🎧 ASR benchmark: {audio_seconds:.0f}s of audio, {os.cpu_count()} CPU cores")
+    print(f"Auto profile for this clip: {select_asr_profile(audio_seconds, cuda_available=args.device >= 0)}")
+    print("=" * 72)
+    print(f"{'profile':<10} {'model':<34} {'int8':>5} {'load s':>8} {'RTF':>7} {'WER':>7}")
+
+    for profile_name in args.profiles:
+        try:
+            r = run_profile(profile_name, audio, reference, args.device)
+            wer = f"{r['wer']:.1%}" if r['wer'] is not None else "-"
+            print(f"{r['profile']:<10} {r['model_name']:<34} {'yes' if r['quantized'] else 'no':>5} "
+                  f"{r['load_seconds']:>8.1f} {r['rtf']:>7.2f} {wer:>7}")
+        except Exception as e:
+            print(f"{profile_name:<10} skipped: {e}")
+
+    if not args.workers:
+        return
+    for profile_name in args.profiles:
+        print("=" * 72)
+        print(f"Worker scaling for {profile_name} ({ASR_PROFILES[profile_name]['model_name']})")
+        print(f"{'workers':>8} {'threads':>8} {'load s':>8} {'RTF':>7} {'speedup':>8} {'WER':>7}")
+        baseline = None
+        for workers in args.workers:
+            try:
+                r = run_workers(profile_name, audio, reference, workers)
+            except Exception as e:
+                print(f"{workers:>8} skipped: {e}")
+                continue
+            baseline = baseline or r['rtf']
+            wer = f"{r['wer']:.1%}" if r['wer'] is not None else "-"
+            print(f"{r['workers']:>8} {r['threads_per_worker']:>8} {r['load_seconds']:>8.1f} {r['rtf']:>7.2f} "
+                  f"{baseline / r['rtf'] if r['rtf'] else 0:>7.1f}x {wer:>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Storage backend benchmark for AI Baba
+Compares insert and scan throughput of the available storage backends on a
+scratch table filled with synthetic advice rows
+
+Usage:
+    python benchmark_storage.py --rows 5000 --backends sqlite postgres
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import datetime
+import tempfile
+from typing import List, Dict
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from admin_system.storage_backends import create_storage_backend
+
+BENCH_TABLE = "advice_dataset_bench"
+
+WORDS = (
+    "mind peace anxiety silence awareness breath love fear anger joy meditation "
+    "acceptance surrender desire ego attachment freedom trust compassion presence"
+).split()
+
+def make_rows(count: int, text_words: int) -> List[Dict]:
+    """Synthetic rows shaped like real advice entries"""
+    rng = random.Random(42)
+    now = datetime.datetime.utcnow().isoformat()
+    rows = []
+    for i in range(count):
+        text = " ".join(rng.choice(WORDS) for _ in range(text_words))
+        rows.append({
+            'category': rng.choice(["Emotional Support", "Spiritual / Philosophical", "Motivation & Self-Growth"]),
+            'subcategories': "Stress,Anxiety",
+            'information': text,
+            'original_text': text,
+            'confidence_score': rng.random(),
+            'processing_metadata': {'benchmark': True, 'index': i},
+            'admin_confirmed': True,
+            'created_at': now,
+            'updated_at': now
+        })
+    return rows
+
+def drop_bench_table(backend):
+    """Remove the scratch table so runs start clean"""
+    if backend.name == 'sqlite':
+        conn = backend._conn()
+        conn.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        conn.commit()
+    elif backend.name == 'postgres':
+        with backend._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+
+def run_backend(name: str, rows: List[Dict], batch_size: int, single_inserts: int) -> Dict:
+    kwargs = {'table_name': BENCH_TABLE}
+    if name == 'sqlite':
+        kwargs['db_path'] = os.path.join(tempfile.gettempdir(), "ai_baba_bench.db")
+    backend = create_storage_backend(name, **kwargs)
+    backend.connect()
+    drop_bench_table(backend)
+    backend.ensure_schema()
+
+    results = {'backend': name}
+    try:
+        # Row-at-a-time inserts (what the admin save path does)
+        sample = rows[:single_inserts]
+        start = time.perf_counter()
+        for row in sample:
+            backend.insert(row)
+        elapsed = time.perf_counter() - start
+        results['single_insert_rows_per_s'] = len(sample) / elapsed if elapsed else float('inf')
+
+        # Batched inserts (batch_insert / COPY path)
+        start = time.perf_counter()
+        for i in range(0, len(rows), batch_size):
+            backend.insert_many(rows[i:i + batch_size])
+        elapsed = time.perf_counter() - start
+        results['batch_insert_rows_per_s'] = len(rows) / elapsed if elapsed else float('inf')
+
+        # Full scan
+        start = time.perf_counter()
+        scanned = sum(1 for _ in backend.scan(batch_size=1000))
+        elapsed = time.perf_counter() - start
+        results['scan_rows_per_s'] = scanned / elapsed if elapsed else float('inf')
+        results['rows_scanned'] = scanned
+    finally:
+        drop_bench_table(backend)
+        backend.close()
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AI Baba storage backends")
+    parser.add_argument("--rows", type=int, default=5000, help="Rows to bulk insert")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per insert_many call")
+    parser.add_argument("--single-inserts", type=int, default=200, help="Rows inserted one at a time")
+    parser.add_argument("--text-words", type=int, default=120, help="Words per synthetic entry")
+    parser.add_argument("--backends", nargs="+", default=["sqlite", "postgres"],
+                        help="Backends to compare (supabase needs an existing advice_dataset_bench table)")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, args.text_words)
+    print(f"📊 Storage benchmark: {args.rows} rows, batch size {args.batch_size}")
+    print("=" * 72)
+    print(f"{'backend':<10} {'single ins/s':>14} {'batch ins/s':>14} {'scan rows/s':>14}")
+
+    for name in args.backends:
+        try:
+            r = run_backend(name, rows, args.batch_size, args.single_inserts)
+            print(f"{r['backend']:<10} {r['single_insert_rows_per_s']:>14,.0f} "
+                  f"{r['batch_insert_rows_per_s']:>14,.0f} {r['scan_rows_per_s']:>14,.0f}")
+        except Exception as e:
+            print(f"{name:<10} skipped: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+BM25 keyword index for AI Baba admin search
+An inverted index (term -> entry ids with term frequencies) kept in SQLite
+tables, so it is persisted, updated one entry at a time and queried without
+touching the advice database
+"""
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# Terms in more than this share of entries add little to the ranking but most of
+# the postings to read, so they are left out of queries that have rarer terms
+MAX_QUERY_TERM_SHARE = 0.25
+
+BM25_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS bm25_postings (
+    term TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_bm25_postings_id ON bm25_postings (id);
+CREATE TABLE IF NOT EXISTS bm25_docs (
+    id INTEGER PRIMARY KEY,
+    length INTEGER NOT NULL
+);
+"""
+
+class BM25Index:
+    """
+    Okapi BM25 over the bm25_* tables of a SQLite file
+
+    Writes take the caller's connection, so postings change in the same
+    transaction as whatever else the caller stores about the entry.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # (document count, average length), recomputed after writes
+        self._corpus_stats = None
+
+    @staticmethod
+    def ensure_schema(conn):
+        conn.executescript(BM25_SCHEMA_SQL)
+
+    def add(self, conn, entry_id: int, tokens: List[str]):
+        """Index (or re-index) one entry from its tokens"""
+        self.remove(conn, [entry_id])
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        conn.executemany(
+            "INSERT INTO bm25_postings (term, id, tf) VALUES (?, ?, ?)",
+            [(term, entry_id, tf) for term, tf in counts.items()]
+        )
+        conn.execute("INSERT INTO bm25_docs (id, length) VALUES (?, ?)", (entry_id, len(tokens)))
+        self._corpus_stats = None
+
+    def remove(self, conn, entry_ids: Iterable[int]):
+        rows = [(entry_id,) for entry_id in entry_ids]
+        conn.executemany("DELETE FROM bm25_postings WHERE id = ?", rows)
+        conn.executemany("DELETE FROM bm25_docs WHERE id = ?", rows)
+        self._corpus_stats = None
+
+    def _stats(self, conn) -> Tuple[int, float]:
+        if self._corpus_stats is None:
+            count, average = conn.execute("SELECT COUNT(*), AVG(length) FROM bm25_docs").fetchone()
+            self._corpus_stats = (count, average or 0.0)
+        return self._corpus_stats
+
+    def search(self, conn, tokens: List[str], limit: int = 100) -> List[Tuple[int, float]]:
+        """
+        Entries ranked by BM25 for the query tokens
+
+        Returns:
+            [(entry_id, score), ...] best first
+        """
+        terms = list(dict.fromkeys(tokens))
+        doc_count, average_length = self._stats(conn)
+        if not terms or not doc_count:
+            return []
+
+        doc_freq = dict(conn.execute(
+            f"SELECT term, COUNT(*) FROM bm25_postings WHERE term IN ({','.join('?' * len(terms))}) GROUP BY term",
+            terms
+        ).fetchall())
+        if not doc_freq:
+            return []
+        rare = [term for term, df in doc_freq.items() if df <= MAX_QUERY_TERM_SHARE * doc_count]
+        terms = rare or [min(doc_freq, key=doc_freq.get)]
+
+        rows = conn.execute(
+            f"SELECT p.term, p.id, p.tf, d.length FROM bm25_postings p JOIN bm25_docs d ON d.id = p.id "
+            f"WHERE p.term IN ({','.join('?' * len(terms))})",
+            terms
+        ).fetchall()
+        if not rows:
+            return []
+
+        ids = np.array([row[1] for row in rows], dtype=np.int64)
+        tf = np.array([row[2] for row in rows], dtype=np.float32)
+        lengths = np.array([row[3] for row in rows], dtype=np.float32)
+        df = np.array([doc_freq[row[0]] for row in rows], dtype=np.float32)
+
+        idf = np.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+        norm = self.k1 * (1 - self.b + self.b * lengths / max(average_length, 1e-9))
+        contributions = idf * tf * (self.k1 + 1) / (tf + norm)
+
+        unique_ids, id_index = np.unique(ids, return_inverse=True)
+        scores = np.bincount(id_index, weights=contributions)
+        top = np.argsort(-scores)[:limit]
+        return [(int(unique_ids[i]), float(scores[i])) for i in top]
@@ -1,57 +1,73 @@
 """
 Database operations for AI Baba admin system
-Handles all Supabase operations for advice dataset management
+Handles all advice dataset operations through a pluggable storage backend
+(Supabase by default, direct Postgres or local SQLite via STORAGE_BACKEND)
 """
 import os
 import json
 import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 import pandas as pd
 import sys
 
 # Add config path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.supabase_config import get_supabase_client, ADVICE_DATASET_SCHEMA
+from config.supabase_config import ADVICE_DATASET_SCHEMA
 from utils.categories import format_subcategories_string, parse_subcategories_string
+from admin_system.storage_backends import StorageBackend, create_storage_backend
+
+# Columns needed by admin list views; 'preview' is computed by the server
+LIST_VIEW_COLUMNS = ['id', 'category', 'subcategories', 'admin_confirmed', 'created_at', 'preview']
 
 class DatabaseManager:
     """Manages all database operations for the advice dataset"""
     
-    def __init__(self):
-        self.client = None
+    def __init__(self, backend: StorageBackend = None):
         self.table_name = ADVICE_DATASET_SCHEMA['table_name']
+        self.backend = backend
+        self._connected = False
+        # Flipped off the first time the backend lacks the full-text index
+        self.fulltext_available = True
         
     def get_client(self):
-        """Get Supabase client with error handling"""
-        if self.client is None:
+        """Connect the storage backend with error handling"""
+        if not self._connected:
             try:
-                self.client = get_supabase_client()
+                if self.backend is None:
+                    self.backend = create_storage_backend(table_name=self.table_name)
+                self.backend.connect()
+                self._connected = True
                 return True
             except Exception as e:
-                print(f"Error connecting to Supabase: {e}")
+                print(f"Error connecting to {self.backend_name} storage backend: {e}")
                 return False
         return True
     
+    @property
+    def backend_name(self) -> str:
+        """Name of the active storage backend"""
+        return self.backend.name if self.backend is not None else "unknown"
+    
     def test_connection(self) -> Tuple[bool, str]:
         """Test database connection"""
         if not self.get_client():
-            return False, "Failed to initialize Supabase client"
+            return False, f"Failed to initialize {self.backend_name} storage backend"
         
         try:
             # Simple query to test connection
-            result = self.client.table(self.table_name).select('id').limit(1).execute()
-            return True, "Connection successful"
+            self.backend.ping()
+            return True, f"Connection successful ({self.backend_name})"
         except Exception as e:
             return False, f"Connection test failed: {str(e)}"
     
     def create_table_if_not_exists(self) -> Tuple[bool, str]:
         """Create the advice_dataset table if it doesn't exist"""
         if not self.get_client():
-            return False, "Failed to initialize Supabase client"
+            return False, f"Failed to initialize {self.backend_name} storage backend"
         
         try:
-            # Check if table exists by trying to query it
-            self.client.table(self.table_name).select('id').limit(1).execute()
+            # Create the table where the backend can, otherwise probe for it
+            self.backend.ensure_schema()
             return True, "Table already exists"
         except Exception as e:
             # Table doesn't exist, needs to be created manually in Supabase dashboard
@@ -95,7 +111,7 @@ class DatabaseManager:
             (success, message, inserted_id)
         """
         if not self.get_client():
-            return False, "Failed to initialize Supabase client", None
+            return False, f"Failed to initialize {self.backend_name} storage backend", None
         
         try:
             # Prepare data for insertion
@@ -112,10 +128,10 @@ class DatabaseManager:
             }
             
             # Insert data
-            result = self.client.table(self.table_name).insert(data).execute()
+            inserted = self.backend.insert(data)
             
-            if result.data:
-                inserted_id = result.data[0]['id']
+            if inserted:
+                inserted_id = inserted['id']
                 return True, f"Successfully inserted entry with ID {inserted_id}", inserted_id
             else:
                 return False, "Insert operation completed but no data returned", None
@@ -127,54 +143,54 @@ class DatabaseManager:
                    limit: int = 50, 
                    offset: int = 0,
                    category_filter: str = None,
-                   confirmed_only: bool = True) -> Tuple[bool, str, List[Dict]]:
+                   confirmed_only: bool = True,
+                   columns: List[str] = None) -> Tuple[bool, str, List[Dict]]:
         """
         Retrieve advice entries from database
         
+        Args:
+            columns: Columns to fetch (default all). Leaving out original_text and
+                     processing_metadata keeps large pages small.
+        
         Returns:
             (success, message, entries_list)
         """
         if not self.get_client():
-            return False, "Failed to initialize Supabase client", []
+            return False, f"Failed to initialize {self.backend_name} storage backend", []
         
         try:
-            query = self.client.table(self.table_name).select('*')
-            
             # Apply filters
+            filters = {}
             if confirmed_only:
-                query = query.eq('admin_confirmed', True)
+                filters['admin_confirmed'] = True
             
             if category_filter:
-                query = query.eq('category', category_filter)
-            
-            # Apply pagination
-            query = query.range(offset, offset + limit - 1).order('created_at', desc=True)
+                filters['category'] = category_filter
             
-            result = query.execute()
+            entries = self.backend.select(filters, limit=limit, offset=offset, columns=columns)
             
-            if result.data:
+            if entries:
                 # Parse subcategories strings back to lists
-                for entry in result.data:
-                    entry['subcategories_list'] = parse_subcategories_string(entry['subcategories'])
+                for entry in entries:
+                    self._add_subcategories_list(entry)
                 
-                return True, f"Retrieved {len(result.data)} entries", result.data
+                return True, f"Retrieved {len(entries)} entries", entries
             else:
                 return True, "No entries found", []
                 
         except Exception as e:
             return False, f"Error retrieving entries: {str(e)}", []
     
-    def get_entry_by_id(self, entry_id: int) -> Tuple[bool, str, Optional[Dict]]:
-        """Get a specific entry by ID"""
+    def get_entry_by_id(self, entry_id: int, columns: List[str] = None) -> Tuple[bool, str, Optional[Dict]]:
+        """Get a specific entry by ID, optionally fetching only some columns"""
         if not self.get_client():
-            return False, "Failed to initialize Supabase client", None
+            return False, f"Failed to initialize {self.backend_name} storage backend", None
         
         try:
-            result = self.client.table(self.table_name).select('*').eq('id', entry_id).execute()
+            entry = self.backend.get(entry_id, columns=columns)
             
-            if result.data:
-                entry = result.data[0]
-                entry['subcategories_list'] = parse_subcategories_string(entry['subcategories'])
+            if entry:
+                self._add_subcategories_list(entry)
                 return True, "Entry found", entry
             else:
                 return False, f"No entry found with ID {entry_id}", None
@@ -190,7 +206,7 @@ class DatabaseManager:
                     admin_confirmed: bool = None) -> Tuple[bool, str]:
         """Update an existing entry"""
         if not self.get_client():
-            return False, "Failed to initialize Supabase client"
+            return False, f"Failed to initialize {self.backend_name} storage backend"
         
         try:
             # Prepare update data
@@ -207,9 +223,7 @@ class DatabaseManager:
             if admin_confirmed is not None:
                 update_data['admin_confirmed'] = admin_confirmed
             
-            result = self.client.table(self.table_name).update(update_data).eq('id', entry_id).execute()
-            
-            if result.data:
+            if self.backend.update(entry_id, update_data):
                 return True, f"Successfully updated entry {entry_id}"
             else:
                 return False, f"No entry found with ID {entry_id} to update"
@@ -220,12 +234,10 @@ class DatabaseManager:
     def delete_entry(self, entry_id: int) -> Tuple[bool, str]:
         """Delete an entry by ID"""
         if not self.get_client():
-            return False, "Failed to initialize Supabase client"
+            return False, f"Failed to initialize {self.backend_name} storage backend"
         
         try:
-            result = self.client.table(self.table_name).delete().eq('id', entry_id).execute()
-            
-            if result.data:
+            if self.backend.delete(entry_id):
                 return True, f"Successfully deleted entry {entry_id}"
             else:
                 return False, f"No entry found with ID {entry_id} to delete"
@@ -236,24 +248,17 @@ class DatabaseManager:
     def get_statistics(self) -> Tuple[bool, str, Dict]:
         """Get database statistics"""
         if not self.get_client():
-            return False, "Failed to initialize Supabase client", {}
+            return False, f"Failed to initialize {self.backend_name} storage backend", {}
         
         try:
             # Get total count
-            total_result = self.client.table(self.table_name).select('id', count='exact').execute()
-            total_count = total_result.count if hasattr(total_result, 'count') else 0
+            total_count = self.backend.count()
             
             # Get confirmed count
-            confirmed_result = self.client.table(self.table_name).select('id', count='exact').eq('admin_confirmed', True).execute()
-            confirmed_count = confirmed_result.count if hasattr(confirmed_result, 'count') else 0
+            confirmed_count = self.backend.count({'admin_confirmed': True})
             
             # Get category distribution
-            categories_result = self.client.table(self.table_name).select('category').execute()
-            categories = [entry['category'] for entry in categories_result.data] if categories_result.data else []
-            
-            category_counts = {}
-            for cat in categories:
-                category_counts[cat] = category_counts.get(cat, 0) + 1
+            category_counts = self.backend.category_counts()
             
             stats = {
                 'total_entries': total_count,
@@ -268,30 +273,147 @@ class DatabaseManager:
         except Exception as e:
             return False, f"Error getting statistics: {str(e)}", {}
     
-    def search_entries(self, search_term: str, limit: int = 20) -> Tuple[bool, str, List[Dict]]:
-        """Search entries by text content"""
+    def search_entries(self, search_term: str, limit: int = 20, columns: List[str] = None) -> Tuple[bool, str, List[Dict]]:
+        """
+        Search entries by text content
+        
+        Uses the ranked full-text index (add_fulltext_search.sql) when present,
+        falling back to case-insensitive substring matching when the index is
+        missing or finds nothing (e.g. partial words).
+        
+        Returns:
+            (success, message, entries_list) - best matches first when ranked
+        """
         if not self.get_client():
-            return False, "Failed to initialize Supabase client", []
+            return False, f"Failed to initialize {self.backend_name} storage backend", []
         
         try:
-            # Search in both cleaned text and original text
-            query = self.client.table(self.table_name).select('*')
+            results = []
+            ranked = False
             
-            # Use ilike for case-insensitive search (PostgreSQL)
-            result = query.or_(f"information.ilike.%{search_term}%,original_text.ilike.%{search_term}%").limit(limit).execute()
+            if self.fulltext_available:
+                try:
+                    results = self.backend.search_ranked(search_term, limit=limit, columns=columns)
+                    ranked = bool(results)
+                except NotImplementedError:
+                    self.fulltext_available = False
+                except Exception as e:
+                    print(f"Full-text search failed, using substring search: {e}")
+                    # Only stop trying when the migration hasn't been applied
+                    if any(marker in str(e) for marker in ('search_advice', 'search_vector', 'PGRST202')):
+                        self.fulltext_available = False
             
-            if result.data:
+            if not results:
+                # Case-insensitive search in both cleaned text and original text
+                results = self.backend.search(search_term, limit=limit, columns=columns)
+            
+            if results:
                 # Parse subcategories strings back to lists
-                for entry in result.data:
-                    entry['subcategories_list'] = parse_subcategories_string(entry['subcategories'])
+                for entry in results:
+                    self._add_subcategories_list(entry)
                 
-                return True, f"Found {len(result.data)} matching entries", result.data
+                method = "ranked full-text" if ranked else "substring"
+                return True, f"Found {len(results)} matching entries ({method})", results
             else:
                 return True, "No matching entries found", []
                 
         except Exception as e:
             return False, f"Error searching entries: {str(e)}", []
     
+    def get_entry_list(self,
+                       limit: int = 50,
+                       offset: int = 0,
+                       category_filter: str = None,
+                       confirmed_only: bool = True,
+                       preview_length: int = 80) -> Tuple[bool, str, List[Dict]]:
+        """
+        Lightweight listing for admin tables: id, category, subcategories,
+        status, date and a short server-computed text preview
+        
+        Returns:
+            (success, message, entries_list)
+        """
+        success, message, entries = self.get_entries(
+            limit=limit, offset=offset, category_filter=category_filter,
+            confirmed_only=confirmed_only, columns=LIST_VIEW_COLUMNS
+        )
+        return success, message, [self._trim_preview(entry, preview_length) for entry in entries]
+    
+    def search_entry_list(self, search_term: str, limit: int = 20, preview_length: int = 80) -> Tuple[bool, str, List[Dict]]:
+        """Search returning list-view rows (see get_entry_list)"""
+        success, message, entries = self.search_entries(search_term, limit=limit, columns=LIST_VIEW_COLUMNS)
+        return success, message, [self._trim_preview(entry, preview_length) for entry in entries]
+    
+    @staticmethod
+    def _trim_preview(entry: Dict, preview_length: int) -> Dict:
+        preview = entry.get('preview') or ''
+        entry['preview'] = preview[:preview_length] + '...' if len(preview) > preview_length else preview
+        return entry
+    
+    @staticmethod
+    def _add_subcategories_list(entry: Dict):
+        if 'subcategories' in entry:
+            entry['subcategories_list'] = parse_subcategories_string(entry['subcategories'])
+    
+    def scan_entries(self, confirmed_only: bool = True, batch_size: int = 1000) -> Iterator[Dict]:
+        """
+        Stream entries in id order without loading the table into memory
+        (used to build search indexes over the whole dataset)
+        
+        Raises:
+            RuntimeError if the storage backend can't be reached
+        """
+        if not self.get_client():
+            raise RuntimeError(f"Failed to initialize {self.backend_name} storage backend")
+        
+        for entry in self.backend.scan(batch_size=batch_size):
+            if confirmed_only and not entry.get('admin_confirmed'):
+                continue
+            self._add_subcategories_list(entry)
+            yield entry
+    
+    def get_entries_updated_since(self,
+                                  since: Optional[str],
+                                  after_id: int = 0,
+                                  limit: int = 1000,
+                                  columns: List[str] = None) -> Tuple[bool, str, List[Dict]]:
+        """
+        Entries changed after the (updated_at, id) watermark, oldest first
+        
+        Confirmed and unconfirmed entries are both returned, so an index
+        can drop entries that were un-confirmed.
+        
+        Returns:
+            (success, message, entries_list)
+        """
+        if not self.get_client():
+            return False, f"Failed to initialize {self.backend_name} storage backend", []
+        
+        try:
+            entries = self.backend.select_updated_since(since, after_id=after_id, limit=limit, columns=columns)
+            for entry in entries:
+                self._add_subcategories_list(entry)
+            return True, f"Retrieved {len(entries)} changed entries", entries
+        except Exception as e:
+            return False, f"Error retrieving changed entries: {str(e)}", []
+    
+    def get_deleted_since(self, since: Optional[str], after_id: int = 0, limit: int = 1000) -> Tuple[bool, str, List[Dict]]:
+        """
+        Ids deleted after the (deleted_at, id) watermark, oldest first
+        (needs add_change_tracking.sql on Supabase)
+        
+        Returns:
+            (success, message, [{'id', 'deleted_at'}, ...])
+        """
+        if not self.get_client():
+            return False, f"Failed to initialize {self.backend_name} storage backend", []
+        
+        try:
+            deleted = self.backend.deleted_since(since, after_id=after_id, limit=limit)
+            return True, f"Retrieved {len(deleted)} deletions", deleted
+        except Exception as e:
+            return False, f"Error retrieving deletions (run add_change_tracking.sql?): {str(e)}", []
+    
     def export_to_dataframe(self, confirmed_only: bool = True) -> Tuple[bool, str, Optional[pd.DataFrame]]:
         """Export entries to pandas DataFrame"""
         success, message, entries = self.get_entries(limit=10000, confirmed_only=confirmed_only)
@@ -311,7 +433,7 @@ class DatabaseManager:
     def batch_insert(self, entries: List[Dict]) -> Tuple[bool, str, List[int]]:
         """Insert multiple entries in batch"""
         if not self.get_client():
-            return False, "Failed to initialize Supabase client", []
+            return False, f"Failed to initialize {self.backend_name} storage backend", []
         
         if not entries:
             return True, "No entries to insert", []
@@ -334,16 +456,96 @@ class DatabaseManager:
                 batch_data.append(data)
             
             # Insert batch
-            result = self.client.table(self.table_name).insert(batch_data).execute()
+            inserted_ids = self.backend.insert_many(batch_data)
             
-            if result.data:
-                inserted_ids = [entry['id'] for entry in result.data]
+            if inserted_ids:
                 return True, f"Successfully inserted {len(inserted_ids)} entries", inserted_ids
             else:
                 return False, "Batch insert completed but no data returned", []
                 
         except Exception as e:
             return False, f"Error in batch insert: {str(e)}", []
+    
+    def insert_video_passages(self, video_id: str, passages: List[Dict], replace_existing: bool = True) -> Tuple[bool, str, List[int]]:
+        """
+        Store a transcript as one row per passage, linked by video id
+        
+        Args:
+            video_id: YouTube video id stored in source_video_id
+            passages: batch_insert-style entries plus passage_index, start_seconds and end_seconds
+            replace_existing: Remove passages previously stored for this video once the new ones are in
+        
+        Returns:
+            (success, message, inserted_ids)
+        """
+        if not self.get_client():
+            return False, f"Failed to initialize {self.backend_name} storage backend", []
+        
+        if not passages:
+            return True, "No passages to insert", []
+        
+        try:
+            old_ids = []
+            if replace_existing:
+                old_ids = [row['id'] for row in self.backend.select(
+                    filters={'source_video_id': video_id}, limit=10000, columns=['id']
+                )]
+            
+            now = datetime.datetime.utcnow().isoformat()
+            rows = [{
+                'category': passage['category'],
+                'subcategories': format_subcategories_string(passage['subcategories']),
+                'information': passage['cleaned_text'],
+                'original_text': passage.get('original_text', passage['cleaned_text']),
+                'confidence_score': passage.get('confidence_score', 0.5),
+                'processing_metadata': passage.get('processing_metadata', {}),
+                'admin_confirmed': passage.get('admin_confirmed', False),
+                'created_at': now,
+                'updated_at': now,
+                'source_video_id': video_id,
+                'passage_index': passage['passage_index'],
+                'start_seconds': passage.get('start_seconds'),
+                'end_seconds': passage.get('end_seconds')
+            } for passage in passages]
+            
+            inserted_ids = self.backend.insert_many(rows)
+            if not inserted_ids:
+                return False, "Passage insert completed but no data returned", []
+            
+            # Old passages go only after the new ones are stored
+            for old_id in old_ids:
+                self.backend.delete(old_id)
+            
+            replaced = f", replaced {len(old_ids)} earlier passages" if old_ids else ""
+            return True, f"Stored {len(inserted_ids)} passages for video {video_id}{replaced}", inserted_ids
+            
+        except Exception as e:
+            return False, f"Error storing passages: {str(e)}", []
+    
+    def get_video_passages(self, video_id: str, columns: List[str] = None) -> Tuple[bool, str, List[Dict]]:
+        """All passages stored for a video, in transcript order"""
+        if not self.get_client():
+            return False, f"Failed to initialize {self.backend_name} storage backend", []
+        
+        try:
+            passages = self.backend.select(filters={'source_video_id': video_id}, limit=10000, columns=columns)
+            passages.sort(key=lambda row: row.get('passage_index') or 0)
+            for passage in passages:
+                self._add_subcategories_list(passage)
+            return True, f"Retrieved {len(passages)} passages", passages
+        except Exception as e:
+            return False, f"Error retrieving passages: {str(e)}", []
+    
+    def delete_video_passages(self, video_id: str) -> Tuple[bool, str]:
+        """Delete every passage stored for a video"""
+        if not self.get_client():
+            return False, f"Failed to initialize {self.backend_name} storage backend"
+        
+        try:
+            deleted = self.backend.delete_where({'source_video_id': video_id})
+            return True, f"Deleted {deleted} passages for video {video_id}"
+        except Exception as e:
+            return False, f"Error deleting passages: {str(e)}"
 
 # Global database manager instance
 db_manager = DatabaseManager()
@@ -0,0 +1,262 @@
+"""
+Multi-process ASR for AI Baba on CPU-only machines
+Splits decoded audio at quiet points into overlapping segments, transcribes
+them in a process pool whose workers are each capped to a few BLAS/OpenMP
+threads, and stitches the results back together without doubled words
+"""
+import os
+import re
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.audio_utils import SAMPLING_RATE, split_at_quiet_points
+
+# Audio each side of a boundary that both neighbouring segments transcribe
+DEFAULT_OVERLAP_SECONDS = 2.0
+# Longest run of repeated words looked for where two segments meet
+MAX_DEDUPE_WORDS = 20
+
+# Pipeline and settings of this worker process (set by _init_worker)
+_worker_asr = None
+_worker_params = None
+
+def _init_worker(model_name: str, quantize: bool, threads: int, generation_params: Dict):
+    """Process pool initializer: cap native thread pools, then load the model once"""
+    global _worker_asr, _worker_params
+    # Imported here so the parent process never pays for them on the non-parallel path
+    import torch
+    from threadpoolctl import threadpool_limits
+    from utils.asr_models import get_asr_registry
+
+    # Without the cap every worker starts one BLAS/OpenMP thread per core and they thrash
+    threadpool_limits(limits=threads)
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already fixed once any parallel work has run in this process
+
+    _worker_params = generation_params
+    _worker_asr = get_asr_registry().get_pipeline(
+        model_name,
+        torch_dtype=torch.float32,
+        device=-1,
+        model_kwargs={"use_safetensors": True},
+        quantize=quantize
+    )
+
+def _ping(delay: float = 0.2) -> int:
+    """Keeps a worker busy briefly so warm_up reaches every process"""
+    time.sleep(delay)
+    return os.getpid()
+
+def _transcribe_segment(samples: np.ndarray, offset: float) -> Tuple[str, list]:
+    """Worker task: (text, segments) for one slice, with timestamps shifted by offset seconds"""
+    result = _worker_asr(
+        {'raw': samples, 'sampling_rate': SAMPLING_RATE},
+        chunk_length_s=_worker_params['chunk_length_s'],
+        stride_length_s=_worker_params['stride_length_s'],
+        return_timestamps=True,
+        generate_kwargs={
+            "task": _worker_params['task'],
+            "language": _worker_params['language']
+        }
+    )
+    text = result["text"].strip() if isinstance(result, dict) else str(result).strip()
+    segments = []
+    if isinstance(result, dict):
+        for chunk in result.get("chunks") or []:
+            start, end = chunk.get("timestamp") or (None, None)
+            chunk_text = (chunk.get("text") or "").strip()
+            if chunk_text:
+                segments.append({
+                    'start': offset + start if start is not None else None,
+                    'end': offset + end if end is not None else None,
+                    'text': chunk_text
+                })
+    return text, segments
+
+def plan_segments(audio: np.ndarray, count: int, overlap_s: float = DEFAULT_OVERLAP_SECONDS,
+                  sampling_rate: int = SAMPLING_RATE) -> List[Dict]:
+    """
+    Split audio into at most count segments that end at quiet points
+
+    Each plan entry has the core span it owns (core_start/core_end, in
+    samples) and the wider span to transcribe (start/end), which reaches
+    overlap_s into each neighbour so words at a boundary are heard whole.
+    """
+    boundary_search_s = 2.0
+    # split_at_quiet_points cuts inside the last boundary_search_s of each chunk,
+    # so asking for slightly more than an even share keeps the count at most count
+    chunk_s = len(audio) / sampling_rate / max(1, count) + boundary_search_s
+    overlap = int(overlap_s * sampling_rate)
+    return [
+        {
+            'core_start': core_start,
+            'core_end': core_end,
+            'start': max(0, core_start - overlap),
+            'end': min(len(audio), core_end + overlap)
+        }
+        for core_start, core_end in split_at_quiet_points(audio, chunk_s, sampling_rate, boundary_search_s)
+    ]
+
+def _words(text: str) -> List[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+def overlapping_word_count(left: str, right: str, max_words: int = MAX_DEDUPE_WORDS) -> int:
+    """Length of the longest run of words that ends left and starts right"""
+    left_words, right_words = _words(left)[-max_words:], _words(right)[:max_words]
+    for size in range(min(len(left_words), len(right_words)), 0, -1):
+        if left_words[-size:] == right_words[:size]:
+            return size
+    return 0
+
+def _drop_leading_words(text: str, count: int) -> str:
+    """Remove count normalized words from the start of text, keeping the rest as written"""
+    tokens = text.split()
+    dropped = 0
+    while tokens and dropped < count:
+        dropped += len(_words(tokens.pop(0)))
+    return " ".join(tokens)
+
+def stitch_segments(plan: List[Dict], results: List[Tuple[str, list]],
+                    sampling_rate: int = SAMPLING_RATE) -> Tuple[str, list]:
+    """
+    Join per-segment results into one transcript
+
+    With timestamps each segment keeps only the timed pieces whose midpoint
+    lies in its core span; words still repeated across a boundary (or every
+    overlap when there are no timestamps) are removed from the later segment.
+    """
+    texts, segments = [], []
+    for entry, (text, timed) in zip(plan, results):
+        if timed:
+            core_start = entry['core_start'] / sampling_rate
+            core_end = entry['core_end'] / sampling_rate
+            kept = []
+            for segment in timed:
+                start = segment['start'] if segment['start'] is not None else core_start
+                end = segment['end'] if segment['end'] is not None else start
+                if core_start <= (start + end) / 2 < core_end or (entry is plan[-1] and (start + end) / 2 >= core_end):
+                    kept.append(dict(segment))
+            timed = kept
+            text = " ".join(segment['text'] for segment in timed)
+
+        if texts and text:
+            repeated = overlapping_word_count(texts[-1], text)
+            if repeated:
+                text = _drop_leading_words(text, repeated)
+                while timed and repeated > 0:
+                    words_here = len(_words(timed[0]['text']))
+                    if words_here > repeated:
+                        timed[0]['text'] = _drop_leading_words(timed[0]['text'], repeated)
+                        break
+                    repeated -= words_here
+                    timed.pop(0)
+
+        if text:
+            texts.append(text)
+        segments.extend(timed)
+    return " ".join(texts), segments
+
+class ParallelASR:
+    """A process pool of ASR workers, reused across videos while the model stays the same"""
+
+    def __init__(self, workers: int, threads_per_worker: Optional[int] = None, start_method: str = "spawn"):
+        """
+        Args:
+            workers: Worker processes (each loads its own copy of the model)
+            threads_per_worker: BLAS/OpenMP/torch threads per worker (defaults to cores // workers)
+            start_method: multiprocessing start method; spawn avoids forking a process with live torch threads
+        """
+        self.workers = max(1, workers)
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.workers)
+        self.start_method = start_method
+        self._pool = None
+        self._pool_key = None
+        self._lock = threading.Lock()
+
+    def _ensure_pool(self, model_name: str, quantize: bool, generation_params: Dict) -> ProcessPoolExecutor:
+        key = (model_name, quantize, tuple(sorted(generation_params.items())))
+        if self._pool is not None and self._pool_key == key:
+            return self._pool
+        self._shutdown_pool()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_worker,
+            initargs=(model_name, quantize, self.threads_per_worker, dict(generation_params))
+        )
+        self._pool_key = key
+        return self._pool
+
+    def warm_up(self, model_name: str, quantize: bool, generation_params: Dict) -> float:
+        """Start every worker and load its model; returns the seconds it took"""
+        start = time.perf_counter()
+        with self._lock:
+            pool = self._ensure_pool(model_name, quantize, generation_params)
+            for future in [pool.submit(_ping) for _ in range(self.workers)]:
+                future.result()
+        return time.perf_counter() - start
+
+    def transcribe(self, audio: np.ndarray, model_name: str, quantize: bool, generation_params: Dict,
+                   offset: float = 0.0, overlap_s: float = DEFAULT_OVERLAP_SECONDS) -> Tuple[str, list]:
+        """
+        Transcribe 16 kHz float32 samples across the worker processes
+
+        Returns:
+            (transcript, segments) with segment times shifted by offset seconds.
+            Raises whatever a worker raised (including BrokenProcessPool)
+        """
+        plan = plan_segments(audio, self.workers, overlap_s)
+        with self._lock:
+            pool = self._ensure_pool(model_name, quantize, generation_params)
+            try:
+                # Plain copies pickle compactly even when audio is memory-mapped
+                futures = [
+                    pool.submit(_transcribe_segment, np.array(audio[entry['start']:entry['end']], dtype=np.float32),
+                                offset + entry['start'] / SAMPLING_RATE)
+                    for entry in plan
+                ]
+                results = [future.result() for future in futures]
+            except Exception:
+                # A dead worker breaks the whole pool; start fresh next time
+                self._shutdown_pool()
+                raise
+
+        shifted_plan = [
+            dict(entry, core_start=entry['core_start'] + int(offset * SAMPLING_RATE),
+                 core_end=entry['core_end'] + int(offset * SAMPLING_RATE))
+            for entry in plan
+        ]
+        return stitch_segments(shifted_plan, results)
+
+    def _shutdown_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        self._pool_key = None
+
+    def shutdown(self):
+        with self._lock:
+            self._shutdown_pool()
+
+# Global pool, created on first use and resized when the worker count changes
+_parallel_asr = None
+_parallel_asr_lock = threading.Lock()
+
+def get_parallel_asr(workers: int) -> ParallelASR:
+    """Get the process-wide ASR worker pool (threads per worker from ASR_THREADS_PER_WORKER)"""
+    global _parallel_asr
+    threads = os.getenv("ASR_THREADS_PER_WORKER")
+    with _parallel_asr_lock:
+        if _parallel_asr is None or _parallel_asr.workers != workers:
+            if _parallel_asr is not None:
+                _parallel_asr.shutdown()
+            _parallel_asr = ParallelASR(workers, threads_per_worker=int(threads) if threads else None)
+    return _parallel_asr
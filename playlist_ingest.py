@@ -0,0 +1,286 @@
+"""
+Playlist and channel ingestion for AI Baba admin system
+Expands a YouTube playlist or channel into its videos, fetches metadata and
+downloads audio on a bounded I/O pool, and transcribes finished downloads on
+the consumer thread so downloads overlap with ASR. Long videos are decoded
+into their checkpoint job instead of memory, so they resume after a crash
+like single videos do. Local media files go through the same pipeline, with
+hashing and decoding on the I/O pool
+"""
+import os
+import queue
+import threading
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pytubefix import Playlist, Channel
+
+from utils.youtube_transcriber import YouTubeTranscriber, CHECKPOINT_MIN_SECONDS
+from utils.audio_utils import SAMPLING_RATE, release_audio
+from utils.local_media import LocalMedia
+
+CHANNEL_URL_MARKERS = ('/channel/', '/@', '/c/', '/user/')
+
+def is_playlist_url(url: str) -> bool:
+    return 'list=' in (url or '')
+
+def is_channel_url(url: str) -> bool:
+    return any(marker in (url or '') for marker in CHANNEL_URL_MARKERS)
+
+def expand_source_url(url: str, max_videos: Optional[int] = None) -> Tuple[bool, str, List[str]]:
+    """
+    Expand a playlist or channel URL into video URLs
+
+    Returns:
+        (success, message, video_urls)
+    """
+    url = (url or '').strip()
+    try:
+        if is_playlist_url(url):
+            source = Playlist(url)
+            label = f"playlist '{source.title}'"
+        elif is_channel_url(url):
+            source = Channel(url)
+            label = f"channel '{source.channel_name}'"
+        else:
+            return False, "URL is not a YouTube playlist or channel", []
+
+        # video_urls pages lazily; stop fetching once we have enough
+        video_urls = list(islice(source.video_urls, max_videos) if max_videos else source.video_urls)
+    except Exception as e:
+        return False, f"Failed to expand {url}: {str(e)}", []
+
+    if not video_urls:
+        return False, f"No videos found in {label}", []
+    return True, f"Found {len(video_urls)} videos in {label}", video_urls
+
+class PlaylistIngestor:
+    """Pipelined download + ASR over many videos"""
+
+    def __init__(self, io_workers: int = 4, max_pending_downloads: int = 2):
+        """
+        Args:
+            io_workers: Concurrent metadata fetches and audio downloads
+            max_pending_downloads: Videos decoded (or being decoded) ahead of ASR; an I/O
+                                   worker waits for a slot before decoding, so this bounds
+                                   memory and temp disk use
+        """
+        self.io_workers = io_workers
+        self.max_pending_downloads = max_pending_downloads
+
+    def ingest(self, video_urls: List[str], progress_callback=None) -> Iterator[Dict]:
+        """
+        Transcribe videos, yielding one result per video in completion order
+
+        video_urls may also hold local media file paths. Each result has
+        video_url, success, message, transcript, video_info and source. Cached
+        and caption transcripts skip the download entirely; videos of at least
+        CHECKPOINT_MIN_SECONDS are transcribed through resumable checkpoints.
+        """
+        def update_progress(message: str):
+            if progress_callback:
+                progress_callback(message)
+            else:
+                print(message)
+
+        # A playlist can list a video twice; one run per video is enough
+        video_urls = list(dict.fromkeys(video_urls))
+        # Items without audio (cached, captions, failures) don't take a decode slot
+        ready = queue.Queue()
+        decode_slots = threading.BoundedSemaphore(self.max_pending_downloads)
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="playlist-io")
+
+        try:
+            for video_url in video_urls:
+                executor.submit(self._fetch, video_url, ready, decode_slots, stop)
+
+            # This thread is the ASR consumer; I/O workers keep downloading meanwhile
+            transcriber = None
+            for done in range(1, len(video_urls) + 1):
+                item = ready.get()
+                if item.pop('decode_slot', False):
+                    # Taken for ASR: the next video may start decoding
+                    decode_slots.release()
+                if item.pop('checkpointed', False):
+                    transcriber = transcriber or YouTubeTranscriber()
+                    update_progress(f"💬 [{done}/{len(video_urls)}] Transcribing {item['video_info']['title']} "
+                                    f"in resumable chunks...")
+                    success, message, transcript = transcriber.transcribe_with_checkpoints(item.pop('yt'), lambda m: None)
+                    item.update(success=success, message=message, transcript=transcript, source='asr')
+                elif item.get('audio') is not None:
+                    transcriber = transcriber or YouTubeTranscriber()
+                    update_progress(f"💬 [{done}/{len(video_urls)}] Transcribing {item['video_info']['title']}...")
+                    try:
+                        success, message, transcript = transcriber.transcribe_audio_file(
+                            item.pop('yt'), item['audio'], lambda m: None
+                        )
+                    finally:
+                        self._release(item.pop('audio'))
+                    item.update(success=success, message=message, transcript=transcript, source='asr')
+                else:
+                    item.pop('yt', None)
+                    item.pop('audio', None)
+
+                icon = "✅" if item['success'] else "❌"
+                title = (item.get('video_info') or {}).get('title', item['video_url'])
+                update_progress(f"{icon} [{done}/{len(video_urls)}] {title}: {item['message']}")
+                yield item
+        finally:
+            # Also runs when the caller stops iterating early
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            while True:
+                try:
+                    leftover = ready.get_nowait()
+                except queue.Empty:
+                    break
+                if leftover.get('audio') is not None:
+                    self._release(leftover['audio'])
+
+    def _fetch(self, video_url: str, ready: queue.Queue, decode_slots: threading.BoundedSemaphore,
+               stop: threading.Event):
+        """
+        I/O stage: metadata, cache/caption lookup, then audio decode (or download)
+
+        Always hands exactly one item to the consumer, which waits for one per
+        video; any failure becomes that item's message.
+        """
+        item = {'video_url': video_url, 'success': False, 'message': '', 'transcript': None,
+                'video_info': None, 'source': None, 'audio': None, 'yt': None}
+        is_local = os.path.isfile(video_url)
+        try:
+            if stop.is_set():
+                return
+            reserve = lambda: self._reserve_decode_slot(item, decode_slots, stop)
+            if is_local:
+                self._fetch_local(item, reserve)
+            else:
+                self._fetch_video(item, reserve)
+        except Exception as e:
+            item['message'] = f"Failed to {'read file' if is_local else 'fetch video'}: {str(e)}"
+        finally:
+            if item.get('decode_slot') and item['audio'] is None and not item.get('checkpointed'):
+                # Nothing decoded after all; don't keep the slot until the consumer gets here
+                decode_slots.release()
+                item['decode_slot'] = False
+            self._put(item, ready, stop)
+
+    @staticmethod
+    def _reserve_decode_slot(item: Dict, decode_slots: threading.BoundedSemaphore, stop: threading.Event) -> bool:
+        """Wait until fewer than max_pending_downloads videos are decoded ahead of ASR"""
+        while not stop.is_set():
+            if decode_slots.acquire(timeout=0.5):
+                item['decode_slot'] = True
+                return True
+        item['message'] = "Ingestion stopped"
+        return False
+
+    def _fetch_video(self, item: Dict, reserve):
+        transcriber = YouTubeTranscriber()
+        quiet = lambda m: None
+        yt = transcriber._get_youtube(item['video_url'])
+        item['video_info'] = transcriber._build_video_info(yt)
+
+        result = transcriber.get_cached_transcript(item['video_url'], quiet)
+        if not result and transcriber.prefer_captions:
+            result = transcriber.transcript_from_captions(yt, quiet)
+
+        if result:
+            item['success'], item['message'], item['transcript'] = result
+            item['source'] = transcriber.last_transcript_details.get('source')
+        elif yt.length and yt.length > 7200:  # 2 hour limit
+            item['message'] = "Video is too long (max 2 hours supported)"
+        elif not reserve():
+            return
+        elif yt.length and yt.length >= CHECKPOINT_MIN_SECONDS:
+            self._prepare_checkpointed(item, transcriber, yt)
+        else:
+            success, message, audio = transcriber.decode_audio(yt, quiet)
+            if not success:
+                success, message, audio = transcriber.download_audio(yt, quiet)
+            if success:
+                item['yt'], item['audio'] = yt, audio
+            else:
+                item['message'] = message
+
+    def _fetch_local(self, item: Dict, reserve):
+        """Local file: content hash, cache lookup, then decode"""
+        transcriber = YouTubeTranscriber()
+        quiet = lambda m: None
+        media = LocalMedia.from_path(item['video_url'])
+        item['video_info'] = media.video_info()
+
+        result = transcriber._cached_transcript(media.video_id, update_progress=quiet)
+        if result:
+            item['success'], item['message'], item['transcript'] = result
+            item['source'] = transcriber.last_transcript_details.get('source')
+            item['video_info']['length'] = media.length or transcriber.last_transcript_details.get('length') or 0
+            return
+
+        if not reserve():
+            return
+        audio = None
+        if not media.length:
+            # Length unknown until decoded
+            success, message, audio = transcriber.decode_audio(media, quiet)
+            if not success:
+                item['message'] = message
+                return
+            media.length = int(len(audio) / SAMPLING_RATE)
+        item['video_info']['length'] = media.length
+
+        if media.length > 7200:  # 2 hour limit, as for videos
+            if audio is not None:
+                self._release(audio)
+            item['message'] = "File is too long (max 2 hours supported)"
+            return
+        if media.length >= CHECKPOINT_MIN_SECONDS:
+            # Decoded again into the job directory, where a crash can't lose it
+            if audio is not None:
+                self._release(audio)
+            self._prepare_checkpointed(item, transcriber, media)
+            return
+
+        if audio is None:
+            success, message, audio = transcriber.decode_audio(media, quiet)
+            if not success:
+                item['message'] = message
+                return
+        item['yt'], item['audio'] = media, audio
+
+    @staticmethod
+    def _prepare_checkpointed(item: Dict, transcriber: YouTubeTranscriber, yt):
+        """Decode a long recording into its checkpoint job for the consumer to transcribe"""
+        success, message = transcriber.prepare_checkpointed_audio(yt, lambda m: None)
+        if success:
+            item['yt'], item['checkpointed'] = yt, True
+        else:
+            item['message'] = message
+
+    def _put(self, item: Dict, ready: queue.Queue, stop: threading.Event):
+        """Hand a fetched item to the ASR consumer, or release its audio if ingestion stopped"""
+        if stop.is_set():
+            if item['audio'] is not None:
+                self._release(item['audio'])
+            return
+        ready.put(item)
+
+    @staticmethod
+    def _release(audio):
+        """Delete a downloaded temp file or a memory-mapped decode buffer"""
+        if isinstance(audio, str):
+            try:
+                os.remove(audio)
+            except OSError:
+                pass
+        else:
+            release_audio(audio)
+
+def get_playlist_ingestor() -> PlaylistIngestor:
+    """Ingestor sized from PLAYLIST_IO_WORKERS and PLAYLIST_MAX_PENDING_DOWNLOADS"""
+    return PlaylistIngestor(
+        io_workers=int(os.getenv("PLAYLIST_IO_WORKERS", "4")),
+        max_pending_downloads=int(os.getenv("PLAYLIST_MAX_PENDING_DOWNLOADS", "2"))
+    )
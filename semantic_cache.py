@@ -0,0 +1,163 @@
+"""
+Semantic response cache for AI Baba's "Seek Wisdom"
+Remembers recent answers by the embedding of the question, so a near-identical
+question ("how to stop overthinking" / "how do I stop overthinking?") is
+answered without routing and retrieval. Entries expire after a TTL, the least
+recently used go first when full, and invalidate() drops answers that changed
+advice entries could alter. An answer computed while an invalidation ran is
+not stored, since it may have been built from the entries before the change
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional
+
+import numpy as np
+
+# Questions at least this similar (cosine of unit embeddings) share an answer
+DEFAULT_SIMILARITY = float(os.getenv("WISDOM_CACHE_SIMILARITY", "0.92"))
+DEFAULT_TTL_SECONDS = float(os.getenv("WISDOM_CACHE_TTL", "3600"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("WISDOM_CACHE_SIZE", "256"))
+
+class SemanticCache:
+    """In-memory LRU/TTL cache keyed by query embedding similarity"""
+
+    def __init__(self, similarity: float = DEFAULT_SIMILARITY, ttl: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.similarity = similarity
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> {'vector', 'params', 'value', 'entry_ids', 'floor', 'created_at', 'compute_ms'}
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self._next_key = 0
+        # Bumped by invalidate() and clear(); put() drops answers computed before a bump
+        self._generation = 0
+        # Stacked vectors of _entries in order, rebuilt lazily after changes
+        self._keys = None
+        self._matrix = None
+        self._lock = threading.Lock()
+        self._metrics = {'lookups': 0, 'hits': 0, 'saved_ms': 0.0, 'invalidated': 0}
+
+    def _expire(self, now: float):
+        expired = [key for key, entry in self._entries.items() if now - entry['created_at'] > self.ttl]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._keys = None
+
+    def get(self, vector: np.ndarray, params: Hashable = None) -> Optional[Dict]:
+        """
+        Cached value of the most similar earlier query asked with the same params
+
+        Args:
+            vector: Unit-length query embedding
+            params: Anything else the answer depends on (k, thresholds, ...)
+
+        Returns:
+            The stored value, or None on a miss
+        """
+        start = time.perf_counter()
+        with self._lock:
+            self._metrics['lookups'] += 1
+            self._expire(time.time())
+            if not self._entries:
+                return None
+            if self._keys is None:
+                self._keys = list(self._entries)
+                self._matrix = np.stack([self._entries[key]['vector'] for key in self._keys])
+
+            similarities = self._matrix @ np.asarray(vector, dtype=np.float32)
+            for i in np.argsort(-similarities):
+                if similarities[i] < self.similarity:
+                    return None
+                entry = self._entries[self._keys[i]]
+                if entry['params'] == params:
+                    break
+            else:
+                return None
+
+            self._entries.move_to_end(self._keys[i])
+            self._metrics['hits'] += 1
+            self._metrics['saved_ms'] += max(entry['compute_ms'] - (time.perf_counter() - start) * 1000, 0.0)
+            return entry['value']
+
+    @property
+    def generation(self) -> int:
+        """Read before computing an answer and pass to put()"""
+        with self._lock:
+            return self._generation
+
+    def put(self, vector: np.ndarray, value, params: Hashable = None, entry_ids: Iterable[int] = (),
+            floor: float = 0.0, compute_ms: float = 0.0, generation: Optional[int] = None):
+        """
+        Store the answer to a query
+
+        Args:
+            entry_ids: Advice entries the answer was built from
+            floor: Lowest similarity an entry needed to make it into the answer;
+                   a changed entry at least this close to the query may change it
+            compute_ms: What answering took, credited as saved on every hit
+            generation: The cache generation read before answering; the answer
+                        is discarded if entries were invalidated since
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                self._metrics['invalidated'] += 1
+                return
+            self._expire(time.time())
+            while len(self._entries) >= self.max_entries:
+                self._entries.popitem(last=False)
+            self._entries[self._next_key] = {
+                'vector': np.asarray(vector, dtype=np.float32),
+                'params': params,
+                'value': value,
+                'entry_ids': set(entry_ids),
+                'floor': floor,
+                'created_at': time.time(),
+                'compute_ms': compute_ms
+            }
+            self._next_key += 1
+            self._keys = None
+
+    def invalidate(self, entry_ids: Iterable[int], vectors: Optional[np.ndarray] = None) -> int:
+        """
+        Drop answers affected by changed advice entries
+
+        Args:
+            entry_ids: Entries that were edited, deleted or (un-)confirmed
+            vectors: Unit embeddings of the changed entries that can now be
+                     answers; an answer is dropped when one of them is at least
+                     as close to its query as its weakest passage
+
+        Returns:
+            Number of answers dropped
+        """
+        entry_ids = set(entry_ids)
+        with self._lock:
+            self._generation += 1
+            stale = []
+            for key, entry in self._entries.items():
+                if entry['entry_ids'] & entry_ids:
+                    stale.append(key)
+                elif vectors is not None and len(vectors) and (vectors @ entry['vector']).max() >= entry['floor']:
+                    stale.append(key)
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._keys = None
+            self._metrics['invalidated'] += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys = None
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._metrics)
+            stats['entries'] = len(self._entries)
+        stats['hit_rate'] = stats['hits'] / stats['lookups'] if stats['lookups'] else None
+        return stats
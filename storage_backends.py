@@ -0,0 +1,840 @@
+"""
+Storage backends for the AI Baba advice dataset
+DatabaseManager delegates every query to one of these, so the app can run on
+Supabase (PostgREST over HTTP), a direct pooled Postgres connection, or a
+local SQLite file for offline runs and tests
+"""
+import os
+import io
+import csv
+import json
+import uuid
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Iterator
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+ADVICE_COLUMNS = [
+    'category', 'subcategories', 'information', 'original_text',
+    'confidence_score', 'processing_metadata', 'admin_confirmed',
+    'created_at', 'updated_at'
+]
+
+# Optional columns linking transcript passages to their video (add_passages.sql);
+# only written when a row carries them, so older tables keep accepting inserts
+PASSAGE_COLUMNS = ['source_video_id', 'passage_index', 'start_seconds', 'end_seconds']
+
+POSTGRES_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id SERIAL PRIMARY KEY,
+    category TEXT NOT NULL,
+    subcategories TEXT,
+    information TEXT NOT NULL,
+    original_text TEXT,
+    confidence_score FLOAT,
+    processing_metadata JSONB,
+    admin_confirmed BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW()),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW())
+);
+CREATE INDEX IF NOT EXISTS idx_{table}_category ON {table} (category);
+CREATE INDEX IF NOT EXISTS idx_{table}_confirmed ON {table} (admin_confirmed);
+CREATE INDEX IF NOT EXISTS idx_{table}_created_at ON {table} (created_at);
+ALTER TABLE {table} ADD COLUMN IF NOT EXISTS source_video_id TEXT;
+ALTER TABLE {table} ADD COLUMN IF NOT EXISTS passage_index INT;
+ALTER TABLE {table} ADD COLUMN IF NOT EXISTS start_seconds FLOAT;
+ALTER TABLE {table} ADD COLUMN IF NOT EXISTS end_seconds FLOAT;
+CREATE INDEX IF NOT EXISTS idx_{table}_source_video ON {table} (source_video_id, passage_index);
+CREATE INDEX IF NOT EXISTS idx_{table}_updated_at ON {table} (updated_at, id);
+CREATE TABLE IF NOT EXISTS {table}_deletions (
+    id BIGINT PRIMARY KEY,
+    deleted_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW())
+);
+CREATE INDEX IF NOT EXISTS idx_{table}_deletions_at ON {table}_deletions (deleted_at, id);
+CREATE OR REPLACE FUNCTION log_{table}_deletion() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO {table}_deletions (id) VALUES (OLD.id)
+    ON CONFLICT (id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS trg_{table}_deletions ON {table};
+CREATE TRIGGER trg_{table}_deletions AFTER DELETE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION log_{table}_deletion();
+"""
+
+# Postgres types for the COPY staging table in PostgresBackend.insert_many
+POSTGRES_COLUMN_TYPES = {
+    'category': 'TEXT', 'subcategories': 'TEXT', 'information': 'TEXT', 'original_text': 'TEXT',
+    'confidence_score': 'FLOAT', 'processing_metadata': 'JSONB', 'admin_confirmed': 'BOOLEAN',
+    'created_at': 'TIMESTAMPTZ', 'updated_at': 'TIMESTAMPTZ',
+    'source_video_id': 'TEXT', 'passage_index': 'INT', 'start_seconds': 'FLOAT', 'end_seconds': 'FLOAT'
+}
+
+# Projectable columns; 'preview' is a server-computed prefix of information
+SELECTABLE_COLUMNS = ['id'] + ADVICE_COLUMNS + PASSAGE_COLUMNS + ['preview']
+
+# Characters of information returned in the 'preview' column
+# (fixed to match preview() in add_list_view.sql)
+PREVIEW_LENGTH = 200
+
+SQLITE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category TEXT NOT NULL,
+    subcategories TEXT,
+    information TEXT NOT NULL,
+    original_text TEXT,
+    confidence_score REAL,
+    processing_metadata TEXT,
+    admin_confirmed INTEGER DEFAULT 0,
+    created_at TEXT,
+    updated_at TEXT,
+    source_video_id TEXT,
+    passage_index INTEGER,
+    start_seconds REAL,
+    end_seconds REAL
+);
+CREATE INDEX IF NOT EXISTS idx_{table}_category ON {table} (category);
+CREATE INDEX IF NOT EXISTS idx_{table}_confirmed ON {table} (admin_confirmed);
+CREATE INDEX IF NOT EXISTS idx_{table}_created_at ON {table} (created_at);
+"""
+
+# Change tracking for incremental index sync: updated_at order plus a log of deleted ids
+SQLITE_CHANGE_TRACKING_SQL = """
+CREATE INDEX IF NOT EXISTS idx_{table}_updated_at ON {table} (updated_at, id);
+CREATE TABLE IF NOT EXISTS {table}_deletions (
+    id INTEGER PRIMARY KEY,
+    deleted_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_{table}_deletions_at ON {table}_deletions (deleted_at, id);
+CREATE TRIGGER IF NOT EXISTS trg_{table}_deletions AFTER DELETE ON {table}
+BEGIN
+    INSERT OR REPLACE INTO {table}_deletions (id, deleted_at)
+    VALUES (OLD.id, strftime('%Y-%m-%dT%H:%M:%f', 'now'));
+END;
+"""
+
+SQLITE_PASSAGE_COLUMN_TYPES = {
+    'source_video_id': 'TEXT', 'passage_index': 'INTEGER', 'start_seconds': 'REAL', 'end_seconds': 'REAL'
+}
+
+def validate_columns(columns: Optional[List[str]]) -> Optional[List[str]]:
+    """Reject unknown column names before they reach any SQL string"""
+    if columns is None:
+        return None
+    unknown = [c for c in columns if c not in SELECTABLE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown columns requested: {unknown}")
+    return list(columns)
+
+def add_client_preview(row: Dict, columns: List[str]) -> Dict:
+    """Compute 'preview' locally when the server could not, dropping unrequested text"""
+    information = row.get('information') or ''
+    row['preview'] = information[:PREVIEW_LENGTH]
+    if 'information' not in columns:
+        row.pop('information', None)
+    return row
+
+class StorageBackend:
+    """
+    Interface for advice_dataset storage
+
+    Methods raise on failure; DatabaseManager turns exceptions into its
+    (success, message, ...) tuples.
+    """
+
+    name = "base"
+
+    def __init__(self, table_name: str = "advice_dataset"):
+        self.table_name = table_name
+
+    def connect(self):
+        """Open connections / clients"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release connections"""
+
+    def ping(self):
+        """Cheap round trip that raises if the table is unreachable"""
+        raise NotImplementedError
+
+    def ensure_schema(self):
+        """Create the table if the backend is able to"""
+        raise NotImplementedError
+
+    def insert(self, row: Dict) -> Dict:
+        """Insert one row and return it with its id"""
+        raise NotImplementedError
+
+    def insert_many(self, rows: List[Dict]) -> List[int]:
+        """Insert rows and return their ids in input order"""
+        raise NotImplementedError
+
+    def select(self, filters: Dict = None, limit: int = 50, offset: int = 0,
+               columns: List[str] = None) -> List[Dict]:
+        """Rows matching equality filters, newest first; columns=None means every column"""
+        raise NotImplementedError
+
+    def get(self, entry_id: int, columns: List[str] = None) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def update(self, entry_id: int, data: Dict) -> bool:
+        raise NotImplementedError
+
+    def delete(self, entry_id: int) -> bool:
+        raise NotImplementedError
+
+    def delete_where(self, filters: Dict) -> int:
+        """Delete every row matching all filters; returns how many were removed"""
+        raise NotImplementedError
+
+    def count(self, filters: Dict = None) -> int:
+        raise NotImplementedError
+
+    def category_counts(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def search(self, term: str, limit: int = 20, columns: List[str] = None) -> List[Dict]:
+        """Case-insensitive substring search over information and original_text"""
+        raise NotImplementedError
+
+    def search_ranked(self, term: str, limit: int = 20, columns: List[str] = None) -> List[Dict]:
+        """
+        Full-text search ranked by relevance (best first), each row carrying a 'rank'
+
+        Raises NotImplementedError where the backend has no full-text index;
+        callers fall back to search().
+        """
+        raise NotImplementedError
+
+    def scan(self, batch_size: int = 1000) -> Iterator[Dict]:
+        """Stream every row in id order without loading the table into memory"""
+        raise NotImplementedError
+
+    def select_updated_since(self, since: Optional[str], after_id: int = 0, limit: int = 1000,
+                             columns: List[str] = None) -> List[Dict]:
+        """
+        Rows changed after the (updated_at, id) position (since, after_id), oldest first
+
+        Paging by that pair never skips rows that share an updated_at;
+        since=None starts from the beginning.
+        """
+        raise NotImplementedError
+
+    def deleted_since(self, since: Optional[str], after_id: int = 0, limit: int = 1000) -> List[Dict]:
+        """
+        {'id', 'deleted_at'} rows from the deletion log after (since, after_id), oldest first
+
+        The log is filled by a trigger (add_change_tracking.sql on Supabase);
+        raises if it doesn't exist.
+        """
+        raise NotImplementedError
+
+class SupabaseBackend(StorageBackend):
+    """PostgREST access through the Supabase client"""
+
+    name = "supabase"
+
+    def __init__(self, table_name: str = "advice_dataset"):
+        super().__init__(table_name)
+        self.client = None
+
+    def connect(self):
+        if self.client is None:
+            from config.supabase_config import get_supabase_client
+            self.client = get_supabase_client()
+
+    def _table(self):
+        return self.client.table(self.table_name)
+
+    def _run_projected(self, build, columns: Optional[List[str]]) -> List[Dict]:
+        """
+        Run build(select_string) with the requested projection
+
+        'preview' is the computed field from add_list_view.sql; without the
+        migration we fetch information instead and trim it client-side.
+        """
+        columns = validate_columns(columns)
+        if not columns:
+            return build('*').execute().data or []
+        try:
+            return build(','.join(columns)).execute().data or []
+        except Exception as e:
+            if 'preview' not in columns or 'preview' not in str(e):
+                raise
+            fallback = [c for c in columns if c != 'preview'] + ['information']
+            rows = build(','.join(dict.fromkeys(fallback))).execute().data or []
+            return [add_client_preview(row, columns) for row in rows]
+
+    def ping(self):
+        self._table().select('id').limit(1).execute()
+
+    def ensure_schema(self):
+        # PostgREST cannot run DDL; probing raises if the table is missing
+        self.ping()
+
+    def insert(self, row: Dict) -> Dict:
+        result = self._table().insert(row).execute()
+        return result.data[0] if result.data else None
+
+    def insert_many(self, rows: List[Dict]) -> List[int]:
+        result = self._table().insert(rows).execute()
+        return [entry['id'] for entry in result.data] if result.data else []
+
+    def select(self, filters: Dict = None, limit: int = 50, offset: int = 0,
+               columns: List[str] = None) -> List[Dict]:
+        def build(projection):
+            query = self._table().select(projection)
+            for column, value in (filters or {}).items():
+                query = query.eq(column, value)
+            return query.range(offset, offset + limit - 1).order('created_at', desc=True)
+        return self._run_projected(build, columns)
+
+    def get(self, entry_id: int, columns: List[str] = None) -> Optional[Dict]:
+        rows = self._run_projected(lambda projection: self._table().select(projection).eq('id', entry_id), columns)
+        return rows[0] if rows else None
+
+    def update(self, entry_id: int, data: Dict) -> bool:
+        result = self._table().update(data).eq('id', entry_id).execute()
+        return bool(result.data)
+
+    def delete(self, entry_id: int) -> bool:
+        result = self._table().delete().eq('id', entry_id).execute()
+        return bool(result.data)
+
+    def delete_where(self, filters: Dict) -> int:
+        query = self._table().delete()
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        return len(query.execute().data or [])
+
+    def count(self, filters: Dict = None) -> int:
+        query = self._table().select('id', count='exact')
+        for column, value in (filters or {}).items():
+            query = query.eq(column, value)
+        result = query.execute()
+        return result.count if hasattr(result, 'count') and result.count is not None else 0
+
+    def category_counts(self) -> Dict[str, int]:
+        result = self._table().select('category').execute()
+        counts = {}
+        for entry in result.data or []:
+            counts[entry['category']] = counts.get(entry['category'], 0) + 1
+        return counts
+
+    def search(self, term: str, limit: int = 20, columns: List[str] = None) -> List[Dict]:
+        return self._run_projected(
+            lambda projection: self._table().select(projection).or_(
+                f"information.ilike.%{term}%,original_text.ilike.%{term}%"
+            ).limit(limit),
+            columns
+        )
+
+    def search_ranked(self, term: str, limit: int = 20, columns: List[str] = None) -> List[Dict]:
+        columns = validate_columns(columns)
+        params = {'search_query': term, 'max_results': limit}
+        if columns and 'preview' in columns:
+            # search_advice_preview() is created by add_list_view.sql
+            try:
+                rows = self.client.rpc('search_advice_preview', params).execute().data or []
+                return [{k: v for k, v in row.items() if k in columns or k == 'rank'} for row in rows]
+            except Exception as e:
+                if 'search_advice_preview' not in str(e) and 'PGRST202' not in str(e):
+                    raise
+            fallback = [c for c in columns if c != 'preview'] + ['information', 'rank']
+            rows = self.client.rpc('search_advice', params).select(','.join(dict.fromkeys(fallback))).execute().data or []
+            return [add_client_preview(row, columns) for row in rows]
+
+        # search_advice() is created by add_fulltext_search.sql
+        query = self.client.rpc('search_advice', params)
+        if columns:
+            query = query.select(','.join(columns + ['rank']))
+        return query.execute().data or []
+
+    def scan(self, batch_size: int = 1000) -> Iterator[Dict]:
+        last_id = 0
+        while True:
+            result = self._table().select('*').gt('id', last_id).order('id').limit(batch_size).execute()
+            rows = result.data or []
+            for row in rows:
+                yield row
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1]['id']
+
+    def select_updated_since(self, since: Optional[str], after_id: int = 0, limit: int = 1000,
+                             columns: List[str] = None) -> List[Dict]:
+        def build(projection):
+            query = self._table().select(projection)
+            if since is not None:
+                query = query.or_(f'updated_at.gt."{since}",and(updated_at.eq."{since}",id.gt.{after_id})')
+            return query.order('updated_at').order('id').limit(limit)
+        return self._run_projected(build, columns)
+
+    def deleted_since(self, since: Optional[str], after_id: int = 0, limit: int = 1000) -> List[Dict]:
+        # advice_dataset_deletions is created by add_change_tracking.sql
+        query = self.client.table(f"{self.table_name}_deletions").select('id,deleted_at')
+        if since is not None:
+            query = query.or_(f'deleted_at.gt."{since}",and(deleted_at.eq."{since}",id.gt.{after_id})')
+        return query.order('deleted_at').order('id').limit(limit).execute().data or []
+
+class PostgresBackend(StorageBackend):
+    """Direct psycopg2 access with a thread-safe connection pool"""
+
+    name = "postgres"
+
+    def __init__(self,
+                 table_name: str = "advice_dataset",
+                 dsn: str = None,
+                 min_connections: int = 1,
+                 max_connections: int = 8):
+        super().__init__(table_name)
+        self.dsn = dsn or os.getenv("DATABASE_URL")
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.pool = None
+
+    def connect(self):
+        if self.pool is not None:
+            return
+        if not self.dsn:
+            raise ValueError("DATABASE_URL must be set to use the postgres storage backend")
+
+        import psycopg2.extras
+        from psycopg2.pool import ThreadedConnectionPool
+        psycopg2.extras.register_default_jsonb()
+        self.pool = ThreadedConnectionPool(self.min_connections, self.max_connections, self.dsn)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.closeall()
+            self.pool = None
+
+    @contextmanager
+    def _connection(self):
+        conn = self.pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn)
+
+    def _fetch(self, sql: str, params=None) -> List[Dict]:
+        import psycopg2.extras
+        with self._connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                cur.execute(sql, params)
+                return [self._normalize(row) for row in cur.fetchall()] if cur.description else []
+
+    @staticmethod
+    def _normalize(row) -> Dict:
+        """Match the JSON shapes PostgREST returns (ISO timestamps)"""
+        row = dict(row)
+        for column in ('created_at', 'updated_at', 'deleted_at'):
+            if row.get(column) is not None and hasattr(row[column], 'isoformat'):
+                row[column] = row[column].isoformat()
+        return row
+
+    @staticmethod
+    def _projection(columns: Optional[List[str]], alias: str = "") -> str:
+        columns = validate_columns(columns)
+        if not columns:
+            return f"{alias}*"
+        return ', '.join(
+            f"left({alias}information, {PREVIEW_LENGTH}) AS preview" if c == 'preview' else f"{alias}{c}"
+            for c in columns
+        )
+
+    @staticmethod
+    def _where(filters: Dict):
+        if not filters:
+            return "", []
+        clauses = [f"{column} = %s" for column in filters]
+        return " WHERE " + " AND ".join(clauses), list(filters.values())
+
+    @staticmethod
+    def _adapt(row: Dict) -> Dict:
+        import psycopg2.extras
+        row = dict(row)
+        if 'processing_metadata' in row and row['processing_metadata'] is not None:
+            row['processing_metadata'] = psycopg2.extras.Json(row['processing_metadata'])
+        return row
+
+    def ping(self):
+        self._fetch(f"SELECT id FROM {self.table_name} LIMIT 1")
+
+    def ensure_schema(self):
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(POSTGRES_TABLE_SQL.format(table=self.table_name))
+
+    def insert(self, row: Dict) -> Dict:
+        row = self._adapt(row)
+        columns = list(row.keys())
+        sql = (f"INSERT INTO {self.table_name} ({', '.join(columns)}) "
+               f"VALUES ({', '.join(['%s'] * len(columns))}) RETURNING *")
+        rows = self._fetch(sql, [row[c] for c in columns])
+        return rows[0] if rows else None
+
+    def insert_many(self, rows: List[Dict]) -> List[int]:
+        """Bulk load through COPY into a temp table, then one INSERT ... RETURNING"""
+        if not rows:
+            return []
+
+        # Passage columns only when some row has them, so unmigrated tables still load
+        columns = ADVICE_COLUMNS + [c for c in PASSAGE_COLUMNS if any(c in row for row in rows)]
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for position, row in enumerate(rows):
+            values = [position]
+            for column in columns:
+                value = row.get(column)
+                if column == 'processing_metadata':
+                    value = json.dumps(value or {}, default=str)
+                elif value is None:
+                    value = r'\N'
+                values.append(value)
+            writer.writerow(values)
+        buffer.seek(0)
+
+        staging = f"_{self.table_name}_staging"
+        column_list = ', '.join(columns)
+        column_types = ', '.join(f"{column} {POSTGRES_COLUMN_TYPES[column]}" for column in columns)
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"CREATE TEMP TABLE {staging} (position INT, {column_types}) ON COMMIT DROP")
+                cur.copy_expert(
+                    f"COPY {staging} (position, {column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                    buffer
+                )
+                # ORDER BY position keeps serial ids in input order
+                cur.execute(
+                    f"INSERT INTO {self.table_name} ({column_list}) "
+                    f"SELECT {column_list} FROM {staging} ORDER BY position RETURNING id"
+                )
+                return [row[0] for row in cur.fetchall()]
+
+    def select(self, filters: Dict = None, limit: int = 50, offset: int = 0,
+               columns: List[str] = None) -> List[Dict]:
+        where, params = self._where(filters)
+        sql = (f"SELECT {self._projection(columns)} FROM {self.table_name}{where} "
+               f"ORDER BY created_at DESC LIMIT %s OFFSET %s")
+        return self._fetch(sql, params + [limit, offset])
+
+    def get(self, entry_id: int, columns: List[str] = None) -> Optional[Dict]:
+        rows = self._fetch(f"SELECT {self._projection(columns)} FROM {self.table_name} WHERE id = %s", [entry_id])
+        return rows[0] if rows else None
+
+    def update(self, entry_id: int, data: Dict) -> bool:
+        data = self._adapt(data)
+        assignments = ', '.join(f"{column} = %s" for column in data)
+        rows = self._fetch(
+            f"UPDATE {self.table_name} SET {assignments} WHERE id = %s RETURNING id",
+            list(data.values()) + [entry_id]
+        )
+        return bool(rows)
+
+    def delete(self, entry_id: int) -> bool:
+        rows = self._fetch(f"DELETE FROM {self.table_name} WHERE id = %s RETURNING id", [entry_id])
+        return bool(rows)
+
+    def delete_where(self, filters: Dict) -> int:
+        where, params = self._where(filters)
+        return len(self._fetch(f"DELETE FROM {self.table_name}{where} RETURNING id", params))
+
+    def count(self, filters: Dict = None) -> int:
+        where, params = self._where(filters)
+        rows = self._fetch(f"SELECT COUNT(*) AS n FROM {self.table_name}{where}", params)
+        return rows[0]['n'] if rows else 0
+
+    def category_counts(self) -> Dict[str, int]:
+        rows = self._fetch(f"SELECT category, COUNT(*) AS n FROM {self.table_name} GROUP BY category")
+        return {row['category']: row['n'] for row in rows}
+
+    def search(self, term: str, limit: int = 20, columns: List[str] = None) -> List[Dict]:
+        pattern = f"%{term}%"
+        return self._fetch(
+            f"SELECT {self._projection(columns)} FROM {self.table_name} "
+            f"WHERE information ILIKE %s OR original_text ILIKE %s LIMIT %s",
+            [pattern, pattern, limit]
+        )
+
+    def search_ranked(self, term: str, limit: int = 20, columns: List[str] = None) -> List[Dict]:
+        # search_vector is added by add_fulltext_search.sql
+        projection = self._projection(columns or ['id'] + ADVICE_COLUMNS, alias="a.")
+        return self._fetch(
+            f"SELECT {projection}, ts_rank(a.search_vector, q) AS rank "
+            f"FROM {self.table_name} a, websearch_to_tsquery('english', %s) q "
+            f"WHERE a.search_vector @@ q ORDER BY rank DESC, a.id DESC LIMIT %s",
+            [term, limit]
+        )
+
+    def scan(self, batch_size: int = 1000) -> Iterator[Dict]:
+        """Named (server-side) cursor so only batch_size rows are held client-side"""
+        import psycopg2.extras
+        conn = self.pool.getconn()
+        try:
+            with conn.cursor(name=f"{self.table_name}_scan_{uuid.uuid4().hex[:8]}", cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                cur.itersize = batch_size
+                cur.execute(f"SELECT * FROM {self.table_name} ORDER BY id")
+                for row in cur:
+                    yield self._normalize(row)
+            conn.commit()
+        finally:
+            self.pool.putconn(conn)
+
+    def select_updated_since(self, since: Optional[str], after_id: int = 0, limit: int = 1000,
+                             columns: List[str] = None) -> List[Dict]:
+        if since is None:
+            where, params = "", []
+        else:
+            where, params = " WHERE (updated_at, id) > (%s, %s)", [since, after_id]
+        return self._fetch(
+            f"SELECT {self._projection(columns)} FROM {self.table_name}{where} "
+            f"ORDER BY updated_at, id LIMIT %s",
+            params + [limit]
+        )
+
+    def deleted_since(self, since: Optional[str], after_id: int = 0, limit: int = 1000) -> List[Dict]:
+        if since is None:
+            where, params = "", []
+        else:
+            where, params = " WHERE (deleted_at, id) > (%s, %s)", [since, after_id]
+        return self._fetch(
+            f"SELECT id, deleted_at FROM {self.table_name}_deletions{where} ORDER BY deleted_at, id LIMIT %s",
+            params + [limit]
+        )
+
+class SQLiteBackend(StorageBackend):
+    """Local SQLite file for offline runs and tests"""
+
+    name = "sqlite"
+
+    def __init__(self, table_name: str = "advice_dataset", db_path: str = None):
+        super().__init__(table_name)
+        self.db_path = db_path or os.getenv("SQLITE_DB_PATH", "ai_baba.db")
+        self._local = threading.local()
+        self._schema_ready = False
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shareable across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def connect(self):
+        self._conn()
+        if not self._schema_ready:
+            self.ensure_schema()
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        entry = dict(row)
+        if entry.get('processing_metadata'):
+            entry['processing_metadata'] = json.loads(entry['processing_metadata'])
+        if 'admin_confirmed' in entry and entry['admin_confirmed'] is not None:
+            entry['admin_confirmed'] = bool(entry['admin_confirmed'])
+        return entry
+
+    @staticmethod
+    def _adapt(row: Dict) -> Dict:
+        row = dict(row)
+        if 'processing_metadata' in row:
+            row['processing_metadata'] = json.dumps(row['processing_metadata'] or {}, default=str)
+        if 'admin_confirmed' in row and row['admin_confirmed'] is not None:
+            row['admin_confirmed'] = int(bool(row['admin_confirmed']))
+        return row
+
+    @staticmethod
+    def _projection(columns: Optional[List[str]]) -> str:
+        columns = validate_columns(columns)
+        if not columns:
+            return "*"
+        return ', '.join(
+            f"substr(information, 1, {PREVIEW_LENGTH}) AS preview" if c == 'preview' else c
+            for c in columns
+        )
+
+    @staticmethod
+    def _where(filters: Dict):
+        if not filters:
+            return "", []
+        clauses = [f"{column} = ?" for column in filters]
+        values = [int(v) if isinstance(v, bool) else v for v in filters.values()]
+        return " WHERE " + " AND ".join(clauses), values
+
+    def ping(self):
+        self._conn().execute(f"SELECT id FROM {self.table_name} LIMIT 1").fetchall()
+
+    def ensure_schema(self):
+        conn = self._conn()
+        conn.executescript(SQLITE_TABLE_SQL.format(table=self.table_name))
+        # Tables created before passage storage get the new columns added in place
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({self.table_name})")}
+        for column, column_type in SQLITE_PASSAGE_COLUMN_TYPES.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {self.table_name} ADD COLUMN {column} {column_type}")
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{self.table_name}_source_video "
+            f"ON {self.table_name} (source_video_id, passage_index)"
+        )
+        conn.executescript(SQLITE_CHANGE_TRACKING_SQL.format(table=self.table_name))
+        conn.commit()
+        self._schema_ready = True
+
+    def insert(self, row: Dict) -> Dict:
+        row = self._adapt(row)
+        columns = list(row.keys())
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute(
+                f"INSERT INTO {self.table_name} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})",
+                [row[c] for c in columns]
+            )
+        return self.get(cursor.lastrowid)
+
+    def insert_many(self, rows: List[Dict]) -> List[int]:
+        conn = self._conn()
+        ids = []
+        with conn:
+            for row in rows:
+                row = self._adapt(row)
+                columns = list(row.keys())
+                cursor = conn.execute(
+                    f"INSERT INTO {self.table_name} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})",
+                    [row[c] for c in columns]
+                )
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def select(self, filters: Dict = None, limit: int = 50, offset: int = 0,
+               columns: List[str] = None) -> List[Dict]:
+        where, params = self._where(filters)
+        rows = self._conn().execute(
+            f"SELECT {self._projection(columns)} FROM {self.table_name}{where} "
+            f"ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def get(self, entry_id: int, columns: List[str] = None) -> Optional[Dict]:
+        row = self._conn().execute(
+            f"SELECT {self._projection(columns)} FROM {self.table_name} WHERE id = ?", [entry_id]
+        ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def update(self, entry_id: int, data: Dict) -> bool:
+        data = self._adapt(data)
+        assignments = ', '.join(f"{column} = ?" for column in data)
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute(
+                f"UPDATE {self.table_name} SET {assignments} WHERE id = ?",
+                list(data.values()) + [entry_id]
+            )
+        return cursor.rowcount > 0
+
+    def delete(self, entry_id: int) -> bool:
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute(f"DELETE FROM {self.table_name} WHERE id = ?", [entry_id])
+        return cursor.rowcount > 0
+
+    def delete_where(self, filters: Dict) -> int:
+        where, params = self._where(filters)
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute(f"DELETE FROM {self.table_name}{where}", params)
+        return cursor.rowcount
+
+    def count(self, filters: Dict = None) -> int:
+        where, params = self._where(filters)
+        return self._conn().execute(f"SELECT COUNT(*) FROM {self.table_name}{where}", params).fetchone()[0]
+
+    def category_counts(self) -> Dict[str, int]:
+        rows = self._conn().execute(
+            f"SELECT category, COUNT(*) FROM {self.table_name} GROUP BY category"
+        ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def search(self, term: str, limit: int = 20, columns: List[str] = None) -> List[Dict]:
+        # SQLite LIKE is case-insensitive for ASCII
+        pattern = f"%{term}%"
+        rows = self._conn().execute(
+            f"SELECT {self._projection(columns)} FROM {self.table_name} "
+            f"WHERE information LIKE ? OR original_text LIKE ? LIMIT ?",
+            [pattern, pattern, limit]
+        ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def scan(self, batch_size: int = 1000) -> Iterator[Dict]:
+        cursor = self._conn().execute(f"SELECT * FROM {self.table_name} ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield self._to_dict(row)
+
+    def select_updated_since(self, since: Optional[str], after_id: int = 0, limit: int = 1000,
+                             columns: List[str] = None) -> List[Dict]:
+        if since is None:
+            where, params = "", []
+        else:
+            where, params = " WHERE updated_at > ? OR (updated_at = ? AND id > ?)", [since, since, after_id]
+        rows = self._conn().execute(
+            f"SELECT {self._projection(columns)} FROM {self.table_name}{where} "
+            f"ORDER BY updated_at, id LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def deleted_since(self, since: Optional[str], after_id: int = 0, limit: int = 1000) -> List[Dict]:
+        if since is None:
+            where, params = "", []
+        else:
+            where, params = " WHERE deleted_at > ? OR (deleted_at = ? AND id > ?)", [since, since, after_id]
+        rows = self._conn().execute(
+            f"SELECT id, deleted_at FROM {self.table_name}_deletions{where} ORDER BY deleted_at, id LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+STORAGE_BACKENDS = {
+    'supabase': SupabaseBackend,
+    'postgres': PostgresBackend,
+    'sqlite': SQLiteBackend,
+}
+
+def create_storage_backend(name: str = None, **kwargs) -> StorageBackend:
+    """
+    Create a storage backend by name
+
+    Args:
+        name: 'supabase', 'postgres' or 'sqlite'; defaults to $STORAGE_BACKEND or 'supabase'
+        kwargs: Passed to the backend constructor (table_name, dsn, db_path, ...)
+    """
+    name = (name or os.getenv("STORAGE_BACKEND", "supabase")).lower()
+    if name not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend '{name}'. Choose from: {', '.join(STORAGE_BACKENDS)}")
+    return STORAGE_BACKENDS[name](**kwargs)
@@ -0,0 +1,29 @@
+"""
+Shared fixtures for the AI Baba test suite
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Make the project packages (utils, models, admin_system, config) importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLING_RATE = 16000
+
+def synthetic_speech(seconds: float, seed: int) -> np.ndarray:
+    """Deterministic speech-like audio: random tones switched on and off under a syllable-rate envelope"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLING_RATE)) / SAMPLING_RATE
+    signal = np.zeros_like(t)
+    for _ in range(int(seconds / 4) + 1):
+        frequency, onset, duration = rng.uniform(100, 3000), rng.uniform(0, seconds), rng.uniform(0.2, 2)
+        tone = slice(int(onset * SAMPLING_RATE), int((onset + duration) * SAMPLING_RATE))
+        signal[tone] += np.sin(2 * np.pi * frequency * t[tone]) * rng.uniform(0.2, 1)
+    signal *= 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t + rng.uniform(0, 6))
+    return (signal * 0.1 + rng.standard_normal(len(t)) * 0.005).astype(np.float32)
+
+@pytest.fixture
+def speech():
+    return synthetic_speech
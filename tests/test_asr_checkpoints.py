@@ -0,0 +1,168 @@
+"""
+Tests for checkpointed transcription of long recordings
+"""
+import threading
+import types
+
+import numpy as np
+import pytest
+
+import utils.youtube_transcriber as youtube_transcriber
+from utils.asr_checkpoints import ASRCheckpointStore
+from utils.transcript_cache import TranscriptCache
+from utils.youtube_transcriber import YouTubeTranscriber
+
+SPANS = [(0, 16000), (16000, 32000), (32000, 48000)]
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ASRCheckpointStore(str(tmp_path / "asr_jobs"))
+    monkeypatch.setattr(youtube_transcriber, 'get_checkpoint_store', lambda: store)
+    cache = TranscriptCache(str(tmp_path / "transcripts"))
+    monkeypatch.setattr(youtube_transcriber, 'get_transcript_cache', lambda: cache)
+    return store
+
+@pytest.fixture
+def transcriber(monkeypatch):
+    transcriber = YouTubeTranscriber(prefer_captions=False, use_vad=False, asr_profile='accurate', asr_workers=1)
+    transcriber.use_fingerprints = False
+    # Each chunk's text names the model that transcribed it
+    monkeypatch.setattr(transcriber, '_transcribe_span',
+                        lambda samples, offset, update_progress=print, workers=0: (transcriber.model_name, [], None))
+    return transcriber
+
+def saved_job(store, transcriber, video):
+    """A job interrupted after its first chunk, as a crash would leave it"""
+    job = store.open_job(video.video_id, transcriber.model_name, dict(transcriber.generation_params))
+    np.zeros(SPANS[-1][1], dtype=np.float32).tofile(job.audio_path)
+    job.set_spans(SPANS)
+    job.record_chunk(0, {'text': transcriber.model_name, 'segments': [], 'skipped_seconds': 0.0, 'asr_seconds': None})
+    job.close()
+    return job
+
+@pytest.fixture
+def video():
+    return types.SimpleNamespace(video_id='long_talk', title='Long talk', length=3600)
+
+def test_resume_skips_finished_chunks(store, transcriber, video, monkeypatch):
+    saved_job(store, transcriber, video)
+    monkeypatch.setattr(transcriber, '_initialize_model', lambda: True)
+    spans_transcribed = []
+    monkeypatch.setattr(transcriber, '_transcribe_span', lambda samples, offset, update_progress=print, workers=0:
+                        spans_transcribed.append(offset) or (transcriber.model_name, [], None))
+
+    success, message, transcript = transcriber.transcribe_with_checkpoints(video, lambda m: None)
+
+    assert success, message
+    assert spans_transcribed == [1.0, 2.0]
+    assert transcript == " ".join(["openai/whisper-large-v3"] * 3)
+
+def test_model_fallback_redoes_chunks_of_the_other_model(store, transcriber, video, monkeypatch):
+    saved_job(store, transcriber, video)
+
+    def fall_back():
+        transcriber.model_name = 'openai/whisper-base'
+        transcriber.generation_params['quantized'] = False
+        transcriber.transcriber = object()
+        return True
+    monkeypatch.setattr(transcriber, '_initialize_model', fall_back)
+
+    success, message, transcript = transcriber.transcribe_with_checkpoints(video, lambda m: None)
+
+    assert success, message
+    assert transcript == " ".join(["openai/whisper-base"] * 3)
+    assert transcriber.last_transcript_details['model_name'] == 'openai/whisper-base'
+
+class PrimaryModelMissingRegistry:
+    """Registry on a machine where only the fallback model loads"""
+
+    def get_pipeline(self, model_name, **kwargs):
+        if model_name != 'openai/whisper-base':
+            raise RuntimeError(f"{model_name} is too large for this machine")
+        return object()
+
+@pytest.mark.parametrize('asr_profile', ['accurate', 'auto'])
+def test_fallback_model_transcript_is_served_from_cache(store, monkeypatch, asr_profile):
+    monkeypatch.setattr(youtube_transcriber, 'get_asr_registry', PrimaryModelMissingRegistry)
+    # Short enough that auto picks a model larger than the fallback on a multi-core CPU
+    monkeypatch.setattr('os.cpu_count', lambda: 8)
+    video = types.SimpleNamespace(video_id='short_talk', title='Short talk', length=300)
+    transcriber = YouTubeTranscriber(prefer_captions=False, use_vad=True, asr_profile=asr_profile, asr_workers=1)
+    transcriber.use_fingerprints = False
+    monkeypatch.setattr(transcriber, '_transcribe_span',
+                        lambda samples, offset, update_progress=print, workers=0: (transcriber.model_name, [], None))
+    saved_job(store, transcriber, video)
+
+    success, message, transcript = transcriber.transcribe_with_checkpoints(video, lambda m: None)
+    assert success, message
+    assert transcriber.last_transcript_details['model_name'] == 'openai/whisper-base'
+
+    second_run = YouTubeTranscriber(prefer_captions=False, use_vad=True, asr_profile=asr_profile, asr_workers=1)
+    cached = second_run._cached_transcript(video.video_id, update_progress=lambda m: None)
+    assert cached is not None and cached[2] == transcript
+    assert second_run.last_transcript_details['model_name'] == 'openai/whisper-base'
+
+def test_model_fallback_mid_job_redoes_earlier_chunks(store, transcriber, video, monkeypatch):
+    # Parallel workers failed and the in-process model fell back while transcribing chunk 2
+    saved_job(store, transcriber, video)
+    monkeypatch.setattr(transcriber, '_initialize_model', lambda: True)
+
+    def transcribe_span(samples, offset, update_progress=print, workers=0):
+        transcriber.model_name = 'openai/whisper-base'
+        return transcriber.model_name, [], None
+    monkeypatch.setattr(transcriber, '_transcribe_span', transcribe_span)
+
+    success, message, transcript = transcriber.transcribe_with_checkpoints(video, lambda m: None)
+
+    assert success, message
+    assert transcript == " ".join(["openai/whisper-base"] * 3)
+
+@pytest.mark.parametrize('region_vad_ran', [False, True])
+def test_cache_key_records_whether_region_vad_ran(store, video, monkeypatch, region_vad_ran):
+    # VAD is on, but e.g. parallel workers transcribe chunks without the speech-region pass
+    transcriber = YouTubeTranscriber(prefer_captions=False, use_vad=True, asr_profile='accurate', asr_workers=1)
+    transcriber.use_fingerprints = False
+    vad_stats = {'skipped_seconds': 0.5, 'asr_seconds': 0.1} if region_vad_ran else None
+    monkeypatch.setattr(transcriber, '_transcribe_span',
+                        lambda samples, offset, update_progress=print, workers=0: ("words", [], vad_stats))
+    saved_job(store, transcriber, video)
+    monkeypatch.setattr(transcriber, '_initialize_model', lambda: True)
+
+    success, message, _ = transcriber.transcribe_with_checkpoints(video, lambda m: None)
+    assert success, message
+    assert (transcriber.last_transcript_details['vad'] is not None) == region_vad_ran
+
+    without_vad = YouTubeTranscriber(prefer_captions=False, use_vad=False, asr_profile='accurate', asr_workers=1)
+    assert (without_vad._cached_transcript(video.video_id) is not None) == (not region_vad_ran)
+    assert transcriber._cached_transcript(video.video_id) is not None
+
+def test_second_run_of_a_video_waits_for_the_first(store):
+    first = store.open_job('talk', 'model', {})
+    opened = threading.Event()
+    second = threading.Thread(target=lambda: opened.set() or store.open_job('talk', 'model', {}).close())
+    second.start()
+    second_started = opened.wait(5)
+    # A different video is not held up
+    store.open_job('other_talk', 'model', {}).close()
+    assert second_started and second.is_alive()
+
+    first.finish()
+    second.join(5)
+    assert not second.is_alive()
+    assert store._job_locks == {}
+
+def test_run_that_waited_reuses_the_finished_transcript(store, transcriber, video, monkeypatch):
+    running = store.open_job(video.video_id, transcriber.model_name, dict(transcriber.generation_params))
+    chunks_transcribed = []
+    monkeypatch.setattr(transcriber, '_transcribe_span', lambda *args, **kwargs: chunks_transcribed.append(args))
+    results = []
+    waiting = threading.Thread(target=lambda: results.append(transcriber.transcribe_with_checkpoints(video, lambda m: None)))
+    waiting.start()
+
+    youtube_transcriber.get_transcript_cache().put(video.video_id, transcriber.model_name,
+                                                  transcriber._transcript_params(False), "the finished transcript")
+    running.finish()
+    waiting.join(5)
+
+    assert results == [(True, results[0][1], "the finished transcript")]
+    assert chunks_transcribed == []
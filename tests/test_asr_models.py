@@ -0,0 +1,38 @@
+"""
+Tests for sharing one ASR pipeline between transcribers
+"""
+import threading
+import time
+
+from utils.youtube_transcriber import YouTubeTranscriber
+
+class OverlapDetectingPipeline:
+    """Stand-in pipeline that records whether two calls ever ran at once"""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, audio_input, **kwargs):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        with self._lock:
+            self.running -= 1
+        return {'text': "ok", 'chunks': []}
+
+def test_shared_pipeline_is_never_called_concurrently():
+    shared = OverlapDetectingPipeline()
+    transcribers = [YouTubeTranscriber(prefer_captions=False, use_vad=False, asr_workers=1) for _ in range(4)]
+    for transcriber in transcribers:
+        transcriber.transcriber = shared
+
+    threads = [threading.Thread(target=transcriber._run_pipeline, args=("clip.wav",)) for transcriber in transcribers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert shared.max_running == 1
@@ -0,0 +1,80 @@
+"""
+Tests for landmark fingerprinting of re-uploaded audio
+"""
+import numpy as np
+import pytest
+
+from utils.audio_fingerprint import FingerprintIndex, compute_fingerprint
+from utils.audio_utils import SAMPLING_RATE
+
+@pytest.fixture
+def index(tmp_path):
+    return FingerprintIndex(str(tmp_path / "fingerprints.db"))
+
+def reupload(audio: np.ndarray, seed: int = 0, lead_in_seconds: float = 3.3) -> np.ndarray:
+    """The same audio re-encoded: extra lead-in, quieter, noisier and low-passed"""
+    rng = np.random.default_rng(seed)
+    lead_in = rng.standard_normal(int(lead_in_seconds * SAMPLING_RATE)) * 0.002
+    copy = np.concatenate([lead_in, audio * 0.6]) + rng.standard_normal(len(audio) + len(lead_in)) * 0.01
+    return np.convolve(copy, np.ones(3) / 3, mode='same').astype(np.float32)
+
+def test_reupload_matches_original(index, speech):
+    original = speech(160, seed=1)
+    index.add('original', compute_fingerprint(original))
+    index.add('other', compute_fingerprint(speech(160, seed=2)))
+
+    match = index.match(compute_fingerprint(reupload(original)), exclude_video_id='copy')
+
+    assert match is not None
+    video_id, stats = match
+    assert video_id == 'original'
+    assert stats['coverage'] >= 0.6
+    assert stats['offset_seconds'] == pytest.approx(-3.3, abs=0.1)
+
+def test_short_clip_matches(index, speech):
+    clip = speech(40, seed=3)
+    index.add('clip', compute_fingerprint(clip))
+
+    match = index.match(compute_fingerprint(reupload(clip, lead_in_seconds=0.5)))
+
+    assert match is not None and match[0] == 'clip'
+
+def test_unrelated_audio_does_not_match(index, speech):
+    index.add('original', compute_fingerprint(speech(160, seed=1)))
+
+    assert index.match(compute_fingerprint(speech(160, seed=9))) is None
+
+def test_own_video_is_excluded(index, speech):
+    fingerprint = compute_fingerprint(speech(160, seed=1))
+    index.add('original', fingerprint)
+
+    assert index.match(fingerprint, exclude_video_id='original') is None
+
+@pytest.mark.parametrize('intro_seconds', [15, 45])
+def test_shared_intro_is_not_a_duplicate(index, speech, intro_seconds):
+    # Two different talks from one channel, both opening with the same jingle
+    intro = speech(intro_seconds, seed=42)
+    first = np.concatenate([intro, speech(150, seed=5)])
+    second = np.concatenate([intro, speech(150, seed=6)])
+    index.add('first', compute_fingerprint(first))
+
+    assert index.match(compute_fingerprint(second), exclude_video_id='second') is None
+
+def test_shared_intro_is_rejected_on_coverage_alone(tmp_path, speech):
+    # Fingerprinting from the very start, the intro's hashes do align...
+    index = FingerprintIndex(str(tmp_path / "fingerprints.db"))
+    intro = speech(15, seed=42)
+    first = np.concatenate([intro, speech(150, seed=5)])
+    second = np.concatenate([intro, speech(150, seed=6)])
+    index.add('first', compute_fingerprint(first, skip_seconds=0))
+
+    # ...but they only cover the opening seconds of the query
+    assert index.match(compute_fingerprint(second, skip_seconds=0)) is None
+
+def test_remove(index, speech):
+    original = speech(60, seed=1)
+    index.add('original', compute_fingerprint(original))
+    index.remove('original')
+
+    assert index.match(compute_fingerprint(original)) is None
+    assert index.get_stats() == {'recordings': 0, 'hashes': 0}
@@ -0,0 +1,135 @@
+"""
+Tests for the pipelined playlist ingestor: failure handling, checkpoints and backpressure
+"""
+import threading
+import time
+import types
+
+import pytest
+
+import utils.playlist_ingest as playlist_ingest
+from utils.playlist_ingest import PlaylistIngestor
+
+class BrokenTranscriber:
+    def __init__(self):
+        raise RuntimeError("model directory is not writable")
+
+class OfflineTranscriber:
+    prefer_captions = False
+
+    def _get_youtube(self, url):
+        raise ConnectionError("network is unreachable")
+
+@pytest.mark.parametrize('transcriber, expected', [
+    (BrokenTranscriber, "model directory is not writable"),
+    (OfflineTranscriber, "network is unreachable"),
+])
+def test_fetch_failures_reach_the_consumer(monkeypatch, transcriber, expected):
+    monkeypatch.setattr(playlist_ingest, 'YouTubeTranscriber', transcriber)
+    urls = [f"https://www.youtube.com/watch?v=video{i}" for i in range(5)]
+
+    results = []
+    consumer = threading.Thread(
+        target=lambda: results.extend(PlaylistIngestor(io_workers=2, max_pending_downloads=1).ingest(urls, lambda m: None)),
+        daemon=True
+    )
+    consumer.start()
+    consumer.join(timeout=30)
+
+    # The consumer must not block waiting for items the I/O workers never delivered
+    assert not consumer.is_alive()
+
+    assert sorted(result['video_url'] for result in results) == urls
+    assert all(not result['success'] and expected in result['message'] for result in results)
+
+class LongVideoTranscriber:
+    """Remote videos of 40 minutes, never cached; records which ASR path each takes"""
+    prefer_captions = False
+    calls = []
+
+    def _get_youtube(self, url):
+        return types.SimpleNamespace(video_id=url[-6:], title=url[-6:], length=2400)
+
+    def _build_video_info(self, yt):
+        return {'title': yt.title, 'length': yt.length}
+
+    def get_cached_transcript(self, url, update_progress):
+        return None
+
+    def prepare_checkpointed_audio(self, yt, update_progress):
+        self.calls.append(('prepare', yt.video_id))
+        return True, "Audio decoded"
+
+    def transcribe_with_checkpoints(self, yt, update_progress):
+        self.calls.append(('checkpoints', yt.video_id))
+        return True, "Transcribed", f"transcript of {yt.video_id}"
+
+    def decode_audio(self, yt, update_progress):
+        raise AssertionError("long videos must not be decoded into memory")
+
+def test_long_videos_use_checkpoints(monkeypatch):
+    monkeypatch.setattr(playlist_ingest, 'YouTubeTranscriber', LongVideoTranscriber)
+    monkeypatch.setattr(playlist_ingest, 'CHECKPOINT_MIN_SECONDS', 900)
+    LongVideoTranscriber.calls = []
+    urls = [f"https://www.youtube.com/watch?v=video{i}" for i in range(3)]
+
+    results = list(PlaylistIngestor(io_workers=2).ingest(urls, lambda m: None))
+
+    assert all(result['success'] and result['source'] == 'asr' for result in results)
+    assert sorted(call for call in LongVideoTranscriber.calls if call[0] == 'checkpoints') == \
+        [('checkpoints', f"video{i}") for i in range(3)]
+
+def test_local_files_over_two_hours_are_rejected(monkeypatch, tmp_path):
+    path = tmp_path / "retreat.mp3"
+    path.write_bytes(b"not really audio")
+    media = types.SimpleNamespace(video_id='file_abc', length=3 * 3600,
+                                  video_info=lambda: {'title': 'retreat.mp3', 'length': 3 * 3600})
+    monkeypatch.setattr(playlist_ingest.LocalMedia, 'from_path', staticmethod(lambda p: media))
+    monkeypatch.setattr(playlist_ingest, 'YouTubeTranscriber', lambda: types.SimpleNamespace(
+        _cached_transcript=lambda video_id, update_progress: None))
+
+    results = list(PlaylistIngestor().ingest([str(path)], lambda m: None))
+
+    assert not results[0]['success']
+    assert "too long" in results[0]['message']
+
+class ShortVideoTranscriber:
+    """Uncached 5 minute videos; tracks how many decoded ones wait for ASR at once"""
+    prefer_captions = False
+    lock = threading.Lock()
+    waiting = 0
+    most_waiting = 0
+
+    def _get_youtube(self, url):
+        return types.SimpleNamespace(video_id=url[-6:], title=url[-6:], length=300)
+
+    def _build_video_info(self, yt):
+        return {'title': yt.title, 'length': yt.length}
+
+    def get_cached_transcript(self, url, update_progress):
+        return None
+
+    def decode_audio(self, yt, update_progress):
+        cls = ShortVideoTranscriber
+        with cls.lock:
+            cls.waiting += 1
+            cls.most_waiting = max(cls.most_waiting, cls.waiting)
+        return True, "Decoded", f"/nonexistent/{yt.video_id}.wav"
+
+    def transcribe_audio_file(self, yt, audio, update_progress):
+        with ShortVideoTranscriber.lock:
+            ShortVideoTranscriber.waiting -= 1
+        time.sleep(0.05)
+        return True, "Transcribed", f"transcript of {yt.video_id}"
+
+def test_decoded_videos_waiting_for_asr_are_bounded(monkeypatch):
+    monkeypatch.setattr(playlist_ingest, 'YouTubeTranscriber', ShortVideoTranscriber)
+    urls = [f"https://www.youtube.com/watch?v=video{i}" for i in range(6)]
+    # Listed twice, transcribed once
+    urls.append(urls[0])
+
+    results = list(PlaylistIngestor(io_workers=4, max_pending_downloads=1).ingest(urls, lambda m: None))
+
+    assert sorted(result['video_url'] for result in results) == sorted(set(urls))
+    assert all(result['success'] for result in results)
+    assert ShortVideoTranscriber.most_waiting == 1
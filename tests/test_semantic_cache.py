@@ -0,0 +1,60 @@
+"""
+Tests for the Seek Wisdom answer cache
+"""
+import time
+
+import numpy as np
+
+from utils.semantic_cache import SemanticCache
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+def test_similar_question_hits_until_its_entry_changes():
+    cache = SemanticCache(similarity=0.9)
+    cache.put(unit(1, 0, 0), "answer", params=5, entry_ids=[7], floor=0.5)
+
+    assert cache.get(unit(1, 0.1, 0), params=5) == "answer"
+    assert cache.get(unit(1, 0.1, 0), params=3) is None
+    assert cache.get(unit(0, 1, 0), params=5) is None
+
+    assert cache.invalidate([7]) == 1
+    assert cache.get(unit(1, 0, 0), params=5) is None
+
+def test_answer_computed_across_an_invalidation_is_not_stored():
+    cache = SemanticCache(similarity=0.9)
+    generation = cache.generation
+    # A sync changes entries while the answer is being computed
+    cache.invalidate([3])
+    cache.put(unit(1, 0, 0), "stale answer", params=5, entry_ids=[3], generation=generation)
+    assert cache.get(unit(1, 0, 0), params=5) is None
+
+    cache.put(unit(1, 0, 0), "fresh answer", params=5, entry_ids=[3], generation=cache.generation)
+    assert cache.get(unit(1, 0, 0), params=5) == "fresh answer"
+
+def test_answers_expire_after_the_ttl():
+    cache = SemanticCache(similarity=0.9, ttl=0)
+    cache.put(unit(1, 0, 0), "answer", params=5)
+    time.sleep(0.01)
+
+    assert cache.get(unit(1, 0, 0), params=5) is None
+    assert cache.get_stats()['entries'] == 0
+
+def test_least_recently_used_answer_is_evicted_when_full():
+    cache = SemanticCache(similarity=0.9, max_entries=2)
+    cache.put(unit(1, 0, 0), "first", params=5)
+    cache.put(unit(0, 1, 0), "second", params=5)
+    # Reading the first makes the second the least recently used
+    assert cache.get(unit(1, 0, 0), params=5) == "first"
+    cache.put(unit(0, 0, 1), "third", params=5)
+
+    assert cache.get(unit(0, 1, 0), params=5) is None
+    assert cache.get(unit(1, 0, 0), params=5) == "first"
+    assert cache.get(unit(0, 0, 1), params=5) == "third"
+
+    single = SemanticCache(similarity=0.9, max_entries=1)
+    single.put(unit(1, 0, 0), "first", params=5)
+    single.put(unit(0, 1, 0), "second", params=5)
+    assert single.get(unit(1, 0, 0), params=5) is None
+    assert single.get(unit(0, 1, 0), params=5) == "second"
@@ -0,0 +1,62 @@
+"""
+Tests for the SQLite storage backend behind DatabaseManager
+"""
+import pytest
+
+from admin_system.database import DatabaseManager
+from admin_system.storage_backends import create_storage_backend
+from utils.categories import get_all_categories
+
+CATEGORIES = get_all_categories()
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(create_storage_backend('sqlite', db_path=str(tmp_path / "advice.db")))
+    success, message = manager.create_table_if_not_exists()
+    assert success, message
+    return manager
+
+def test_entry_round_trip(db):
+    metadata = {'source': 'test', 'methods_used': ['keywords']}
+    success, message, entry_id = db.insert_advice_entry(
+        CATEGORIES[0], ["sleep", "stress"], "Rest before midnight", "rest b4 midnight", 0.8, metadata, False
+    )
+    assert success, message
+
+    success, message, entry = db.get_entry_by_id(entry_id)
+    assert success, message
+    assert entry['category'] == CATEGORIES[0]
+    assert entry['subcategories_list'] == ["sleep", "stress"]
+    assert entry['information'] == "Rest before midnight"
+    assert entry['original_text'] == "rest b4 midnight"
+    assert entry['processing_metadata'] == metadata
+    assert entry['admin_confirmed'] is False
+
+    assert db.update_entry(entry_id, category=CATEGORIES[1], cleaned_text="Rest well", admin_confirmed=True)[0]
+    success, message, entry = db.get_entry_by_id(entry_id, columns=['id', 'category', 'information', 'admin_confirmed'])
+    assert success, message
+    assert entry == {'id': entry_id, 'category': CATEGORIES[1], 'information': "Rest well", 'admin_confirmed': True}
+
+def test_listing_search_and_deletion_log(db):
+    success, message, ids = db.batch_insert([
+        {'category': CATEGORIES[0], 'subcategories': [], 'cleaned_text': "Breathe slowly when anxious " * 10,
+         'admin_confirmed': True},
+        {'category': CATEGORIES[1], 'subcategories': [], 'cleaned_text': "Walk every morning", 'admin_confirmed': False}
+    ])
+    assert success, message
+
+    success, message, rows = db.get_entry_list(preview_length=20)
+    assert success, message
+    assert [row['id'] for row in rows] == [ids[0]]
+    assert rows[0]['preview'] == ("Breathe slowly when anxious " * 10)[:20] + '...'
+    assert 'information' not in rows[0]
+
+    success, message, found = db.search_entries("WALK")
+    assert success, message
+    assert [entry['id'] for entry in found] == [ids[1]]
+
+    assert db.delete_entry(ids[1])[0]
+    assert not db.get_entry_by_id(ids[1])[0]
+    success, message, deleted = db.get_deleted_since(None)
+    assert success, message
+    assert [row['id'] for row in deleted] == [ids[1]]
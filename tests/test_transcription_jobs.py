@@ -0,0 +1,31 @@
+"""
+Tests for background transcription job bookkeeping
+"""
+import pytest
+
+from utils.transcription_jobs import TranscriptionJobManager
+
+@pytest.fixture
+def manager(tmp_path):
+    return TranscriptionJobManager(db_path=str(tmp_path / "jobs.db"))
+
+def add_job(manager, job_id, status):
+    with manager._connect() as conn:
+        conn.execute(
+            "INSERT INTO transcription_jobs (id, video_url, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, f"https://youtu.be/{job_id}", status, manager._now(), manager._now())
+        )
+    manager._log_progress(job_id, "Downloading audio")
+
+def test_running_jobs_cannot_be_deleted(manager):
+    add_job(manager, "busy", 'running')
+    add_job(manager, "done", 'completed')
+
+    assert manager.delete_job("busy") == (False, "Job is still running")
+    job = manager.get_job("busy")
+    assert job['status'] == 'running'
+    assert [p['message'] for p in job['progress']] == ["Downloading audio"]
+
+    assert manager.delete_job("done")[0]
+    assert manager.get_job("done") is None
+    assert manager.delete_job("done") == (False, "No transcription job done")
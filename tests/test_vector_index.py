@@ -0,0 +1,68 @@
+"""
+Tests for the int8 vector index and the BM25 keyword index
+"""
+import sqlite3
+
+import numpy as np
+import pytest
+
+from utils.bm25_index import BM25Index
+from utils.vector_index import VectorIndex
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).standard_normal((400, 32)).astype(np.float32)
+
+@pytest.mark.parametrize('nlist', [0, 8])
+def test_search_finds_each_vector_itself(vectors, nlist):
+    index = VectorIndex.build(np.arange(400) + 1000, vectors, nlist=nlist)
+    for i in (0, 123, 399):
+        ids, scores = index.search(vectors[i], k=3, nprobe=8)
+        assert ids[0] == 1000 + i
+        assert scores[0] > 0.99
+
+def test_add_remove_relabel_and_compact(vectors):
+    index = VectorIndex.build(np.arange(300), vectors[:300], nlist=4, labels=np.arange(300) % 3)
+
+    index.add([300, 301], vectors[300:302], labels=[1, 1])
+    assert len(index) == 302
+    assert index.search(vectors[301], k=1, labels=[1])[0][0] == 301
+
+    assert index.remove([5, 301, 9999]) == 2
+    assert len(index) == 300
+    assert 5 not in index.search(vectors[5], k=10, nprobe=4)[0]
+
+    # Row 0 has label 0; moving it to 2 hides it from label-0 searches
+    assert index.relabel([0, 2], 2) == 1
+    assert 0 not in index.search(vectors[0], k=5, nprobe=4, labels=[0])[0]
+    assert index.search(vectors[0], k=1, nprobe=4, labels=[2])[0][0] == 0
+    assert index.label_counts().tolist() == [99, 101, 100]
+
+    compacted = index.compact()
+    assert (compacted.tombstones, compacted.appended) == (0, 0)
+    assert compacted.label_counts().tolist() == [99, 101, 100]
+    for i in (0, 300, 150):
+        assert compacted.search(vectors[i], k=1, nprobe=4)[0][0] == i
+    assert 5 not in compacted.search(vectors[5], k=10, nprobe=4)[0]
+
+def test_bm25_ranks_rare_and_repeated_terms_first():
+    conn = sqlite3.connect(":memory:")
+    index = BM25Index()
+    index.ensure_schema(conn)
+    documents = {
+        1: "anger passes when you breathe",
+        2: "anger anger anger is a guest",
+        3: "sleep early and wake early",
+        4: "you are not your thoughts",
+        5: "walk in the morning sun",
+    }
+    for entry_id, text in documents.items():
+        index.add(conn, entry_id, text.split())
+
+    assert [entry_id for entry_id, _ in index.search(conn, ["anger"])] == [2, 1]
+    # "you" is in too large a share of entries to be read when a rarer term is asked for
+    assert [entry_id for entry_id, _ in index.search(conn, ["you", "breathe"])] == [1]
+    assert index.search(conn, ["unknown"]) == []
+
+    index.remove(conn, [2])
+    assert [entry_id for entry_id, _ in index.search(conn, ["anger"])] == [1]
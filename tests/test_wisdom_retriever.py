@@ -0,0 +1,200 @@
+"""
+Tests for the wisdom index: build, incremental sync, confirmed-only and routed search
+"""
+import re
+import time
+import zlib
+
+import numpy as np
+import pytest
+
+from admin_system.database import DatabaseManager
+from admin_system.storage_backends import create_storage_backend
+import models.wisdom_retriever as wisdom_retriever
+from models.wisdom_retriever import WisdomRetriever
+from utils.categories import get_all_categories
+
+CATEGORIES = get_all_categories()
+
+def bag_of_words_encoder(texts, dim=64):
+    """Deterministic stand-in for the sentence encoder: texts sharing words are close"""
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for word in re.findall(r"\w+", text.lower()):
+            vectors[i] += np.random.default_rng(zlib.crc32(word.encode())).standard_normal(dim)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(create_storage_backend('sqlite', db_path=str(tmp_path / "advice.db")))
+    manager.create_table_if_not_exists()
+    return manager
+
+@pytest.fixture
+def retriever(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(WisdomRetriever, '_encode', lambda self, texts: bag_of_words_encoder(texts))
+    return WisdomRetriever(db, index_dir=str(tmp_path / "wisdom_index"))
+
+def add_entry(db, text, category=CATEGORIES[0], confirmed=True):
+    success, message, entry_id = db.insert_advice_entry(category, [], text, text, 0.9, {}, confirmed)
+    assert success, message
+    return entry_id
+
+def found_ids(result):
+    success, message, passages = result
+    assert success, message
+    return [passage['id'] for passage in passages]
+
+def sync(retriever):
+    # updated_at has sub-second resolution; make sure edits are stamped after the build
+    time.sleep(0.01)
+    success, message, stats = retriever.sync()
+    assert success, message
+    return stats
+
+def test_unconfirmed_entries_are_hidden_from_users(db, retriever):
+    confirmed = add_entry(db, "watch the breath when anxiety rises")
+    pending = add_entry(db, "anxiety passes like clouds in the sky", confirmed=False)
+    assert retriever.build()[0]
+
+    assert found_ids(retriever.search("anxiety", k=5, min_score=0)) == [confirmed]
+    assert pending not in found_ids(retriever.hybrid_search("anxiety", k=5, confirmed_only=True))
+
+    passages = {p['id']: p for p in retriever.hybrid_search("anxiety", k=5)[2]}
+    assert passages[confirmed]['admin_confirmed'] is True
+    assert passages[pending]['admin_confirmed'] is False
+
+def test_confirming_an_entry_makes_it_searchable(db, retriever):
+    add_entry(db, "a job interview needs preparation", category=CATEGORIES[1])
+    pending = add_entry(db, "anxiety passes like clouds in the sky", confirmed=False)
+    assert retriever.build()[0]
+    assert pending not in found_ids(retriever.search("anxiety clouds", k=5, min_score=0))
+
+    db.update_entry(pending, admin_confirmed=True)
+    stats = sync(retriever)
+
+    assert stats['embedded'] == 0
+    assert found_ids(retriever.search("anxiety clouds", k=1, min_score=0)) == [pending]
+    assert found_ids(retriever.search("anxiety clouds", k=1, min_score=0, categories=[CATEGORIES[0]])) == [pending]
+    assert retriever.search("anxiety clouds", k=1, min_score=0)[2][0]['admin_confirmed'] is True
+
+def test_unconfirming_an_entry_hides_it(db, retriever):
+    entry = add_entry(db, "anxiety passes like clouds in the sky")
+    assert retriever.build()[0]
+
+    db.update_entry(entry, admin_confirmed=False)
+    sync(retriever)
+
+    assert found_ids(retriever.search("anxiety clouds", k=5, min_score=0)) == []
+
+def test_recategorized_entry_moves_partition(db, retriever):
+    entry = add_entry(db, "anxiety passes like clouds in the sky", category=CATEGORIES[0])
+    assert retriever.build()[0]
+
+    db.update_entry(entry, category=CATEGORIES[2])
+    sync(retriever)
+
+    assert found_ids(retriever.search("anxiety", k=5, min_score=0, categories=[CATEGORIES[0]])) == []
+    assert found_ids(retriever.search("anxiety", k=5, min_score=0, categories=[CATEGORIES[2]])) == [entry]
+
+def test_edited_and_deleted_entries(db, retriever):
+    edited = add_entry(db, "anxiety passes like clouds in the sky")
+    deleted = add_entry(db, "savings grow with a monthly budget")
+    assert retriever.build()[0]
+
+    db.update_entry(edited, cleaned_text="gratitude turns what we have into enough")
+    db.delete_entry(deleted)
+    stats = sync(retriever)
+
+    assert stats['embedded'] == 1
+    assert found_ids(retriever.search("gratitude enough", k=1, min_score=0)) == [edited]
+    assert deleted not in found_ids(retriever.hybrid_search("budget savings", k=5))
+
+def test_sync_is_persisted(db, retriever, tmp_path):
+    pending = add_entry(db, "anxiety passes like clouds in the sky", confirmed=False)
+    assert retriever.build()[0]
+    db.update_entry(pending, admin_confirmed=True)
+    sync(retriever)
+
+    reloaded = WisdomRetriever(db, index_dir=retriever.index_dir)
+    assert found_ids(reloaded.search("anxiety clouds", k=1, min_score=0)) == [pending]
+
+def route_to(monkeypatch, category, confidence):
+    """Make both cheap classifier stages pick category with this confidence"""
+    results = lambda *args, **kwargs: [{'category': category, 'confidence': confidence}]
+    monkeypatch.setattr(wisdom_retriever.text_classifier, 'classify_with_keywords', results)
+    monkeypatch.setattr(wisdom_retriever.text_classifier, 'classify_with_embeddings', results)
+
+@pytest.fixture
+def two_categories(db, retriever):
+    """Two anxiety entries in each of the first two categories"""
+    ids = {
+        CATEGORIES[0]: [add_entry(db, "anxiety eases when you breathe slowly", CATEGORIES[0]),
+                        add_entry(db, "name the anxiety and it loosens", CATEGORIES[0])],
+        CATEGORIES[1]: [add_entry(db, "anxiety before an interview is normal", CATEGORIES[1]),
+                        add_entry(db, "prepare and the interview anxiety shrinks", CATEGORIES[1])]
+    }
+    assert retriever.build()[0]
+    return ids
+
+def test_confident_route_searches_only_its_categories(retriever, two_categories, monkeypatch):
+    route_to(monkeypatch, CATEGORIES[0], 0.9)
+
+    success, message, passages = retriever.routed_search("anxiety", k=2, min_score=-1)
+
+    assert success, message
+    assert sorted(p['id'] for p in passages) == sorted(two_categories[CATEGORIES[0]])
+    assert CATEGORIES[0] in message
+
+def test_unsure_route_searches_every_category(retriever, two_categories, monkeypatch):
+    route_to(monkeypatch, CATEGORIES[0], wisdom_retriever.ROUTE_MIN_CONFIDENCE / 2)
+
+    success, message, passages = retriever.routed_search("anxiety", k=4, min_score=-1)
+
+    assert success, message
+    assert sorted(p['id'] for p in passages) == sorted(two_categories[CATEGORIES[0]] + two_categories[CATEGORIES[1]])
+    assert "routing confidence" in message
+
+def test_too_few_routed_matches_fall_back_to_every_category(retriever, two_categories, monkeypatch):
+    route_to(monkeypatch, CATEGORIES[0], 0.9)
+
+    success, message, passages = retriever.routed_search("anxiety", k=3, min_score=-1)
+
+    assert success, message
+    assert len(passages) == 3
+    assert {p['id'] for p in passages} & set(two_categories[CATEGORIES[1]])
+    assert "too few matches" in message
+
+def test_similar_question_is_answered_from_cache_until_an_answer_changes(db, retriever, two_categories, monkeypatch):
+    route_to(monkeypatch, CATEGORIES[0], 0.9)
+    first = retriever.routed_search("how do I calm anxiety", k=2, min_score=-1)
+    assert first[0], first[1]
+
+    success, message, passages = retriever.routed_search("How do I calm anxiety?", k=2, min_score=-1)
+    assert success, message
+    assert "cached answer" in message
+    assert passages == first[2]
+
+    edited = passages[0]['id']
+    db.update_entry(edited, cleaned_text="gratitude turns what we have into enough")
+    sync(retriever)
+
+    success, message, passages = retriever.routed_search("How do I calm anxiety?", k=2, min_score=-1)
+    assert success, message
+    assert "cached answer" not in message
+    # Served from the index again: the edited entry scores differently now
+    assert [p['score'] for p in passages if p['id'] == edited] != [p['score'] for p in first[2] if p['id'] == edited]
+    assert retriever.cache.get_stats()['invalidated'] >= 1
+
+def test_deleting_an_entry_drops_cached_answers_built_from_it(db, retriever, two_categories, monkeypatch):
+    route_to(monkeypatch, CATEGORIES[0], 0.9)
+    first = retriever.routed_search("breathe slowly", k=1, min_score=-1)
+    assert first[0], first[1]
+
+    db.delete_entry(first[2][0]['id'])
+    sync(retriever)
+
+    success, message, passages = retriever.routed_search("breathe slowly", k=1, min_score=-1)
+    assert success, message
+    assert "cached answer" not in message
+    assert passages[0]['id'] != first[2][0]['id']
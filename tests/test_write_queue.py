@@ -0,0 +1,91 @@
+"""
+Tests for the write-behind queue: journal compaction and crash replay
+"""
+import json
+
+import pytest
+
+from admin_system.database import DatabaseManager
+from admin_system.storage_backends import create_storage_backend
+from admin_system.write_queue import TICKET_METADATA_KEY, WriteBehindQueue
+from utils.categories import get_all_categories
+
+CATEGORY = get_all_categories()[0]
+
+class SwitchableDatabase:
+    """DatabaseManager stand-in whose batch inserts can be made to fail"""
+
+    def __init__(self, db):
+        self.db = db
+        self.failing = False
+
+    def batch_insert(self, entries):
+        if self.failing:
+            return False, "database unavailable", []
+        return self.db.batch_insert(entries)
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(create_storage_backend('sqlite', db_path=str(tmp_path / "advice.db")))
+    manager.create_table_if_not_exists()
+    return SwitchableDatabase(manager)
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "write_queue.jsonl")
+
+def make_entry(text):
+    return {'category': CATEGORY, 'subcategories': [], 'cleaned_text': text, 'processing_metadata': {}}
+
+def journal_tickets(journal_path):
+    with open(journal_path, encoding='utf-8') as f:
+        return [json.loads(line)['ticket'] for line in f if line.strip()]
+
+def stored_texts(db):
+    success, message, entries = db.get_entries(limit=100, confirmed_only=False)
+    assert success, message
+    return sorted(entry['information'] for entry in entries)
+
+def test_compaction_keeps_failed_entries_and_drops_saved_ones(db, journal_path):
+    write_queue = WriteBehindQueue(db, journal_path, flush_interval=0.05, max_retries=1)
+    db.failing = True
+    failed = write_queue.submit(make_entry("let the breath slow down"))
+    assert write_queue.flush(5)
+    assert write_queue.get_status(failed)['state'] == 'failed'
+
+    db.failing = False
+    saved = write_queue.submit(make_entry("rest when the body asks"))
+    assert write_queue.flush(5)
+    write_queue.stop()
+    assert write_queue.get_status(saved)['state'] == 'saved'
+
+    assert journal_tickets(journal_path) == [failed]
+    replayed = WriteBehindQueue(db, journal_path, flush_interval=0.05)
+    assert replayed.flush(5)
+    replayed.stop()
+    assert replayed.get_status(failed)['state'] == 'saved'
+    assert stored_texts(db) == ["let the breath slow down", "rest when the body asks"]
+    assert journal_tickets(journal_path) == []
+
+def test_replay_skips_entries_saved_before_the_crash(db, journal_path):
+    # Crash after the insert committed but before the 'done' record was written
+    entry = make_entry("anger is a guest, not the host")
+    entry['processing_metadata'] = {TICKET_METADATA_KEY: "t-crashed"}
+    with open(journal_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'op': 'enqueue', 'ticket': "t-crashed", 'submitted_at': "2000-01-01T00:00:00", 'entry': entry}) + "\n")
+        f.write(json.dumps({'op': 'enqueue', 'ticket': "t-unsent", 'entry': make_entry("sleep before midnight")}) + "\n")
+    success, message, (entry_id,) = db.batch_insert([entry])
+    assert success, message
+
+    write_queue = WriteBehindQueue(db, journal_path, flush_interval=0.05)
+    assert write_queue.flush(5)
+    write_queue.stop()
+
+    crashed = write_queue.get_status("t-crashed")
+    assert (crashed['state'], crashed['entry_id']) == ('saved', entry_id)
+    assert write_queue.get_status("t-unsent")['state'] == 'saved'
+    assert stored_texts(db) == ["anger is a guest, not the host", "sleep before midnight"]
+    assert journal_tickets(journal_path) == []
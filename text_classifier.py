@@ -27,6 +27,21 @@ from utils.categories import (
     find_categories_by_keywords, CATEGORY_PROMPTS, validate_category_assignment
 )
 
+# Sentence embedding model shared by classification and wisdom retrieval
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+_sentence_encoder = None
+
+def get_sentence_encoder() -> Optional[SentenceTransformer]:
+    """Load the shared MiniLM sentence encoder once per process (None if it fails)"""
+    global _sentence_encoder
+    if _sentence_encoder is None:
+        try:
+            _sentence_encoder = SentenceTransformer(EMBEDDING_MODEL_NAME)
+            print("Loaded sentence transformer model")
+        except Exception as e:
+            print(f"Error loading sentence transformer: {e}")
+    return _sentence_encoder
+
 class TextClassifier:
     """Advanced text classification using multiple AI techniques"""
     
@@ -48,12 +63,7 @@ class TextClassifier:
     def _load_sentence_transformer(self):
         """Load sentence transformer model"""
         if self.sentence_transformer is None:
-            try:
-                self.sentence_transformer = SentenceTransformer('all-MiniLM-L6-v2')
-                print("Loaded sentence transformer model")
-            except Exception as e:
-                print(f"Error loading sentence transformer: {e}")
-                self.sentence_transformer = None
+            self.sentence_transformer = get_sentence_encoder()
         return self.sentence_transformer is not None
     
     def _load_zero_shot_classifier(self):
@@ -150,8 +160,15 @@ class TextClassifier:
             print(f"Error in zero-shot classification: {e}")
             return []
     
-    def classify_with_embeddings(self, text: str, top_k: int = 3) -> List[Dict]:
-        """Classify text using sentence embeddings"""
+    def classify_with_embeddings(self, text: str, top_k: int = 3,
+                                 text_embedding: Optional[np.ndarray] = None) -> List[Dict]:
+        """
+        Classify text using sentence embeddings
+
+        Args:
+            text_embedding: The text's embedding from the shared encoder, when
+                            the caller already has it
+        """
         if not self._load_sentence_transformer():
             return []
         
@@ -160,7 +177,9 @@ class TextClassifier:
         
         try:
             # Get text embedding
-            text_embedding = self.sentence_transformer.encode([text])
+            if text_embedding is None:
+                text_embedding = self.sentence_transformer.encode([text])
+            text_embedding = np.atleast_2d(text_embedding)
             
             # Calculate similarities
             similarities = cosine_similarity(text_embedding, self.category_embeddings['embeddings'])[0]
@@ -288,6 +288,13 @@ class TextProcessor:
         
         return results
     
+    def tokenize(self, text: str, lemmatize: bool = False) -> List[str]:
+        """Lowercase alphabetic content words (stopwords removed), in order, optionally lemmatized"""
+        words = [w for w in word_tokenize(text.lower()) if w not in self.stop_words and w.isalpha()]
+        if lemmatize:
+            words = [self.lemmatizer.lemmatize(w) for w in words]
+        return words
+    
     def get_text_statistics(self, text: str) -> Dict:
         """Get comprehensive text statistics"""
         sentences = self.extract_sentences(text)
@@ -314,13 +321,8 @@ class TextProcessor:
             Validation results
         """
         # Extract key content words from both texts
-        def get_content_words(text):
-            words = word_tokenize(text.lower())
-            content_words = [w for w in words if w not in self.stop_words and w.isalpha()]
-            return set(content_words)
-        
-        original_words = get_content_words(original)
-        cleaned_words = get_content_words(cleaned)
+        original_words = set(self.tokenize(original))
+        cleaned_words = set(self.tokenize(cleaned))
         
         # Calculate preservation metrics
         if original_words:
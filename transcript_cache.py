@@ -0,0 +1,137 @@
+"""
+Persistent transcript cache for AI Baba
+Content-addressed store of finished transcripts keyed by video id, ASR model
+and generation parameters, so re-processing a video skips download and ASR
+"""
+import os
+import json
+import zlib
+import time
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "transcripts"
+)
+
+class TranscriptCache:
+    """Compressed on-disk transcripts with size-bounded LRU eviction"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = 500 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(video_id: str, model_name: str, params: Dict = None) -> str:
+        """Stable content address for (video, model, generation parameters)"""
+        payload = json.dumps(
+            {'video_id': video_id, 'model_name': model_name, 'params': params or {}},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json.z")
+
+    def get(self, video_id: str, model_name: str, params: Dict = None) -> Optional[Dict]:
+        """
+        Look up a transcript
+
+        Returns:
+            Dictionary with text, segments and metadata, or None on a miss
+        """
+        path = self._path(self.make_key(video_id, model_name, params))
+        try:
+            with open(path, 'rb') as f:
+                record = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+        except FileNotFoundError:
+            return None
+        except (OSError, zlib.error, ValueError) as e:
+            print(f"Warning: Dropping unreadable transcript cache entry {path}: {e}")
+            self._remove(path)
+            return None
+
+        # Touch for LRU ordering
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return record
+
+    def put(self, video_id: str, model_name: str, params: Dict, text: str,
+            segments: List[Dict] = None, metadata: Dict = None) -> str:
+        """Store a transcript and return its cache key"""
+        key = self.make_key(video_id, model_name, params)
+        record = {
+            'video_id': video_id,
+            'model_name': model_name,
+            'params': params or {},
+            'text': text,
+            'segments': segments or [],
+            'metadata': metadata or {},
+            'created_at': time.time()
+        }
+        data = zlib.compress(json.dumps(record, default=str).encode('utf-8'), 6)
+
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        self._evict()
+        return key
+
+    def invalidate(self, video_id: str, model_name: str, params: Dict = None):
+        self._remove(self._path(self.make_key(video_id, model_name, params)))
+
+    def stats(self) -> Dict:
+        entries = self._entries()
+        return {
+            'entries': len(entries),
+            'total_bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes
+        }
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json.z'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def _evict(self):
+        """Remove least recently used entries until under max_bytes"""
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return
+            for path, size, _ in sorted(entries, key=lambda e: e[2]):
+                self._remove(path)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+# Global cache instance, size bound from TRANSCRIPT_CACHE_MAX_MB
+transcript_cache = TranscriptCache(max_bytes=int(float(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "500")) * 1024 * 1024))
+
+def get_transcript_cache() -> TranscriptCache:
+    """Get global transcript cache instance"""
+    return transcript_cache
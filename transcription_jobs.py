@@ -0,0 +1,239 @@
+"""
+Background transcription jobs for AI Baba admin system
+Runs YouTube download + ASR on worker threads and persists job status and
+progress messages to SQLite, so the admin UI can poll, survive page refreshes
+and collect results after a rerun
+"""
+import os
+import json
+import uuid
+import sqlite3
+import datetime
+import threading
+from contextlib import closing, contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterator, Optional, Tuple
+
+from utils.youtube_transcriber import YouTubeTranscriber
+
+DEFAULT_JOBS_DB = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "transcription_jobs.db"
+)
+
+JOBS_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS transcription_jobs (
+    id TEXT PRIMARY KEY,
+    video_url TEXT NOT NULL,
+    video_id TEXT,
+    status TEXT NOT NULL,
+    message TEXT,
+    video_info TEXT,
+    transcript TEXT,
+    details TEXT,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON transcription_jobs (created_at);
+CREATE TABLE IF NOT EXISTS transcription_job_progress (
+    job_id TEXT NOT NULL,
+    created_at TEXT,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_job_progress_job ON transcription_job_progress (job_id);
+"""
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+class TranscriptionJobManager:
+    """Submit transcription work and poll it by job id"""
+
+    def __init__(self, db_path: str = DEFAULT_JOBS_DB, max_workers: int = 1):
+        """
+        Args:
+            db_path: SQLite file holding job state
+            max_workers: Concurrent jobs; ASR is CPU/GPU bound so keep this small
+        """
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="transcription-job")
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(JOBS_SCHEMA_SQL)
+        self._resume_interrupted_jobs()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection that commits on success and is always closed (sqlite3's own context manager only commits)"""
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn:
+            conn.row_factory = sqlite3.Row
+            with conn:
+                yield conn
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.datetime.utcnow().isoformat()
+
+    def submit(self, video_url: str) -> str:
+        """
+        Queue a video for transcription
+
+        Returns:
+            Job id; an already queued/running job for the same video is reused
+        """
+        video_id = YouTubeTranscriber()._extract_video_id(video_url)
+
+        with self._lock:
+            if video_id:
+                with self._connect() as conn:
+                    row = conn.execute(
+                        "SELECT id FROM transcription_jobs WHERE video_id = ? AND status IN (?, ?) "
+                        "ORDER BY created_at DESC LIMIT 1",
+                        (video_id, *ACTIVE_STATUSES)
+                    ).fetchone()
+                if row:
+                    return row['id']
+
+            job_id = uuid.uuid4().hex
+            now = self._now()
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO transcription_jobs (id, video_url, video_id, status, message, created_at, updated_at) "
+                    "VALUES (?, ?, ?, 'queued', 'Waiting for a worker', ?, ?)",
+                    (job_id, video_url, video_id, now, now)
+                )
+
+        self._executor.submit(self._run_job, job_id, video_url)
+        return job_id
+
+    def get_job(self, job_id: str, progress_limit: int = 20) -> Optional[Dict]:
+        """Job status with its most recent progress messages (oldest first)"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM transcription_jobs WHERE id = ?", (job_id,)).fetchone()
+            if not row:
+                return None
+            progress = conn.execute(
+                "SELECT created_at, message FROM transcription_job_progress WHERE job_id = ? "
+                "ORDER BY rowid DESC LIMIT ?",
+                (job_id, progress_limit)
+            ).fetchall()
+
+        job = self._row_to_job(row)
+        job['progress'] = [dict(p) for p in reversed(progress)]
+        return job
+
+    def list_jobs(self, limit: int = 20) -> List[Dict]:
+        """Most recent jobs, newest first (transcripts omitted)"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, video_url, video_id, status, message, video_info, created_at, updated_at "
+                "FROM transcription_jobs ORDER BY created_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def get_result(self, job_id: str) -> Tuple[bool, str, Optional[str], Optional[Dict]]:
+        """
+        Collect a finished job
+
+        Returns:
+            (success, message, transcript, video_info)
+        """
+        job = self.get_job(job_id, progress_limit=0)
+        if not job:
+            return False, f"No transcription job {job_id}", None, None
+        if job['status'] in ACTIVE_STATUSES:
+            return False, f"Job is still {job['status']}", None, None
+        if job['status'] != 'completed':
+            return False, job['message'] or f"Job {job['status']}", None, None
+        return True, job['message'], job['transcript'], job['video_info']
+
+    def delete_job(self, job_id: str) -> Tuple[bool, str]:
+        """Remove a finished job and its progress log; queued or running jobs are refused"""
+        with self._connect() as conn:
+            deleted = conn.execute(
+                "DELETE FROM transcription_jobs WHERE id = ? AND status NOT IN (?, ?)", (job_id, *ACTIVE_STATUSES)
+            ).rowcount
+            if not deleted:
+                row = conn.execute("SELECT status FROM transcription_jobs WHERE id = ?", (job_id,)).fetchone()
+                if row:
+                    return False, f"Job is still {row['status']}"
+                return False, f"No transcription job {job_id}"
+            conn.execute("DELETE FROM transcription_job_progress WHERE job_id = ?", (job_id,))
+        return True, f"Removed job {job_id}"
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        for column in ('video_info', 'details'):
+            if job.get(column):
+                job[column] = json.loads(job[column])
+        return job
+
+    def _update(self, job_id: str, **fields):
+        fields['updated_at'] = self._now()
+        for column in ('video_info', 'details'):
+            if column in fields and fields[column] is not None:
+                fields[column] = json.dumps(fields[column], default=str)
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE transcription_jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def _log_progress(self, job_id: str, message: str):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO transcription_job_progress (job_id, created_at, message) VALUES (?, ?, ?)",
+                (job_id, self._now(), message)
+            )
+            conn.execute(
+                "UPDATE transcription_jobs SET message = ?, updated_at = ? WHERE id = ?",
+                (message, self._now(), job_id)
+            )
+
+    def _run_job(self, job_id: str, video_url: str):
+        self._update(job_id, status='running', message='Starting')
+        try:
+            transcriber = YouTubeTranscriber()
+
+            success, message, video_info = transcriber.get_video_info(video_url)
+            if not success:
+                self._update(job_id, status='failed', message=message)
+                return
+            self._update(job_id, video_info=video_info)
+
+            success, message, transcript = transcriber.generate_transcript(
+                video_url, progress_callback=lambda m: self._log_progress(job_id, m)
+            )
+            if success:
+                details = {k: v for k, v in transcriber.last_transcript_details.items() if k != 'segments'}
+                self._update(job_id, status='completed', message=message, transcript=transcript, details=details)
+            else:
+                self._update(job_id, status='failed', message=message)
+        except Exception as e:
+            self._update(job_id, status='failed', message=f"Job crashed: {str(e)}")
+
+    def _resume_interrupted_jobs(self):
+        """Re-queue jobs a previous process left queued or running"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, video_url FROM transcription_jobs WHERE status IN (?, ?) ORDER BY created_at",
+                ACTIVE_STATUSES
+            ).fetchall()
+        for row in rows:
+            self._update(row['id'], status='queued', message='Re-queued after restart')
+            self._executor.submit(self._run_job, row['id'], row['video_url'])
+
+# Global job manager instance, created on first use
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+def get_job_manager() -> TranscriptionJobManager:
+    """Get the process-wide transcription job manager"""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = TranscriptionJobManager(
+                max_workers=int(os.getenv("TRANSCRIPTION_WORKERS", "1"))
+            )
+    return _job_manager
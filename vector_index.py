@@ -0,0 +1,285 @@
+"""
+Compact vector index for AI Baba retrieval
+Keeps L2-normalized embeddings as int8 codes with a per-row scale (a quarter
+of the float32 size) and, once the corpus is large, groups them into IVF lists
+around k-means centroids so a query only scores the few closest lists.
+Rows are also ordered by a small integer label inside each list, so a search
+restricted to some labels (a category partition) only scores those slices.
+Incremental updates append to a small flat tail and tombstone replaced rows
+until the next compaction
+"""
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Below this many vectors an exact flat scan is already fast enough
+IVF_MIN_VECTORS = int(os.getenv("VECTOR_IVF_MIN_VECTORS", "5000"))
+# IVF lists scored per query; more is slower but closer to an exact search
+DEFAULT_NPROBE = int(os.getenv("VECTOR_NPROBE", "8"))
+KMEANS_ITERATIONS = 10
+# Centroids are trained on at most this many vectors
+KMEANS_SAMPLE_SIZE = 50000
+# Compact once appended plus tombstoned rows reach this share of the indexed rows
+COMPACT_FRACTION = float(os.getenv("VECTOR_COMPACT_FRACTION", "0.2"))
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """float32 rows scaled to unit length (so dot product is cosine similarity)"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+def quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric int8 codes and the float32 scale that restores each row"""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales = np.maximum(scales, 1e-12).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 10000) -> np.ndarray:
+    """Index of the closest centroid for every row, in batches to bound memory"""
+    return np.concatenate([
+        (vectors[start:start + batch_size] @ centroids.T).argmax(axis=1)
+        for start in range(0, len(vectors), batch_size)
+    ]) if len(vectors) else np.empty(0, dtype=np.int64)
+
+def train_centroids(vectors: np.ndarray, count: int, iterations: int = KMEANS_ITERATIONS,
+                    seed: int = 0) -> np.ndarray:
+    """Spherical k-means on (a sample of) unit vectors"""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > KMEANS_SAMPLE_SIZE:
+        vectors = vectors[rng.choice(len(vectors), KMEANS_SAMPLE_SIZE, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), count, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = _nearest(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        sizes = np.bincount(assignment, minlength=count)
+        # An empty list restarts from a random vector instead of collapsing
+        empty = sizes == 0
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = normalize(sums)
+    return centroids
+
+class VectorIndex:
+    """
+    int8 vectors with optional IVF lists
+
+    The first main_count rows are stored sorted by list and then by label, so
+    each list is one contiguous slice (list_offsets[i]:list_offsets[i + 1])
+    and each label one slice within it; without centroids they form a single
+    list. Rows added later follow them and are always scanned. Removed rows
+    stay in place with live set to False until compact(). Labels are small
+    non-negative integers that searches can be restricted to.
+
+    Updates never modify arrays in place, so a shallow copy can be changed
+    while searches keep running against the original.
+    """
+
+    def __init__(self, dim: int, ids: np.ndarray = None, codes: np.ndarray = None,
+                 scales: np.ndarray = None, centroids: Optional[np.ndarray] = None,
+                 list_offsets: Optional[np.ndarray] = None, live: Optional[np.ndarray] = None,
+                 main_count: Optional[int] = None, labels: Optional[np.ndarray] = None):
+        self.dim = dim
+        self.ids = ids if ids is not None else np.empty(0, dtype=np.int64)
+        self.codes = codes if codes is not None else np.empty((0, dim), dtype=np.int8)
+        self.scales = scales if scales is not None else np.empty(0, dtype=np.float32)
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.live = live if live is not None else np.ones(len(self.ids), dtype=bool)
+        self.main_count = len(self.ids) if main_count is None else main_count
+        self.labels = labels if labels is not None else np.zeros(len(self.ids), dtype=np.int16)
+        # (list << 16 | label) of each main row, ascending, to find partition slices
+        lists = (np.repeat(np.arange(self.nlist), np.diff(self.list_offsets)) if self.centroids is not None
+                 else np.zeros(self.main_count, dtype=np.int64))
+        self._partition_keys = (lists << 16) | self.labels[:self.main_count].astype(np.int64)
+
+    @classmethod
+    def build(cls, ids, vectors: np.ndarray, nlist: Optional[int] = None, labels=None) -> 'VectorIndex':
+        """
+        Index vectors under their ids
+
+        Args:
+            nlist: IVF lists (default sqrt of the row count once there are
+                   IVF_MIN_VECTORS rows; 0 for a flat index)
+            labels: Per-row labels for restricted searches (default 0)
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        labels = np.zeros(len(ids), dtype=np.int16) if labels is None else np.asarray(labels, dtype=np.int16)
+        vectors = normalize(vectors)
+        if nlist is None:
+            nlist = int(np.sqrt(len(vectors))) if len(vectors) >= IVF_MIN_VECTORS else 0
+        nlist = min(nlist, len(vectors))
+
+        centroids = list_offsets = None
+        if nlist > 1:
+            centroids = train_centroids(vectors, nlist)
+            assignment = _nearest(vectors, centroids)
+            order = np.lexsort((labels, assignment))
+            list_offsets = np.searchsorted(assignment[order], np.arange(nlist + 1)).astype(np.int64)
+        else:
+            order = np.argsort(labels, kind='stable')
+        ids, vectors, labels = ids[order], vectors[order], labels[order]
+
+        codes, scales = quantize(vectors)
+        return cls(vectors.shape[1], ids, codes, scales, centroids, list_offsets, labels=labels)
+
+    def __len__(self) -> int:
+        """Live (searchable) rows"""
+        return int(self.live.sum())
+
+    @property
+    def nlist(self) -> int:
+        return 0 if self.centroids is None else len(self.centroids)
+
+    @property
+    def tombstones(self) -> int:
+        return len(self.ids) - len(self)
+
+    @property
+    def appended(self) -> int:
+        return len(self.ids) - self.main_count
+
+    def remove(self, ids) -> int:
+        """Tombstone every row with one of these ids; returns how many were live"""
+        removed = np.isin(self.ids, np.asarray(ids, dtype=np.int64)) & self.live
+        if removed.any():
+            self.live = self.live & ~removed
+        return int(removed.sum())
+
+    def add(self, ids, vectors: np.ndarray, labels=None):
+        """Add (or replace) rows; they are scanned flat until the next compact()"""
+        ids = np.asarray(ids, dtype=np.int64)
+        labels = np.zeros(len(ids), dtype=np.int16) if labels is None else np.asarray(labels, dtype=np.int16)
+        self.remove(ids)
+        codes, scales = quantize(normalize(vectors))
+        self.ids = np.concatenate([self.ids, ids])
+        self.codes = np.concatenate([self.codes, codes])
+        self.scales = np.concatenate([self.scales, scales])
+        self.live = np.concatenate([self.live, np.ones(len(ids), dtype=bool)])
+        self.labels = np.concatenate([self.labels, labels])
+
+    def _rows(self, ids) -> np.ndarray:
+        return np.flatnonzero(np.isin(self.ids, np.asarray(ids, dtype=np.int64)) & self.live)
+
+    def get_vectors(self, ids, labels=None) -> Tuple[np.ndarray, np.ndarray]:
+        """(ids, approximate unit vectors) of the live rows among ids, optionally only with these labels"""
+        rows = self._rows(ids)
+        if labels is not None:
+            rows = rows[np.isin(self.labels[rows], labels)]
+        return self.ids[rows], self.codes[rows].astype(np.float32) * self.scales[rows][:, None]
+
+    def relabel(self, ids, label: int) -> int:
+        """
+        Move live rows to another label without re-embedding them
+
+        The rows are re-appended under the new label (and the old ones
+        tombstoned) so the main rows stay sorted by label.
+        """
+        rows = self._rows(ids)
+        rows = rows[self.labels[rows] != label]
+        if len(rows):
+            moved = np.zeros(len(self.ids), dtype=bool)
+            moved[rows] = True
+            self.live = self.live & ~moved
+            self.ids = np.concatenate([self.ids, self.ids[rows]])
+            self.codes = np.concatenate([self.codes, self.codes[rows]])
+            self.scales = np.concatenate([self.scales, self.scales[rows]])
+            self.live = np.concatenate([self.live, np.ones(len(rows), dtype=bool)])
+            self.labels = np.concatenate([self.labels, np.full(len(rows), label, dtype=np.int16)])
+        return len(rows)
+
+    def label_counts(self) -> np.ndarray:
+        """Live rows per label"""
+        return np.bincount(self.labels[self.live].astype(np.int64))
+
+    def needs_compaction(self) -> bool:
+        """Too many appended or dead rows, or grown past the flat-scan size"""
+        if self.centroids is None and len(self) >= IVF_MIN_VECTORS:
+            return True
+        return self.appended + self.tombstones > COMPACT_FRACTION * max(self.main_count, IVF_MIN_VECTORS)
+
+    def compact(self) -> 'VectorIndex':
+        """New index of the live rows with retrained lists (no re-embedding needed)"""
+        vectors = self.codes[self.live].astype(np.float32) * self.scales[self.live][:, None]
+        if not len(vectors):
+            return VectorIndex(self.dim)
+        return VectorIndex.build(self.ids[self.live], vectors, labels=self.labels[self.live])
+
+    def _candidate_rows(self, query: np.ndarray, nprobe: int, labels=None):
+        if labels is None:
+            if self.centroids is None or nprobe >= self.nlist:
+                return np.flatnonzero(self.live)
+            probed = np.argpartition(-(self.centroids @ query), nprobe)[:nprobe]
+            rows = np.concatenate([np.arange(self.list_offsets[i], self.list_offsets[i + 1]) for i in probed] +
+                                  [np.arange(self.main_count, len(self.ids))])
+            return rows[self.live[rows]]
+
+        # Restricted: the label slices of the closest lists that hold any of them
+        labels = np.unique(np.asarray(labels, dtype=np.int64))
+        lists = np.argsort(-(self.centroids @ query)) if self.centroids is not None else np.zeros(1, dtype=np.int64)
+        keys = (lists[:, None] << 16) | labels[None, :]
+        starts = np.searchsorted(self._partition_keys, keys)
+        ends = np.searchsorted(self._partition_keys, keys, side='right')
+        probed = np.flatnonzero((ends > starts).any(axis=1))[:nprobe]
+        tail = np.arange(self.main_count, len(self.ids))
+        rows = np.concatenate([np.arange(start, end) for start, end in zip(starts[probed].ravel(), ends[probed].ravel())
+                               if end > start] + [tail[np.isin(self.labels[tail], labels)]])
+        return rows[self.live[rows]]
+
+    def search(self, query: np.ndarray, k: int = 5, nprobe: int = DEFAULT_NPROBE,
+               labels=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Closest rows to a query vector
+
+        Args:
+            labels: Only consider rows with one of these labels (default all)
+
+        Returns:
+            (ids, cosine scores), best first
+        """
+        query = normalize(query)[0]
+        rows = self._candidate_rows(query, nprobe, labels)
+        if len(rows) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = (self.codes[rows].astype(np.float32) @ query) * self.scales[rows]
+        ids = self.ids[rows]
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return ids[top], scores[top]
+
+    @property
+    def nbytes(self) -> int:
+        return self.ids.nbytes + self.codes.nbytes + self.scales.nbytes + self.labels.nbytes + (
+            self.centroids.nbytes if self.centroids is not None else 0)
+
+    def save(self, path: str):
+        """Write the index to a .npz file (atomically replacing any previous one)"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            dim=np.array(self.dim),
+            ids=self.ids,
+            codes=self.codes,
+            scales=self.scales,
+            centroids=self.centroids if self.centroids is not None else np.empty((0, self.dim), dtype=np.float32),
+            list_offsets=self.list_offsets if self.list_offsets is not None else np.empty(0, dtype=np.int64),
+            live=self.live,
+            main_count=np.array(self.main_count),
+            labels=self.labels
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'VectorIndex':
+        with np.load(path) as data:
+            centroids = data['centroids']
+            return cls(
+                int(data['dim']), data['ids'], data['codes'], data['scales'],
+                centroids if len(centroids) else None,
+                data['list_offsets'] if len(centroids) else None,
+                data['live'], int(data['main_count']), data['labels']
+            )
@@ -0,0 +1,725 @@
+"""
+Retrieval engine behind AI Baba's "Seek Wisdom" and the admin search box
+Embeds every advice entry once with the classifier's MiniLM model and keeps
+the vectors in a persisted VectorIndex, with the passage text and a BM25
+keyword index in a small SQLite file beside it. A user's problem is answered
+from the confirmed passages closest in meaning, and admin searches fuse
+keyword and embedding scores, both without a database round trip. Vectors are
+partitioned by category, so routed_search() can classify a problem cheaply
+and scan only the matching categories; its answers are cached by question
+similarity. sync() keeps everything fresh from the rows changed or deleted
+since the last run, dropping the cached answers they affect
+"""
+import os
+import copy
+import json
+import time
+import sqlite3
+import datetime
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.text_classifier import text_classifier, get_sentence_encoder, EMBEDDING_MODEL_NAME
+from utils.vector_index import VectorIndex, DEFAULT_NPROBE
+from utils.bm25_index import BM25Index
+from utils.semantic_cache import SemanticCache
+from utils.text_processor import text_processor
+from utils.categories import get_all_categories, parse_subcategories_string
+from admin_system.database import DatabaseManager, get_database_manager
+
+DEFAULT_INDEX_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "wisdom_index"
+)
+
+# Entries embedded per encoder call while building
+EMBED_BATCH_SIZE = 256
+# Passages scoring below this cosine similarity are not worth showing
+DEFAULT_MIN_SCORE = 0.2
+# Bumped when the files on disk change shape; older indexes are rebuilt
+INDEX_FORMAT = 5
+# Vector labels are category code * 2 + confirmed flag: searches are restricted to
+# confirmed entries for users and to a few category partitions when routed.
+# Code 0 holds entries without a known category.
+CATEGORY_CODES = {category: code for code, category in enumerate(get_all_categories(), 1)}
+
+# Routing: a problem is searched within its categories only when the keyword and
+# embedding classifiers agree this strongly (else the whole index is searched)
+ROUTE_MIN_CONFIDENCE = float(os.getenv("WISDOM_ROUTE_MIN_CONFIDENCE", "0.35"))
+# Categories searched per routed query
+ROUTE_CATEGORIES = 2
+# Classifier weights, in the proportion ensemble_classify() gives them
+ROUTE_WEIGHTS = {'embedding': 2 / 3, 'keyword': 1 / 3}
+
+# Hybrid search: weight of embedding similarity against normalized BM25, and
+# how many top hits of each kind are fused
+HYBRID_SEMANTIC_WEIGHT = float(os.getenv("HYBRID_SEMANTIC_WEIGHT", "0.5"))
+HYBRID_CANDIDATES = 100
+
+# Changed rows fetched per request while syncing
+SYNC_PAGE_SIZE = 500
+# Each sync re-reads this much before its watermark, so rows committed late or
+# stamped by a slightly slow clock are not missed (unchanged ones are skipped)
+SYNC_LOOKBACK_SECONDS = 60
+# Seconds between background syncs (0 turns them off)
+SYNC_INTERVAL_SECONDS = float(os.getenv("WISDOM_SYNC_INTERVAL", "300"))
+SYNC_COLUMNS = ['id', 'category', 'subcategories', 'information', 'admin_confirmed', 'created_at', 'updated_at']
+
+PASSAGE_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS passages (
+    id INTEGER PRIMARY KEY,
+    category TEXT,
+    subcategories TEXT,
+    information TEXT,
+    admin_confirmed INTEGER,
+    created_at TEXT,
+    updated_at TEXT
+);
+"""
+
+def _label(entry: Dict) -> int:
+    return CATEGORY_CODES.get(entry.get('category'), 0) * 2 + (1 if entry.get('admin_confirmed') else 0)
+
+def _labels(categories: Optional[List[str]] = None, confirmed_only: bool = True) -> Optional[List[int]]:
+    """Vector labels of these categories (default all), None when nothing is filtered"""
+    if categories is None and not confirmed_only:
+        return None
+    codes = [CATEGORY_CODES.get(category, 0) for category in categories] if categories is not None \
+        else [0] + list(CATEGORY_CODES.values())
+    flags = [1] if confirmed_only else [0, 1]
+    return [code * 2 + flag for code in codes for flag in flags]
+
+def _parse_time(value: Optional[str]) -> Optional[datetime.datetime]:
+    """Naive UTC datetime from a stored timestamp string"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _lookback(value: Optional[str]) -> Optional[str]:
+    """Watermark moved back by SYNC_LOOKBACK_SECONDS (None stays None: read everything)"""
+    parsed = _parse_time(value)
+    if parsed is None:
+        return value
+    return (parsed - datetime.timedelta(seconds=SYNC_LOOKBACK_SECONDS)).isoformat()
+
+def _later(current: Optional[str], candidate: Optional[str]) -> Optional[str]:
+    """The later of two timestamps, normalized to naive UTC ISO format"""
+    candidate_time = _parse_time(candidate)
+    current_time = _parse_time(current)
+    if candidate_time is None or (current_time is not None and current_time >= candidate_time):
+        return current
+    return candidate_time.isoformat()
+
+class WisdomRetriever:
+    """Top-k advice passages for a user's problem, and hybrid search for admins"""
+
+    def __init__(self, db_manager: DatabaseManager = None, index_dir: str = DEFAULT_INDEX_DIR):
+        """
+        Args:
+            db_manager: Source of advice entries (default: the global DatabaseManager)
+            index_dir: Where the vectors, passage text and build metadata are kept
+        """
+        self.db_manager = db_manager
+        self.index_dir = index_dir
+        self.index_path = os.path.join(index_dir, "vectors.npz")
+        self.passages_path = os.path.join(index_dir, "passages.db")
+        self.meta_path = os.path.join(index_dir, "meta.json")
+        self._index: Optional[VectorIndex] = None
+        self._meta: Dict = {}
+        self._keywords = BM25Index()
+        # Answers of routed_search() for recently asked questions
+        self.cache = SemanticCache()
+        self._lock = threading.Lock()
+        # Serializes build() and sync(); searches never wait on it
+        self._update_lock = threading.RLock()
+        self._metrics = {'searches': 0, 'total_ms': 0.0, 'last_ms': None,
+                         'routed': 0, 'route_fallbacks': 0, 'routed_share': 0.0}
+        self._stop_event = threading.Event()
+        self._sync_thread = None
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        encoder = get_sentence_encoder()
+        if encoder is None:
+            raise RuntimeError(f"Sentence encoder {EMBEDDING_MODEL_NAME} is not available")
+        return encoder.encode(texts, batch_size=64, convert_to_numpy=True,
+                              normalize_embeddings=True, show_progress_bar=False)
+
+    @staticmethod
+    def _tokens(text: str) -> List[str]:
+        return text_processor.tokenize(text or '', lemmatize=True)
+
+    def load(self) -> bool:
+        """Load a previously built index from disk; False when there is none"""
+        with self._lock:
+            if self._index is not None:
+                return True
+            if not (os.path.exists(self.index_path) and os.path.exists(self.passages_path)):
+                return False
+            try:
+                self._index = VectorIndex.load(self.index_path)
+                with open(self.meta_path, encoding='utf-8') as f:
+                    self._meta = json.load(f)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Warning: could not load wisdom index: {e}")
+                self._index = None
+                return False
+            # An index built with another embedding model can't answer this model's queries
+            if self._meta.get('model') != EMBEDDING_MODEL_NAME or self._meta.get('format') != INDEX_FORMAT:
+                self._index = None
+                return False
+        return True
+
+    def is_ready(self) -> bool:
+        return self.load()
+
+    def build(self, progress_callback: Optional[Callable[[int], None]] = None) -> Tuple[bool, str, Dict]:
+        """
+        Embed and keyword-index every entry and replace the index on disk
+
+        Args:
+            progress_callback: Called with the number of entries embedded so far
+
+        Returns:
+            (success, message, stats)
+        """
+        with self._update_lock:
+            return self._build(progress_callback)
+
+    def _build(self, progress_callback=None) -> Tuple[bool, str, Dict]:
+        start = time.perf_counter()
+        # Rows changed from here on are picked up by the next sync
+        watermark = datetime.datetime.utcnow().isoformat()
+        db_manager = self.db_manager or get_database_manager()
+        os.makedirs(self.index_dir, exist_ok=True)
+        tmp_passages = self.passages_path + ".tmp"
+        if os.path.exists(tmp_passages):
+            os.remove(tmp_passages)
+
+        ids, labels, chunks, batch = [], [], [], []
+        keywords = BM25Index()
+        conn = sqlite3.connect(tmp_passages)
+        try:
+            conn.executescript(PASSAGE_SCHEMA_SQL)
+            keywords.ensure_schema(conn)
+
+            def flush():
+                chunks.append(self._encode([entry['information'] for entry in batch]).astype(np.float16))
+                self._store_passages(conn, batch)
+                for entry in batch:
+                    keywords.add(conn, entry['id'], self._tokens(entry['information']))
+                ids.extend(entry['id'] for entry in batch)
+                labels.extend(_label(entry) for entry in batch)
+                batch.clear()
+                if progress_callback:
+                    progress_callback(len(ids))
+
+            for entry in db_manager.scan_entries(confirmed_only=False):
+                if (entry.get('information') or '').strip():
+                    batch.append(entry)
+                if len(batch) >= EMBED_BATCH_SIZE:
+                    flush()
+            if batch:
+                flush()
+            conn.commit()
+        except Exception as e:
+            conn.close()
+            os.remove(tmp_passages)
+            return False, f"Error building wisdom index: {str(e)}", {}
+        conn.close()
+
+        if not ids:
+            os.remove(tmp_passages)
+            return False, "No entries to index yet", {}
+
+        index = VectorIndex.build(ids, np.concatenate(chunks).astype(np.float32), labels=labels)
+        meta = {
+            'model': EMBEDDING_MODEL_NAME,
+            'format': INDEX_FORMAT,
+            'entries': len(index),
+            'ivf_lists': index.nlist,
+            'built_at': time.time(),
+            'build_seconds': time.perf_counter() - start,
+            'watermark': watermark,
+            # The first sync walks the whole deletion log once; deleting again is harmless
+            'deletions_watermark': None,
+            'deletions_after_id': 0
+        }
+        index.save(self.index_path)
+        os.replace(tmp_passages, self.passages_path)
+        self._save_meta(meta)
+        with self._lock:
+            self._index, self._meta, self._keywords = index, meta, keywords
+        self.cache.clear()
+
+        return True, f"Indexed {len(index)} entries in {meta['build_seconds']:.1f}s", meta
+
+    @staticmethod
+    def _store_passages(conn: sqlite3.Connection, entries: List[Dict]):
+        conn.executemany(
+            "INSERT OR REPLACE INTO passages "
+            "(id, category, subcategories, information, admin_confirmed, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(entry['id'], entry.get('category'), entry.get('subcategories'), entry['information'],
+              1 if entry.get('admin_confirmed') else 0, entry.get('created_at'), entry.get('updated_at'))
+             for entry in entries]
+        )
+
+    def _save_meta(self, meta: Dict):
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def sync(self, progress_callback: Optional[Callable[[int], None]] = None) -> Tuple[bool, str, Dict]:
+        """
+        Bring the index up to date with rows changed or deleted since the last sync
+
+        Only new entries and entries whose text changed are embedded (and
+        re-tokenized); confirming or un-confirming just relabels the vector,
+        deleted and emptied entries are tombstoned, and the index is
+        compacted once tombstones and appended rows pile up. Builds the
+        index instead when there is none yet.
+
+        Args:
+            progress_callback: Called with the number of changed rows seen so far
+
+        Returns:
+            (success, message, stats)
+        """
+        with self._update_lock:
+            if not self.load():
+                return self._build(progress_callback)
+
+            start = time.perf_counter()
+            db_manager = self.db_manager or get_database_manager()
+            # Changes go to a copy so searches keep using the current index meanwhile
+            index = copy.copy(self._index)
+            meta = dict(self._meta)
+            stats = {'changed': 0, 'embedded': 0, 'relabelled': 0, 'removed': 0, 'deleted': 0,
+                     'compacted': False, 'deletions_tracked': True}
+            # Ids of entries embedded, relabelled or removed, for cache invalidation
+            touched = set()
+
+            conn = sqlite3.connect(self.passages_path)
+            try:
+                since, after_id = _lookback(meta.get('watermark')), 0
+                while True:
+                    success, message, rows = db_manager.get_entries_updated_since(
+                        since, after_id=after_id, limit=SYNC_PAGE_SIZE, columns=SYNC_COLUMNS)
+                    if not success:
+                        raise RuntimeError(message)
+                    if not rows:
+                        break
+                    self._apply_changes(index, conn, rows, stats, touched)
+                    since, after_id = rows[-1]['updated_at'], rows[-1]['id']
+                    meta['watermark'] = _later(meta.get('watermark'), since)
+                    if progress_callback:
+                        progress_callback(stats['changed'])
+                    if len(rows) < SYNC_PAGE_SIZE:
+                        break
+
+                self._apply_deletions(db_manager, index, conn, meta, stats, touched)
+
+                if index.needs_compaction():
+                    index = index.compact()
+                    stats['compacted'] = True
+                    meta['ivf_lists'] = index.nlist
+                    meta['compacted_at'] = time.time()
+
+                # Vectors first, then passages, then watermarks: a crash in between
+                # only means the next sync redoes some work
+                index.save(self.index_path)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                # Cached BM25 corpus statistics may include the rolled-back writes
+                self._keywords = BM25Index()
+                return False, f"Error syncing wisdom index: {str(e)}", stats
+            finally:
+                conn.close()
+
+            stats['seconds'] = time.perf_counter() - start
+            meta.update({'entries': len(index), 'last_sync_at': time.time(), 'last_sync': stats})
+            self._save_meta(meta)
+            with self._lock:
+                self._index, self._meta, self._keywords = index, meta, BM25Index()
+            if touched:
+                # Cached answers built from these entries, or that they would now beat
+                _, vectors = index.get_vectors(list(touched), labels=_labels())
+                stats['cache_invalidated'] = self.cache.invalidate(touched, vectors)
+
+        message = (f"Synced {stats['changed']} changed rows in {stats['seconds']:.1f}s: "
+                   f"{stats['embedded']} embedded, {stats['removed'] + stats['deleted']} removed")
+        if stats['compacted']:
+            message += ", index compacted"
+        return True, message, stats
+
+    def _apply_changes(self, index: VectorIndex, conn: sqlite3.Connection, rows: List[Dict], stats: Dict,
+                       touched: set):
+        """Embed new or edited entries, relabel re-categorized or (un-)confirmed ones and drop emptied ones"""
+        ids = [row['id'] for row in rows]
+        indexed = {
+            entry_id: (updated_at, information)
+            for entry_id, updated_at, information in conn.execute(
+                f"SELECT id, updated_at, information FROM passages WHERE id IN ({','.join('?' * len(ids))})", ids
+            )
+        }
+
+        to_embed, to_relabel, to_remove = [], [], []
+        for row in rows:
+            current = indexed.get(row['id'])
+            if not (row.get('information') or '').strip():
+                if current:
+                    to_remove.append(row['id'])
+            elif current is None or current[1] != row['information']:
+                to_embed.append(row)
+            elif current[0] != row.get('updated_at'):
+                # Same text, so the vector is still right; only the label may have moved
+                to_relabel.append(row)
+
+        # relabel() only moves rows whose label in the index differs
+        by_label: Dict[int, List[int]] = {}
+        for row in to_relabel:
+            by_label.setdefault(_label(row), []).append(row['id'])
+        for label, label_ids in by_label.items():
+            index.relabel(label_ids, label)
+
+        if to_remove:
+            index.remove(to_remove)
+            self._keywords.remove(conn, to_remove)
+            conn.executemany("DELETE FROM passages WHERE id = ?", [(entry_id,) for entry_id in to_remove])
+        for batch_start in range(0, len(to_embed), EMBED_BATCH_SIZE):
+            batch = to_embed[batch_start:batch_start + EMBED_BATCH_SIZE]
+            index.add([row['id'] for row in batch], self._encode([row['information'] for row in batch]),
+                      labels=[_label(row) for row in batch])
+            for row in batch:
+                self._keywords.add(conn, row['id'], self._tokens(row['information']))
+        self._store_passages(conn, to_embed + to_relabel)
+        touched.update(row['id'] for row in to_embed + to_relabel)
+        touched.update(to_remove)
+
+        stats['changed'] += len(rows)
+        stats['embedded'] += len(to_embed)
+        stats['relabelled'] += len(to_relabel)
+        stats['removed'] += len(to_remove)
+
+    def _apply_deletions(self, db_manager: DatabaseManager, index: VectorIndex, conn: sqlite3.Connection,
+                         meta: Dict, stats: Dict, touched: set):
+        """Tombstone ids from the deletion log past the deletions watermark"""
+        since = _lookback(meta.get('deletions_watermark'))
+        after_id = meta.get('deletions_after_id', 0) if since == meta.get('deletions_watermark') else 0
+        while True:
+            success, message, rows = db_manager.get_deleted_since(since, after_id=after_id, limit=SYNC_PAGE_SIZE)
+            if not success:
+                # Without the log, deleted entries linger until the next full build
+                print(f"Warning: {message}")
+                stats['deletions_tracked'] = False
+                return
+            if not rows:
+                return
+            ids = [row['id'] for row in rows]
+            stats['deleted'] += index.remove(ids)
+            touched.update(ids)
+            self._keywords.remove(conn, ids)
+            conn.executemany("DELETE FROM passages WHERE id = ?", [(entry_id,) for entry_id in ids])
+            since, after_id = rows[-1]['deleted_at'], rows[-1]['id']
+            meta['deletions_watermark'], meta['deletions_after_id'] = since, after_id
+            if len(rows) < SYNC_PAGE_SIZE:
+                return
+
+    def start_auto_sync(self, interval: float = SYNC_INTERVAL_SECONDS):
+        """Sync every interval seconds on a background thread (idempotent; 0 disables)"""
+        if interval <= 0 or (self._sync_thread is not None and self._sync_thread.is_alive()):
+            return self
+        self._stop_event.clear()
+
+        def run():
+            while not self._stop_event.wait(interval):
+                success, message, _ = self.sync()
+                if not success:
+                    print(f"Warning: {message}")
+
+        self._sync_thread = threading.Thread(target=run, name="wisdom-index-sync", daemon=True)
+        self._sync_thread.start()
+        return self
+
+    def stop_auto_sync(self):
+        self._stop_event.set()
+
+    def sync_if_stale(self, max_age_seconds: float = 30) -> Tuple[bool, str, Dict]:
+        """Sync unless the last sync (or build) finished within max_age_seconds"""
+        if self.load():
+            last = self._meta.get('last_sync_at') or self._meta.get('built_at') or 0
+            if time.time() - last < max_age_seconds:
+                return True, "Index is fresh", {}
+        return self.sync()
+
+    def _passages(self, ids: List[int]) -> Dict[int, Dict]:
+        conn = sqlite3.connect(self.passages_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(
+                f"SELECT * FROM passages WHERE id IN ({','.join('?' * len(ids))})", ids
+            ).fetchall()
+        finally:
+            conn.close()
+        passages = {}
+        for row in rows:
+            passage = dict(row)
+            passage['admin_confirmed'] = bool(passage['admin_confirmed'])
+            passage['subcategories_list'] = parse_subcategories_string(passage['subcategories'] or '')
+            passages[row['id']] = passage
+        return passages
+
+    def _record_search(self, elapsed_ms: float):
+        with self._lock:
+            self._metrics['searches'] += 1
+            self._metrics['total_ms'] += elapsed_ms
+            self._metrics['last_ms'] = elapsed_ms
+
+    def search(self, query: str, k: int = 5, min_score: float = DEFAULT_MIN_SCORE,
+               nprobe: int = DEFAULT_NPROBE, confirmed_only: bool = True,
+               categories: Optional[List[str]] = None) -> Tuple[bool, str, List[Dict]]:
+        """
+        Passages closest in meaning to query
+
+        Args:
+            categories: Only search these categories' partitions (default all)
+
+        Returns:
+            (success, message, passages) where each passage has the stored
+            entry fields, subcategories_list and score
+        """
+        if not query or not query.strip():
+            return False, "Empty query", []
+        if not self.load():
+            return False, "Wisdom index has not been built yet", []
+
+        start = time.perf_counter()
+        try:
+            query_vector = self._encode([query.strip()])[0]
+        except Exception as e:
+            return False, f"Error embedding query: {str(e)}", []
+        results = self._nearest_passages(self._index, query_vector, k, min_score, nprobe,
+                                         _labels(categories, confirmed_only))
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._record_search(elapsed_ms)
+        return True, f"Found {len(results)} passages in {elapsed_ms:.1f} ms", results
+
+    def _nearest_passages(self, index: VectorIndex, query_vector: np.ndarray, k: int, min_score: float,
+                          nprobe: int, labels: Optional[List[int]]) -> List[Dict]:
+        ids, scores = index.search(query_vector, k=k, nprobe=nprobe, labels=labels)
+        keep = scores >= min_score
+        ids, scores = [int(i) for i in ids[keep]], scores[keep]
+        passages = self._passages(ids) if ids else {}
+
+        results = []
+        for entry_id, score in zip(ids, scores):
+            passage = passages.get(entry_id)
+            if passage:
+                passage['score'] = float(score)
+                results.append(passage)
+        return results
+
+    def route(self, query: str, query_vector: Optional[np.ndarray] = None) -> Tuple[Optional[List[str]], float]:
+        """
+        Categories a problem most likely belongs to, from the classifier's cheap
+        keyword and embedding stages (no zero-shot model)
+
+        Returns:
+            (categories, confidence); categories is None when the confidence is
+            below ROUTE_MIN_CONFIDENCE and the whole index should be searched
+        """
+        scores: Dict[str, float] = {}
+        for method, results in (
+            ('keyword', text_classifier.classify_with_keywords(query, top_k=ROUTE_CATEGORIES + 1)),
+            ('embedding', text_classifier.classify_with_embeddings(query, top_k=ROUTE_CATEGORIES + 1,
+                                                                   text_embedding=query_vector))
+        ):
+            for result in results:
+                scores[result['category']] = scores.get(result['category'], 0.0) + \
+                    ROUTE_WEIGHTS[method] * result['confidence']
+        if not scores:
+            return None, 0.0
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        confidence = scores[ranked[0]]
+        if confidence < ROUTE_MIN_CONFIDENCE:
+            return None, confidence
+        return ranked[:ROUTE_CATEGORIES], confidence
+
+    def routed_search(self, query: str, k: int = 5, min_score: float = DEFAULT_MIN_SCORE,
+                      nprobe: int = DEFAULT_NPROBE) -> Tuple[bool, str, List[Dict]]:
+        """
+        search() over the confirmed passages of the query's likely categories
+
+        Falls back to the whole index when routing is unsure or the routed
+        categories yield fewer than k passages above min_score. A question
+        close enough to a recent one gets that answer from the cache.
+
+        Returns:
+            (success, message, passages) like search()
+        """
+        if not query or not query.strip():
+            return False, "Empty query", []
+        if not self.load():
+            return False, "Wisdom index has not been built yet", []
+
+        # Before reading the index: a sync that swaps it in afterwards also
+        # invalidates, so an answer from the old index is never cached
+        generation = self.cache.generation
+        index = self._index
+        start = time.perf_counter()
+        try:
+            query_vector = self._encode([query.strip()])[0]
+        except Exception as e:
+            return False, f"Error embedding query: {str(e)}", []
+
+        params = (k, min_score, nprobe)
+        cached = self.cache.get(query_vector, params)
+        if cached is not None:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._record_search(elapsed_ms)
+            return True, (f"Found {len(cached['passages'])} passages in {elapsed_ms:.1f} ms "
+                          f"(cached answer to a similar question)"), copy.deepcopy(cached['passages'])
+        compute_start = time.perf_counter()
+        categories, confidence = self.route(query.strip(), query_vector)
+
+        results, fallback, share = [], False, 1.0
+        if categories:
+            labels = _labels(categories)
+            counts = index.label_counts()
+            share = counts[[label for label in labels if label < len(counts)]].sum() / max(len(index), 1)
+            results = self._nearest_passages(index, query_vector, k, min_score, nprobe, labels)
+            fallback = len(results) < k
+        if fallback or not categories:
+            results = self._nearest_passages(index, query_vector, k, min_score, nprobe, _labels())
+
+        # An entry changed later that scores at least this well could alter the answer
+        floor = results[-1]['score'] if len(results) >= k else min_score
+        self.cache.put(query_vector, {'passages': copy.deepcopy(results)}, params,
+                       entry_ids=[passage['id'] for passage in results], floor=floor,
+                       compute_ms=(time.perf_counter() - compute_start) * 1000, generation=generation)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._record_search(elapsed_ms)
+        with self._lock:
+            if categories:
+                self._metrics['routed'] += 1
+                self._metrics['routed_share'] += share
+            if fallback:
+                self._metrics['route_fallbacks'] += 1
+
+        if categories and not fallback:
+            scope = f"{', '.join(categories)} ({share:.0%} of the index, confidence {confidence:.2f})"
+        elif categories:
+            scope = "all categories (too few matches in " + ', '.join(categories) + ")"
+        else:
+            scope = f"all categories (routing confidence {confidence:.2f})"
+        return True, f"Found {len(results)} passages in {elapsed_ms:.1f} ms from {scope}", results
+
+    def hybrid_search(self, query: str, k: int = 20, semantic_weight: float = HYBRID_SEMANTIC_WEIGHT,
+                      confirmed_only: bool = False) -> Tuple[bool, str, List[Dict]]:
+        """
+        Entries ranked by BM25 keyword relevance fused with embedding similarity
+
+        Exact terms still rank first, while paraphrases ("overthinking" for
+        "anxiety") are found through the embeddings. BM25 scores are scaled
+        by the best hit so both signals lie in [0, 1].
+
+        Returns:
+            (success, message, passages) with score, keyword_score and
+            semantic_score on each passage
+        """
+        if not query or not query.strip():
+            return False, "Empty query", []
+        if not self.load():
+            return False, "Search index has not been built yet", []
+
+        index, keywords = self._index, self._keywords
+        start = time.perf_counter()
+        labels = _labels(confirmed_only=confirmed_only)
+        try:
+            query_vector = self._encode([query.strip()])[0]
+        except Exception as e:
+            return False, f"Error embedding query: {str(e)}", []
+
+        semantic = dict(zip(*(a.tolist() for a in index.search(query_vector, k=HYBRID_CANDIDATES, labels=labels))))
+        conn = sqlite3.connect(self.passages_path)
+        try:
+            keyword_hits = keywords.search(conn, self._tokens(query), limit=HYBRID_CANDIDATES)
+        finally:
+            conn.close()
+        best_keyword = keyword_hits[0][1] if keyword_hits else 0.0
+        keyword = {entry_id: score / best_keyword for entry_id, score in keyword_hits if best_keyword > 0}
+
+        # Keyword hits outside the semantic top-k still get their cosine similarity
+        missing = [entry_id for entry_id in keyword if entry_id not in semantic]
+        if missing:
+            found_ids, vectors = index.get_vectors(missing)
+            semantic.update(zip(found_ids.tolist(), (vectors @ query_vector).tolist()))
+
+        # Entries sharing no term with the query must at least be close in meaning
+        candidates = set(keyword) | {entry_id for entry_id, score in semantic.items() if score >= DEFAULT_MIN_SCORE}
+        fused = {
+            entry_id: semantic_weight * max(semantic.get(entry_id, 0.0), 0.0) +
+                      (1 - semantic_weight) * keyword.get(entry_id, 0.0)
+            for entry_id in candidates
+        }
+        ranked = sorted(fused, key=fused.get, reverse=True)
+        passages = self._passages(ranked[:k * 2]) if ranked else {}
+
+        results = []
+        for entry_id in ranked:
+            passage = passages.get(entry_id)
+            if passage is None or (confirmed_only and not passage['admin_confirmed']):
+                continue
+            passage.update({
+                'score': fused[entry_id],
+                'keyword_score': keyword.get(entry_id, 0.0),
+                'semantic_score': semantic.get(entry_id, 0.0)
+            })
+            results.append(passage)
+            if len(results) >= k:
+                break
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._record_search(elapsed_ms)
+        return True, f"Found {len(results)} entries in {elapsed_ms:.1f} ms (hybrid)", results
+
+    def search_entry_list(self, search_term: str, limit: int = 20, preview_length: int = 80) -> Tuple[bool, str, List[Dict]]:
+        """hybrid_search returning DatabaseManager.search_entry_list rows"""
+        success, message, passages = self.hybrid_search(search_term, k=limit)
+        entries = []
+        for passage in passages:
+            text = passage.pop('information') or ''
+            passage['preview'] = text[:preview_length] + '...' if len(text) > preview_length else text
+            entries.append(passage)
+        return success, message, entries
+
+    def get_stats(self) -> Dict:
+        """Index size and build info plus search latency"""
+        self.load()
+        with self._lock:
+            stats = dict(self._meta)
+            stats.update(self._metrics)
+            stats['index_bytes'] = self._index.nbytes if self._index is not None else 0
+            stats['tombstones'] = self._index.tombstones if self._index is not None else 0
+        stats['avg_ms'] = stats['total_ms'] / stats['searches'] if stats['searches'] else None
+        stats['avg_routed_share'] = stats['routed_share'] / stats['routed'] if stats['routed'] else None
+        stats['cache'] = self.cache.get_stats()
+        return stats
+
+# Global retriever instance (index loaded from disk on first use)
+wisdom_retriever = WisdomRetriever()
+
+def get_wisdom_retriever() -> WisdomRetriever:
+    """Get global wisdom retriever"""
+    return wisdom_retriever
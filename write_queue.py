@@ -0,0 +1,317 @@
+"""
+Write-behind queue for AI Baba admin saves
+Coalesces pending advice inserts into batched writes on a background thread
+and journals unsent items to disk so nothing is lost if the app restarts
+"""
+import os
+import json
+import time
+import uuid
+import queue
+import threading
+import datetime
+from typing import List, Dict, Optional
+
+DEFAULT_JOURNAL_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "write_queue.jsonl"
+)
+
+# processing_metadata key that ties a stored row back to its ticket, so a
+# replay can tell which journaled entries already reached the database
+TICKET_METADATA_KEY = 'write_queue_ticket'
+
+class WriteBehindQueue:
+    """Background batching writer in front of DatabaseManager.batch_insert"""
+
+    def __init__(self,
+                 db_manager,
+                 journal_path: str = DEFAULT_JOURNAL_PATH,
+                 batch_size: int = 20,
+                 flush_interval: float = 1.0,
+                 max_retries: int = 5):
+        self.db_manager = db_manager
+        self.journal_path = journal_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+
+        self._queue = queue.Queue()
+        self._status: Dict[str, Dict] = {}
+        # ticket -> entry for everything not yet written, mirrored by the journal
+        self._unsent: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._worker = None
+
+        os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+        self._replay_journal()
+
+    def start(self):
+        """Start the background writer thread (idempotent)"""
+        if self._worker is None or not self._worker.is_alive():
+            self._stop_event.clear()
+            self._worker = threading.Thread(target=self._run, name="advice-write-behind", daemon=True)
+            self._worker.start()
+        return self
+
+    def stop(self, timeout: float = 10.0):
+        """Flush what we can and stop the writer thread"""
+        self.flush(timeout)
+        self._stop_event.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def submit(self, entry: Dict) -> str:
+        """
+        Queue an entry for insertion
+
+        Args:
+            entry: Dictionary in DatabaseManager.batch_insert format
+
+        Returns:
+            Ticket id that can be polled with get_status
+        """
+        ticket = uuid.uuid4().hex
+        entry = dict(entry)
+        entry['processing_metadata'] = dict(entry.get('processing_metadata') or {}, **{TICKET_METADATA_KEY: ticket})
+        # Register before journaling so compaction never drops the record
+        self._register(ticket, entry)
+        self._journal(self._enqueue_record(ticket))
+        self._queue.put((ticket, entry, 0))
+        self.start()
+        return ticket
+
+    def get_status(self, ticket: str) -> Optional[Dict]:
+        """Get the save status for a ticket (pending, retrying, saved or failed)"""
+        with self._lock:
+            status = self._status.get(ticket)
+            return dict(status) if status else None
+
+    def get_all_statuses(self) -> Dict[str, Dict]:
+        """Get a snapshot of every known ticket status"""
+        with self._lock:
+            return {ticket: dict(status) for ticket, status in self._status.items()}
+
+    def pending_count(self) -> int:
+        """Number of entries not yet written to the database"""
+        with self._lock:
+            return sum(1 for s in self._status.values() if s['state'] in ('pending', 'retrying'))
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until every pending entry is saved or has failed, or timeout expires"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.pending_count() == 0 and self._idle.is_set():
+                return True
+            time.sleep(0.05)
+        return False
+
+    def _register(self, ticket: str, entry: Dict, submitted_at: Optional[str] = None):
+        with self._lock:
+            self._unsent[ticket] = entry
+            self._status[ticket] = {
+                'state': 'pending',
+                'entry_id': None,
+                'message': 'Queued for saving',
+                'attempts': 0,
+                'submitted_at': submitted_at or datetime.datetime.utcnow().isoformat()
+            }
+
+    def _mark_saved(self, ticket: str, entry_id: int, attempts: int):
+        """Record a written entry; caller holds the lock"""
+        self._unsent.pop(ticket, None)
+        self._status[ticket].update({
+            'state': 'saved',
+            'entry_id': entry_id,
+            'message': f"Saved with ID {entry_id}",
+            'attempts': attempts
+        })
+
+    def _collect_batch(self) -> List:
+        """Wait for one item, then coalesce whatever else arrives within flush_interval"""
+        try:
+            first = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+
+        self._idle.clear()
+        batch = [first]
+        deadline = time.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            batch = self._collect_batch()
+            if not batch:
+                self._idle.set()
+                continue
+            try:
+                self._write_batch(batch)
+            finally:
+                if self._queue.empty():
+                    self._idle.set()
+
+    def _write_batch(self, batch: List):
+        entries = [entry for _, entry, _ in batch]
+
+        try:
+            success, message, inserted_ids = self.db_manager.batch_insert(entries)
+        except Exception as e:
+            success, message, inserted_ids = False, f"Error in batch insert: {str(e)}", []
+
+        if success and len(inserted_ids) == len(batch):
+            done_tickets = []
+            with self._lock:
+                for (ticket, _, attempts), entry_id in zip(batch, inserted_ids):
+                    self._mark_saved(ticket, entry_id, attempts + 1)
+                    done_tickets.append(ticket)
+            for ticket in done_tickets:
+                self._journal({'op': 'done', 'ticket': ticket})
+            self._compact_journal()
+            return
+
+        # Failed batch: back off and re-queue, entries stay in the journal
+        print(f"Write-behind batch of {len(batch)} failed: {message}")
+        for ticket, entry, attempts in batch:
+            attempts += 1
+            if attempts >= self.max_retries:
+                with self._lock:
+                    self._status[ticket].update({
+                        'state': 'failed',
+                        'message': f"Gave up after {attempts} attempts: {message} (kept in journal)",
+                        'attempts': attempts
+                    })
+                continue
+
+            with self._lock:
+                self._status[ticket].update({
+                    'state': 'retrying',
+                    'message': f"Attempt {attempts} failed: {message}",
+                    'attempts': attempts
+                })
+            delay = min(2 ** attempts, 30)
+            timer = threading.Timer(delay, self._queue.put, args=((ticket, entry, attempts),))
+            timer.daemon = True
+            timer.start()
+
+    def _journal(self, record: Dict):
+        with self._lock:
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _enqueue_record(self, ticket: str) -> Dict:
+        return {
+            'op': 'enqueue',
+            'ticket': ticket,
+            'submitted_at': self._status[ticket]['submitted_at'],
+            'entry': self._unsent[ticket]
+        }
+
+    def _read_journal(self) -> Dict[str, Dict]:
+        """Return the enqueue records of entries never confirmed as written"""
+        if not os.path.exists(self.journal_path):
+            return {}
+
+        unsent = {}
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn write from a crash mid-append
+                    continue
+                if record.get('op') == 'enqueue':
+                    unsent[record['ticket']] = record
+                elif record.get('op') == 'done':
+                    unsent.pop(record['ticket'], None)
+        return unsent
+
+    def _replay_journal(self):
+        unsent = self._read_journal()
+        if not unsent:
+            return
+
+        # A crash between the insert and its 'done' record leaves a row that
+        # is already stored; don't insert it a second time
+        written = self._find_written(unsent)
+        for ticket, record in unsent.items():
+            self._register(ticket, record['entry'], record.get('submitted_at'))
+            if ticket in written:
+                with self._lock:
+                    self._mark_saved(ticket, written[ticket], 1)
+
+        replayed = [ticket for ticket in unsent if ticket not in written]
+        print(f"Replaying {len(replayed)} unsent entries from write-behind journal "
+              f"({len(written)} were already saved)")
+        self._compact_journal()
+        for ticket in replayed:
+            self._queue.put((ticket, unsent[ticket]['entry'], 0))
+        if replayed:
+            self.start()
+
+    def _find_written(self, unsent: Dict[str, Dict], page_size: int = 500) -> Dict[str, int]:
+        """Map journaled tickets whose rows are already in the database to their entry ids"""
+        stamps = [record.get('submitted_at') for record in unsent.values()]
+        # Rows are inserted after they are submitted, so only newer rows can match
+        since = None if None in stamps else min(stamps)
+        after_id = 0
+        written = {}
+        while True:
+            success, message, rows = self.db_manager.get_entries_updated_since(
+                since, after_id=after_id, limit=page_size,
+                columns=['id', 'updated_at', 'processing_metadata']
+            )
+            if not success:
+                print(f"Warning: Could not check for already saved journal entries: {message}")
+                return written
+            for row in rows:
+                metadata = row.get('processing_metadata') or {}
+                if isinstance(metadata, str):
+                    metadata = json.loads(metadata)
+                ticket = metadata.get(TICKET_METADATA_KEY)
+                if ticket in unsent:
+                    written[ticket] = row['id']
+            if len(rows) < page_size:
+                return written
+            since, after_id = rows[-1]['updated_at'], rows[-1]['id']
+
+    def _compact_journal(self):
+        """Rewrite the journal with only the entries not yet written"""
+        with self._lock:
+            tmp_path = self.journal_path + ".tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    for ticket in self._unsent:
+                        f.write(json.dumps(self._enqueue_record(ticket), default=str) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.journal_path)
+            except OSError as e:
+                print(f"Warning: Could not compact write-behind journal: {e}")
+
+# Global queue instance, created on first use
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
+def get_write_queue(db_manager) -> WriteBehindQueue:
+    """Get the process-wide write-behind queue"""
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is None:
+            _write_queue = WriteBehindQueue(db_manager).start()
+    return _write_queue
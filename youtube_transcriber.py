@@ -5,13 +5,26 @@ Updated with pytubefix and improved error handling
 """
 
 import torch
+import numpy as np
 from transformers import pipeline
 import os
-import tempfile
+import re
+import time
 import textwrap
-from typing import Tuple, Optional
+import threading
+from typing import Tuple, Optional, Dict, Iterator
 from datetime import datetime
 
+from utils.asr_models import get_asr_registry, select_asr_profile, ASR_PROFILES, ASR_PROFILE_ORDER
+from utils.transcript_cache import get_transcript_cache
+from utils.audio_utils import SAMPLING_RATE, load_audio, detect_speech_regions, speech_coverage, iter_audio_windows, is_silent, \
+    decode_audio, release_audio, close_audio, split_at_quiet_points
+from utils.asr_checkpoints import get_checkpoint_store
+from utils.parallel_asr import get_parallel_asr
+from utils.audio_download import get_audio_downloader, select_asr_stream
+from utils.local_media import LocalMedia
+from utils.audio_fingerprint import compute_fingerprint, get_fingerprint_index
+
 # Import pytubefix instead of pytube
 try:
     from pytubefix import YouTube
@@ -20,41 +33,155 @@ except ImportError:
     os.system("pip install pytubefix")
     from pytubefix import YouTube
 
+class VideoMetadataCache:
+    """TTL cache of resolved YouTube objects keyed by video id"""
+
+    def __init__(self, ttl: float = 900, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, object]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, video_id: str):
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.ttl:
+                # Stream URLs inside the object expire, so don't serve stale ones
+                del self._entries[video_id]
+                return None
+            return entry[1]
+
+    def put(self, video_id: str, yt):
+        with self._lock:
+            if len(self._entries) >= self.max_entries and video_id not in self._entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                del self._entries[oldest]
+            self._entries[video_id] = (time.time(), yt)
+
+    def invalidate(self, video_id: str):
+        with self._lock:
+            self._entries.pop(video_id, None)
+
+# Transcript cache "model" name for caption-derived transcripts
+CAPTIONS_MODEL_NAME = "youtube-captions"
+
+# Auto-generated captions below this many words per minute of video are
+# treated as too sparse (music, long silences, failed recognition)
+MIN_AUTO_CAPTION_WPM = 60
+# ...or when more than this fraction of cues are tags like [Music] / [Applause]
+MAX_AUTO_CAPTION_TAG_RATIO = 0.3
+
+# Below this share of non-speech the VAD pre-pass isn't worth splitting the audio
+MIN_VAD_SKIP_FRACTION = 0.05
+
+# Passage grouping: close a passage at the first sentence end after the target
+# length, and force a break at the hard limits
+PASSAGE_TARGET_SECONDS = 60
+PASSAGE_MAX_SECONDS = 120
+PASSAGE_MAX_CHARS = 1500
+
+# Videos at least this long transcribe in checkpointed chunks that survive a crash
+CHECKPOINT_MIN_SECONDS = float(os.getenv("ASR_CHECKPOINT_MIN_SECONDS", "900"))
+CHECKPOINT_CHUNK_SECONDS = 300
+
+# Parallel CPU transcription gives each worker at least this much audio
+PARALLEL_MIN_SECONDS_PER_WORKER = 60
+
+# Videos at least this long are decoded to a memory-mapped file instead of RAM
+AUDIO_MEMMAP_MIN_SECONDS = float(os.getenv("AUDIO_MEMMAP_MIN_SECONDS", "1800"))
+AUDIO_BUFFER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "audio")
+
+# Shared across transcriber instances so validate/info/transcribe reuse one fetch
+video_metadata_cache = VideoMetadataCache(ttl=float(os.getenv("YOUTUBE_METADATA_TTL", "900")))
+
 class YouTubeTranscriber:
     """YouTube video transcription service for AI Baba"""
     
-    def __init__(self):
+    def __init__(self, prefer_captions: bool = True, use_vad: bool = None, asr_profile: str = None,
+                 asr_workers: int = None):
         self.transcriber = None
-        # Updated model name - use the latest stable version
-        self.model_name = "openai/whisper-large-v3"  # More reliable than distil-whisper
-        # Alternative: "distil-whisper/distil-large-v3" if you prefer speed over accuracy
+        # Use YouTube caption tracks when usable and only fall back to ASR without them
+        self.prefer_captions = prefer_captions
+        # Transcribe only detected speech regions (ASR_VAD=false disables)
+        self.use_vad = use_vad if use_vad is not None else os.getenv("ASR_VAD", "true").lower() != "false"
+        # fast / balanced / accurate, or auto to choose per video from length and core count
+        self.asr_profile = (asr_profile or os.getenv("ASR_PROFILE", "auto")).lower()
+        if self.asr_profile != "auto" and self.asr_profile not in ASR_PROFILES:
+            print(f"Warning: Unknown ASR profile '{self.asr_profile}', using auto")
+            self.asr_profile = "auto"
         self.device = 0 if torch.cuda.is_available() else -1
+        # Worker processes for CPU transcription of long audio (ASR_WORKERS, 1 keeps it in-process)
+        self.asr_workers = asr_workers if asr_workers is not None else int(os.getenv("ASR_WORKERS", "1"))
+        # Recognise re-uploads of already transcribed audio (AUDIO_FINGERPRINTS=false disables)
+        self.use_fingerprints = os.getenv("AUDIO_FINGERPRINTS", "true").lower() != "false"
+        # Everything that changes the ASR output; part of the transcript cache key, where
+        # 'vad' is replaced by whether the speech-region pass actually ran (_transcript_params)
+        self.generation_params = {
+            'chunk_length_s': 30,
+            'stride_length_s': 5,
+            'task': 'transcribe',
+            'language': 'en',  # Specify language for better accuracy
+            'vad': self.use_vad
+        }
+        self._apply_profile(self.asr_profile if self.asr_profile != "auto" else "accurate")
+        # Segments, source and cache info for the most recent generate_transcript call
+        self.last_transcript_details = {}
+
+    def _apply_profile(self, profile_name: str):
+        """Switch model and quantization to a profile, detaching any pipeline of another profile"""
+        profile = ASR_PROFILES[profile_name]
+        quantize = profile['quantize'] and self.device == -1
+        if getattr(self, 'profile_name', None) != profile_name:
+            self.transcriber = None
+        self.profile_name = profile_name
+        self.model_name = profile['model_name']
+        self.quantize = quantize
+        self.generation_params['quantized'] = quantize
+
+    def _transcript_params(self, vad_ran: bool) -> dict:
+        """Cache params of a finished transcript; the parallel and streaming paths never run region VAD"""
+        return dict(self.generation_params, vad=vad_ran)
+
+    def _asr_cache_keys(self) -> list:
+        """(model_name, params) cache keys whose transcripts this transcriber accepts, best first"""
+        profiles = ASR_PROFILE_ORDER if self.asr_profile == "auto" else [self.asr_profile]
+        # What _initialize_model falls back to on machines that can't load the others
+        profiles = list(dict.fromkeys(profiles + ['fallback']))
+        # Whole-audio transcripts are fine with VAD on; VAD ones are not when it is off
+        vad_variants = [True, False] if self.use_vad else [False]
+        keys = []
+        for profile_name in profiles:
+            profile = ASR_PROFILES[profile_name]
+            quantized = profile['quantize'] and self.device == -1
+            for vad_ran in vad_variants:
+                keys.append((profile['model_name'], dict(self.generation_params, quantized=quantized, vad=vad_ran)))
+        return keys
         
     def _initialize_model(self) -> bool:
-        """Initialize the transcription model with better error handling"""
+        """Attach the shared transcription model, loading it only if no other job has"""
+        registry = get_asr_registry()
         try:
             if self.transcriber is None:
-                print("Loading transcription model...")
-                self.transcriber = pipeline(
-                    "automatic-speech-recognition",
-                    model=self.model_name,
-                    device=self.device,
+                self.transcriber = registry.get_pipeline(
+                    self.model_name,
                     torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
-                    model_kwargs={"use_safetensors": True}  # Added for stability
+                    device=self.device,
+                    model_kwargs={"use_safetensors": True},  # Added for stability
+                    quantize=self.quantize
                 )
-                print("✅ Model loaded successfully")
             return True
         except Exception as e:
             print(f"❌ Model initialization failed: {e}")
             # Fallback to a smaller, more reliable model
             try:
                 print("Trying fallback model...")
-                self.model_name = "openai/whisper-base"
-                self.transcriber = pipeline(
-                    "automatic-speech-recognition",
-                    model=self.model_name,
-                    device=self.device,
-                    torch_dtype=torch.float32
+                self._apply_profile("fallback")
+                self.transcriber = registry.get_pipeline(
+                    self.model_name,
+                    torch_dtype=torch.float32,
+                    device=self.device
                 )
                 print("✅ Fallback model loaded")
                 return True
@@ -65,27 +192,8 @@ class YouTubeTranscriber:
     def get_video_info(self, video_url: str) -> Tuple[bool, str, Optional[dict]]:
         """Get basic video information without downloading"""
         try:
-            cleaned_url = self._clean_youtube_url(video_url)
-            
-            # Use pytubefix with better error handling
-            yt = YouTube(
-                cleaned_url,
-                use_oauth=False,
-                allow_oauth_cache=True
-            )
-            
-            # Force connection to validate
-            yt.check_availability()
-            
-            video_info = {
-                'title': yt.title,
-                'author': yt.author,
-                'length': yt.length,
-                'views': yt.views,
-                'description': yt.description[:200] + "..." if yt.description and len(yt.description) > 200 else (yt.description or ""),
-                'thumbnail_url': yt.thumbnail_url,
-                'publish_date': yt.publish_date.isoformat() if yt.publish_date else None
-            }
+            yt = self._get_youtube(video_url)
+            video_info = self._build_video_info(yt)
             
             return True, "Video information retrieved successfully", video_info
             
@@ -101,6 +209,7 @@ class YouTubeTranscriber:
     def generate_transcript(self, video_url: str, progress_callback=None) -> Tuple[bool, str, Optional[str]]:
         """Generate transcript from YouTube video with improved error handling"""
         temp_file = None
+        audio = None
         
         def update_progress(message: str):
             if progress_callback:
@@ -109,92 +218,41 @@ class YouTubeTranscriber:
                 print(message)
         
         try:
+            # Step 0: Reuse a transcript we already paid for
+            cached = self.get_cached_transcript(video_url, update_progress)
+            if cached:
+                return cached
+            
             # Step 1: Validate URL
             update_progress("🔍 Validating video URL...")
-            cleaned_url = self._clean_youtube_url(video_url)
-            
-            # Use pytubefix with better configuration
-            yt = YouTube(
-                cleaned_url,
-                use_oauth=False,
-                allow_oauth_cache=True
-            )
+            yt = self._get_youtube(video_url)
             
-            # Check availability
-            yt.check_availability()
+            # Step 1b: Caption tracks are milliseconds to fetch versus minutes of ASR
+            if self.prefer_captions:
+                caption_result = self.transcript_from_captions(yt, update_progress)
+                if caption_result:
+                    return caption_result
             
             # Check video length (limit to reasonable duration)
             if yt.length and yt.length > 7200:  # 2 hour limit
                 return False, "Video is too long (max 2 hours supported)", None
-                
-            update_progress(f"📹 Video: {yt.title} ({yt.length//60}:{yt.length%60:02d})")
-            
-            # Step 2: Download audio with better stream selection
-            update_progress("📥 Downloading audio stream...")
-            
-            # Try multiple audio stream options
-            audio_stream = None
-            stream_options = [
-                yt.streams.filter(only_audio=True, file_extension='mp4').order_by('abr').desc().first(),
-                yt.streams.filter(only_audio=True, file_extension='webm').order_by('abr').desc().first(),
-                yt.streams.filter(only_audio=True).first(),
-                yt.streams.filter(adaptive=True, file_extension='mp4').order_by('abr').desc().first()
-            ]
-            
-            for stream in stream_options:
-                if stream:
-                    audio_stream = stream
-                    break
-            
-            if not audio_stream:
-                return False, "No suitable audio stream found", None
-            
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as tmp:
-                temp_file = tmp.name
-            
-            # Download with progress tracking
-            try:
-                audio_stream.download(filename=temp_file)
-                update_progress("✅ Audio downloaded successfully")
-            except Exception as download_error:
-                return False, f"Audio download failed: {str(download_error)}", None
             
-            # Verify file was downloaded
-            if not os.path.exists(temp_file) or os.path.getsize(temp_file) == 0:
-                return False, "Downloaded file is empty or corrupted", None
+            # Long videos resume from their last finished chunk after a crash or restart
+            if yt.length and yt.length >= CHECKPOINT_MIN_SECONDS:
+                return self.transcribe_with_checkpoints(yt, update_progress)
             
-            # Step 3: Initialize transcription model
-            update_progress("🤖 Loading transcription model...")
-            if not self._initialize_model():
-                return False, "Failed to initialize transcription model", None
+            # Step 2: Decode the audio stream once, straight into a float32 buffer
+            success, message, audio = self.decode_audio(yt, update_progress)
+            if not success:
+                # Fall back to a temporary file the pipeline decodes itself
+                update_progress(f"ℹ️ {message} - downloading to a temporary file instead")
+                success, message, temp_file = self.download_audio(yt, update_progress)
+                if not success:
+                    return False, message, None
+                audio = temp_file
             
-            # Step 4: Transcribe with better parameters
-            update_progress("💬 Transcribing audio... (this may take several minutes)")
-            
-            try:
-                # Use optimized parameters for better results
-                result = self.transcriber(
-                    temp_file,
-                    chunk_length_s=30,
-                    stride_length_s=5,
-                    return_timestamps=False,  # Set to True if you want timestamps
-                    generate_kwargs={
-                        "task": "transcribe",
-                        "language": "en"  # Specify language for better accuracy
-                    }
-                )
-                
-                transcript = result["text"].strip() if isinstance(result, dict) else str(result).strip()
-                update_progress("✅ Transcription completed!")
-                
-                if not transcript:
-                    return False, "Transcription produced empty result", None
-                
-                return True, f"Successfully transcribed {len(transcript)} characters", transcript
-                
-            except Exception as transcription_error:
-                return False, f"Transcription failed: {str(transcription_error)}", None
+            # Steps 3-4: Load the model and transcribe
+            return self.transcribe_audio_file(yt, audio, update_progress)
             
         except Exception as e:
             error_msg = f"Transcription error: {str(e)}"
@@ -202,7 +260,9 @@ class YouTubeTranscriber:
             return False, error_msg, None
             
         finally:
-            # Cleanup temporary file
+            # Release a memory-mapped buffer and any temporary file
+            if audio is not None and not isinstance(audio, str):
+                release_audio(audio)
             if temp_file and os.path.exists(temp_file):
                 try:
                     os.remove(temp_file)
@@ -210,8 +270,862 @@ class YouTubeTranscriber:
                 except Exception as cleanup_error:
                     print(f"Warning: Could not clean up temp file: {cleanup_error}")
 
-    def format_transcript_for_processing(self, transcript: str, video_info: dict) -> str:
-        """Format transcript with video metadata for better processing"""
+    def transcribe_local_file(self, path: str, progress_callback=None) -> Tuple[bool, str, Optional[str]]:
+        """
+        Transcribe a local audio/video file with the same ASR, cache and checkpoints as videos
+        
+        The file is identified by a hash of its contents, so a file transcribed
+        before (under any name) comes straight from the transcript cache.
+        Video details of the file are in last_transcript_details['video_info'].
+        """
+        audio = None
+        
+        def update_progress(message: str):
+            if progress_callback:
+                progress_callback(message)
+            else:
+                print(message)
+        
+        try:
+            update_progress(f"🔍 Reading {os.path.basename(path)}...")
+            media = LocalMedia.from_path(path)
+            
+            cached = self._cached_transcript(media.video_id, update_progress=update_progress)
+            if cached:
+                media.length = media.length or self.last_transcript_details.get('length')
+                self.last_transcript_details['video_info'] = media.video_info()
+                return cached
+            
+            if media.length and media.length > 7200:  # 2 hour limit, as for videos
+                return False, "File is too long (max 2 hours supported)", None
+            
+            if media.length and media.length >= CHECKPOINT_MIN_SECONDS:
+                result = self.transcribe_with_checkpoints(media, update_progress)
+            else:
+                success, message, audio = self.decode_audio(media, update_progress)
+                if not success:
+                    return False, message, None
+                media.length = media.length or int(len(audio) / SAMPLING_RATE)
+                if media.length > 7200:
+                    return False, "File is too long (max 2 hours supported)", None
+                result = self.transcribe_audio_file(media, audio, update_progress)
+            
+            if result[0]:
+                self.last_transcript_details['video_info'] = media.video_info()
+            return result
+            
+        except Exception as e:
+            error_msg = f"Transcription error: {str(e)}"
+            update_progress(f"❌ {error_msg}")
+            return False, error_msg, None
+            
+        finally:
+            if audio is not None:
+                release_audio(audio)
+
+    def get_cached_transcript(self, video_url: str, update_progress=print) -> Optional[Tuple[bool, str, str]]:
+        """Return a stored transcript result for the video, or None on a cache miss"""
+        video_id = self._extract_video_id(video_url)
+        self.last_transcript_details = {}
+        if not video_id:
+            return None
+        return self._cached_transcript(video_id, include_captions=self.prefer_captions, update_progress=update_progress)
+
+    def _cached_transcript(self, video_id: str, include_captions: bool = False,
+                           update_progress=print) -> Optional[Tuple[bool, str, str]]:
+        """Cache lookup by video id (or local file id) across every acceptable model"""
+        cache_keys = self._asr_cache_keys()
+        if include_captions:
+            cache_keys.insert(0, (CAPTIONS_MODEL_NAME, {}))
+        for model_name, params in cache_keys:
+            cached = get_transcript_cache().get(video_id, model_name, params)
+            if cached and cached.get('text'):
+                self.last_transcript_details = {
+                    'video_id': video_id,
+                    'segments': cached.get('segments', []),
+                    'model_name': cached.get('model_name'),
+                    'source': cached.get('metadata', {}).get('source', 'asr'),
+                    'length': cached.get('metadata', {}).get('length'),
+                    'cache_key': (model_name, params),
+                    'cache_hit': True
+                }
+                update_progress(f"♻️ Cache hit: reusing stored transcript for {video_id} ({cached['model_name']})")
+                return True, f"Loaded cached transcript ({len(cached['text'])} characters)", cached['text']
+        return None
+
+    def transcript_from_captions(self, yt, update_progress=print) -> Optional[Tuple[bool, str, str]]:
+        """Return a transcript result built from usable caption tracks, or None to fall back to ASR"""
+        update_progress("📝 Checking for caption tracks...")
+        caption_result = self._transcript_from_captions(yt)
+        if not caption_result:
+            update_progress("ℹ️ No usable captions - falling back to speech recognition")
+            return None
+        
+        transcript, segments, source, caption_code = caption_result
+        self.last_transcript_details = {
+            'video_id': yt.video_id,
+            'segments': segments,
+            'model_name': CAPTIONS_MODEL_NAME,
+            'source': source,
+            'caption_code': caption_code,
+            'cache_hit': False
+        }
+        try:
+            get_transcript_cache().put(
+                yt.video_id, CAPTIONS_MODEL_NAME, {}, transcript, segments=segments,
+                metadata={'title': yt.title, 'length': yt.length, 'source': source, 'caption_code': caption_code}
+            )
+        except Exception as cache_error:
+            print(f"Warning: Could not cache transcript: {cache_error}")
+        update_progress(f"✅ Using {source.replace('_', ' ')} ({caption_code}) - ASR skipped")
+        return True, f"Loaded {len(transcript)} characters from {source.replace('_', ' ')}", transcript
+
+    def download_audio(self, yt, update_progress=print) -> Tuple[bool, str, Optional[str]]:
+        """
+        Download the video's audio track to a temporary file
+        
+        Returns:
+            (success, message, temp_file_path) - the caller owns and removes the file
+        """
+        # Check video length (limit to reasonable duration)
+        if yt.length and yt.length > 7200:  # 2 hour limit
+            return False, "Video is too long (max 2 hours supported)", None
+            
+        update_progress(f"📹 Video: {yt.title} ({yt.length//60}:{yt.length%60:02d})")
+        
+        audio_stream = self._select_audio_stream(yt)
+        if not audio_stream:
+            return False, "No suitable audio stream found", None
+        update_progress(f"📥 Downloading audio stream ({audio_stream.abr or 'unknown bitrate'})...")
+        
+        # Stable name per stream so a failed download resumes from its .part file
+        downloader = get_audio_downloader()
+        temp_file = downloader.download_path(f"{yt.video_id}.{audio_stream.itag}.{audio_stream.subtype or 'mp4'}")
+        
+        try:
+            stats = downloader.download(audio_stream.url, temp_file, audio_stream.filesize)
+            resumed = f", {stats['resumed_bytes'] / 1e6:.1f} MB resumed" if stats['resumed_bytes'] else ""
+            update_progress(f"⚡ {stats['bytes'] / 1e6:.1f} MB at {stats['mbps']:.1f} Mbit/s "
+                            f"over {stats['connections']} connections{resumed}")
+        except Exception as ranged_error:
+            print(f"Warning: Ranged download failed, retrying with a single connection: {ranged_error}")
+            try:
+                audio_stream.download(output_path=os.path.dirname(temp_file), filename=os.path.basename(temp_file))
+            except Exception as download_error:
+                self._remove_file(temp_file)
+                return False, f"Audio download failed: {str(download_error)}", None
+        
+        # Verify file was downloaded
+        if not os.path.exists(temp_file) or os.path.getsize(temp_file) == 0:
+            self._remove_file(temp_file)
+            return False, "Downloaded file is empty or corrupted", None
+        
+        update_progress("✅ Audio downloaded successfully")
+        return True, "Audio downloaded", temp_file
+
+    def _audio_source(self, yt) -> Optional[str]:
+        """What ffmpeg should read: a LocalMedia path or the selected stream's URL"""
+        if isinstance(yt, LocalMedia):
+            return yt.path
+        audio_stream = self._select_audio_stream(yt)
+        return audio_stream.url if audio_stream else None
+
+    @staticmethod
+    def _describe_media(yt) -> str:
+        kind = "File" if isinstance(yt, LocalMedia) else "Video"
+        duration = f" ({yt.length//60}:{yt.length%60:02d})" if yt.length else ""
+        return f"{kind}: {yt.title}{duration}"
+
+    @staticmethod
+    def _select_audio_stream(yt):
+        """Lowest audio bitrate that is adequate for ASR (it resamples to 16 kHz mono anyway), or None"""
+        return select_asr_stream(yt)
+
+    def decode_audio(self, yt, update_progress=print) -> Tuple[bool, str, Optional[object]]:
+        """
+        Decode the best audio stream directly from its URL (or a LocalMedia file) into 16 kHz mono float32
+        
+        Returns:
+            (success, message, samples) - long videos come back memory-mapped;
+            pass them to release_audio when done
+        """
+        source = self._audio_source(yt)
+        if not source:
+            return False, "No suitable audio stream found", None
+        
+        memmap_path = None
+        if yt.length and yt.length >= AUDIO_MEMMAP_MIN_SECONDS:
+            os.makedirs(AUDIO_BUFFER_DIR, exist_ok=True)
+            memmap_path = os.path.join(AUDIO_BUFFER_DIR, f"{yt.video_id}.{threading.get_ident()}.f32")
+        
+        update_progress(f"📹 {self._describe_media(yt)}")
+        update_progress("📥 Decoding audio stream...")
+        try:
+            audio = decode_audio(source, SAMPLING_RATE, memmap_path)
+        except Exception as e:
+            return False, f"Direct audio decode failed: {str(e)}", None
+        
+        update_progress(f"✅ Audio decoded ({len(audio) / SAMPLING_RATE / 60:.1f} min{', memory-mapped' if memmap_path else ''})")
+        return True, "Audio decoded", audio
+
+    def transcribe_audio_file(self, yt, audio, update_progress=print) -> Tuple[bool, str, Optional[str]]:
+        """
+        Run ASR and cache the result
+        
+        audio is a file path (left in place) or a 16 kHz float32 array from decode_audio
+        """
+        # A re-upload of audio we already transcribed needs no ASR at all
+        fingerprint = self._fingerprint(audio)
+        if fingerprint is not None:
+            reused = self.transcript_from_fingerprint(yt, fingerprint, update_progress)
+            if reused:
+                return reused
+        
+        # Step 3: Initialize transcription model
+        if self.asr_profile == "auto":
+            self._apply_profile(select_asr_profile(yt.length))
+        parallel_workers = self._parallel_workers(len(audio) / SAMPLING_RATE if not isinstance(audio, str) else yt.length)
+        if not parallel_workers:
+            update_progress(f"🤖 Loading transcription model ({self.profile_name}: {self.model_name}{', int8' if self.quantize else ''})...")
+            if not self._initialize_model():
+                return False, "Failed to initialize transcription model", None
+        
+        # Step 4: Transcribe with better parameters
+        update_progress("💬 Transcribing audio... (this may take several minutes)")
+        
+        try:
+            vad_stats = None
+            parallel_result = self._transcribe_parallel(audio, parallel_workers, 0.0, update_progress)
+            if parallel_result:
+                transcript, segments = parallel_result
+            elif parallel_workers and not self._initialize_model():
+                return False, "Failed to initialize transcription model", None
+            elif self.use_vad:
+                vad_result = self._transcribe_speech_regions(audio, update_progress)
+                if vad_result:
+                    transcript, segments, vad_stats = vad_result
+            
+            if vad_stats is None and not parallel_result:
+                result = self._run_pipeline(self._pipeline_input(audio))
+                transcript = result["text"].strip() if isinstance(result, dict) else str(result).strip()
+                segments = self._extract_segments(result)
+            update_progress("✅ Transcription completed!")
+            
+            result = self._store_asr_result(yt, transcript, segments, vad_stats)
+            if result[0]:
+                self._remember_fingerprint(yt, fingerprint)
+            return result
+            
+        except Exception as transcription_error:
+            return False, f"Transcription failed: {str(transcription_error)}", None
+
+    def _store_asr_result(self, yt, transcript: str, segments: list, vad_stats: Optional[dict]) -> Tuple[bool, str, Optional[str]]:
+        """Record details of a finished ASR run and cache it"""
+        if not transcript:
+            return False, "Transcription produced empty result", None
+        
+        self.last_transcript_details = {
+            'video_id': yt.video_id,
+            'segments': segments,
+            'model_name': self.model_name,
+            'source': 'asr',
+            'asr_profile': self.profile_name,
+            'vad': vad_stats,
+            'cache_hit': False
+        }
+        try:
+            get_transcript_cache().put(
+                yt.video_id, self.model_name, self._transcript_params(vad_stats is not None), transcript,
+                segments=segments, metadata={'title': yt.title, 'length': yt.length, 'source': 'asr', 'asr_profile': self.profile_name, 'vad': vad_stats}
+            )
+        except Exception as cache_error:
+            print(f"Warning: Could not cache transcript: {cache_error}")
+        
+        return True, f"Successfully transcribed {len(transcript)} characters", transcript
+
+    def transcribe_with_checkpoints(self, yt, update_progress=print) -> Tuple[bool, str, Optional[str]]:
+        """
+        Transcribe in ~5 minute chunks, persisting the audio and each finished chunk
+        
+        The job directory is keyed by video id; a retry after a crash skips the
+        download and every chunk already done. It is deleted once the transcript
+        is cached (or by garbage collection after the retention window).
+        """
+        job = self._open_checkpoint_job(yt)
+        try:
+            # Another run of this video may have finished while we waited for its job
+            cached = self._cached_transcript(yt.video_id, update_progress=update_progress)
+            if cached:
+                return cached
+            return self._run_checkpoint_job(yt, job, update_progress)
+        finally:
+            job.close()
+
+    def _run_checkpoint_job(self, yt, job, update_progress=print) -> Tuple[bool, str, Optional[str]]:
+        if job.has_audio():
+            update_progress("♻️ Resuming from saved audio")
+        else:
+            success, message = self._decode_into_job(yt, job, update_progress)
+            if not success:
+                return False, message, None
+        
+        audio = job.load_audio()
+        fingerprint = self._fingerprint(audio)
+        close_audio(audio)
+        if fingerprint is not None:
+            reused = self.transcript_from_fingerprint(yt, fingerprint, update_progress)
+            if reused:
+                job.finish()
+                return reused
+        
+        parallel_workers = self._parallel_workers(CHECKPOINT_CHUNK_SECONDS)
+        if not parallel_workers:
+            update_progress(f"🤖 Loading transcription model ({self.profile_name}: {self.model_name}{', int8' if self.quantize else ''})...")
+            if not self._initialize_model():
+                return False, "Failed to initialize transcription model", None
+            self._restart_for_loaded_model(job, update_progress)
+        
+        audio = job.load_audio()
+        try:
+            spans = job.spans or job.set_spans(split_at_quiet_points(audio, CHECKPOINT_CHUNK_SECONDS, SAMPLING_RATE))
+            done = job.completed_chunks()
+            if done:
+                update_progress(f"♻️ {len(done)} of {len(spans)} chunks already transcribed - resuming")
+            
+            # Repeats only when the model falls back mid-job and earlier chunks must be redone
+            while len(done) < len(spans):
+                for index, (start, end) in enumerate(spans):
+                    if index in done:
+                        continue
+                    update_progress(f"💬 Transcribing chunk {index + 1} of {len(spans)}...")
+                    text, segments, vad_stats = self._transcribe_span(audio[start:end], start / SAMPLING_RATE,
+                                                                      update_progress, parallel_workers)
+                    if self._restart_for_loaded_model(job, update_progress):
+                        done = {}
+                    done[index] = {
+                        'text': text,
+                        'segments': segments,
+                        'skipped_seconds': vad_stats['skipped_seconds'] if vad_stats else 0.0,
+                        'asr_seconds': vad_stats['asr_seconds'] if vad_stats else None
+                    }
+                    job.record_chunk(index, done[index])
+        except Exception as transcription_error:
+            return False, f"Transcription failed (progress saved, retry to resume): {str(transcription_error)}", None
+        finally:
+            close_audio(audio)
+        
+        update_progress("✅ Transcription completed!")
+        ordered = [done[index] for index in range(len(spans))]
+        transcript = " ".join(chunk['text'] for chunk in ordered if chunk['text'])
+        segments = [segment for chunk in ordered for segment in chunk['segments']]
+        skipped_seconds = sum(chunk['skipped_seconds'] for chunk in ordered)
+        vad_stats = None
+        # asr_seconds is only recorded for chunks that went through the speech-region pass
+        if any(chunk['asr_seconds'] is not None for chunk in ordered):
+            audio_seconds = spans[-1][1] / SAMPLING_RATE if spans else 0.0
+            vad_stats = {
+                'audio_seconds': audio_seconds,
+                'skipped_seconds': skipped_seconds,
+                'skipped_fraction': skipped_seconds / audio_seconds if audio_seconds else 0.0,
+                'chunks': len(spans)
+            }
+        
+        result = self._store_asr_result(yt, transcript, segments, vad_stats)
+        if result[0]:
+            self._remember_fingerprint(yt, fingerprint)
+            job.finish()
+        return result
+
+    def _open_checkpoint_job(self, yt):
+        """Open (or resume) the checkpoint job of a video under the model its length calls for"""
+        if self.asr_profile == "auto":
+            self._apply_profile(select_asr_profile(yt.length))
+        # A copy, so a later model fallback can't silently rewrite the job's parameters
+        return get_checkpoint_store().open_job(yt.video_id, self.model_name, dict(self.generation_params))
+
+    def _restart_for_loaded_model(self, job, update_progress=print) -> bool:
+        """
+        Restart the job if the model that actually loaded differs from its model
+        
+        _initialize_model may fall back to a smaller model after the job was
+        opened; its chunks must not be mixed with the other model's. Restarting
+        discards them but keeps the saved audio and chunk boundaries.
+        
+        Returns:
+            True if the job's finished chunks were discarded
+        """
+        if (job.model_name, job.params) == (self.model_name, self.generation_params):
+            return False
+        update_progress(f"ℹ️ Transcribing with {self.model_name} instead of {job.model_name} - "
+                        "chunks from the other model are redone")
+        job.restart(self.model_name, dict(self.generation_params))
+        return True
+
+    def prepare_checkpointed_audio(self, yt, update_progress=print) -> Tuple[bool, str]:
+        """
+        Decode a long video's audio into its checkpoint job ahead of ASR
+        
+        transcribe_with_checkpoints then starts straight at transcription, so
+        a pipeline can decode the next video while this one is transcribed.
+        """
+        job = self._open_checkpoint_job(yt)
+        try:
+            if job.has_audio():
+                return True, "Audio already saved"
+            return self._decode_into_job(yt, job, update_progress)
+        finally:
+            job.close()
+
+    def _fingerprint(self, audio) -> Optional[np.ndarray]:
+        """Landmark fingerprint of decoded audio (None for file paths or when disabled)"""
+        if not self.use_fingerprints or isinstance(audio, str):
+            return None
+        try:
+            return compute_fingerprint(audio)
+        except Exception as e:
+            print(f"Warning: Could not fingerprint audio: {e}")
+            return None
+
+    def _remember_fingerprint(self, yt, fingerprint: Optional[np.ndarray]):
+        if fingerprint is None or len(fingerprint) == 0:
+            return
+        try:
+            get_fingerprint_index().add(yt.video_id, fingerprint)
+        except Exception as e:
+            print(f"Warning: Could not store audio fingerprint: {e}")
+
+    def transcript_from_fingerprint(self, yt, fingerprint: np.ndarray, update_progress=print) -> Optional[Tuple[bool, str, str]]:
+        """
+        Reuse the cached transcript of an earlier recording with the same audio
+        
+        The transcript is also cached under this video's id, so the next request
+        for it is a plain cache hit. Returns None when nothing matches.
+        """
+        try:
+            match = get_fingerprint_index().match(fingerprint, exclude_video_id=yt.video_id)
+        except Exception as e:
+            print(f"Warning: Audio fingerprint lookup failed: {e}")
+            return None
+        if not match:
+            return None
+        
+        original_id, match_stats = match
+        cached = self._cached_transcript(original_id, include_captions=True, update_progress=lambda m: None)
+        if not cached:
+            return None
+        
+        transcript = cached[2]
+        details = self.last_transcript_details
+        model_name, params = details['cache_key']
+        try:
+            get_transcript_cache().put(
+                yt.video_id, model_name, params, transcript, segments=details['segments'],
+                metadata={'title': yt.title, 'length': yt.length, 'source': details['source'], 'duplicate_of': original_id}
+            )
+        except Exception as cache_error:
+            print(f"Warning: Could not cache transcript: {cache_error}")
+        details.update(video_id=yt.video_id, duplicate_of=original_id, fingerprint_match=match_stats)
+        
+        update_progress(f"🔁 Same audio as {original_id} ({match_stats['matches']} fingerprint matches) - reusing its transcript")
+        return True, f"Reused transcript of {original_id} ({len(transcript)} characters)", transcript
+
+    def _decode_into_job(self, yt, job, update_progress=print) -> Tuple[bool, str]:
+        """Decode the audio into the job directory, via a temporary download if direct decoding fails"""
+        source = self._audio_source(yt)
+        if not source:
+            return False, "No suitable audio stream found"
+        
+        update_progress(f"📹 {self._describe_media(yt)}")
+        update_progress("📥 Decoding audio stream...")
+        try:
+            close_audio(decode_audio(source, SAMPLING_RATE, job.partial_audio_path))
+        except Exception as decode_error:
+            if isinstance(yt, LocalMedia):
+                return False, f"Audio decode failed: {str(decode_error)}"
+            update_progress(f"ℹ️ Direct audio decode failed ({decode_error}) - downloading to a temporary file instead")
+            success, message, temp_file = self.download_audio(yt, update_progress)
+            if not success:
+                return False, message
+            try:
+                close_audio(decode_audio(temp_file, SAMPLING_RATE, job.partial_audio_path))
+            except Exception as e:
+                return False, f"Audio decode failed: {str(e)}"
+            finally:
+                self._remove_file(temp_file)
+        
+        job.commit_audio()
+        update_progress("✅ Audio saved for resumable transcription")
+        return True, "Audio decoded"
+
+    def _transcribe_span(self, samples, offset: float, update_progress=print,
+                         parallel_workers: int = 0) -> Tuple[str, list, Optional[dict]]:
+        """Transcribe one chunk of samples, with timestamps shifted by offset seconds"""
+        parallel_result = self._transcribe_parallel(samples, parallel_workers, offset, update_progress)
+        if parallel_result:
+            return parallel_result[0], parallel_result[1], None
+        if self.transcriber is None and not self._initialize_model():
+            raise RuntimeError("Failed to initialize transcription model")
+        
+        if self.use_vad:
+            vad_result = self._transcribe_speech_regions(samples, update_progress, offset=offset)
+            if vad_result:
+                return vad_result
+        
+        result = self._run_pipeline(self._pipeline_input(samples))
+        text = result["text"].strip() if isinstance(result, dict) else str(result).strip()
+        segments = self._extract_segments(result)
+        for segment in segments:
+            segment['start'] = offset + segment['start'] if segment['start'] is not None else offset
+            segment['end'] = offset + segment['end'] if segment['end'] is not None else None
+        return text, segments, None
+
+    def stream_transcript(self, video_url: str, progress_callback=None, window_s: float = 30.0) -> Iterator[Dict]:
+        """
+        Streaming mode of generate_transcript: yield transcript pieces as they finish
+        
+        Audio is decoded straight from the stream URL in ~window_s windows and each
+        window is transcribed as soon as it is available, so the first piece arrives
+        after one window instead of after the whole video. Cached and caption
+        transcripts are yielded as window-sized groups of their segments.
+        
+        Yields:
+            {'index', 'start', 'end', 'text', 'segments'} dictionaries. Failures raise
+            RuntimeError; the full transcript is cached and last_transcript_details
+            filled once the generator is exhausted.
+        """
+        def update_progress(message: str):
+            if progress_callback:
+                progress_callback(message)
+            else:
+                print(message)
+        
+        cached = self.get_cached_transcript(video_url, update_progress)
+        if cached:
+            yield from self._group_segments(self.last_transcript_details.get('segments'), cached[2], window_s)
+            return
+        
+        update_progress("🔍 Validating video URL...")
+        yt = self._get_youtube(video_url)
+        
+        if self.prefer_captions:
+            captions = self.transcript_from_captions(yt, update_progress)
+            if captions:
+                yield from self._group_segments(self.last_transcript_details.get('segments'), captions[2], window_s)
+                return
+        
+        if yt.length and yt.length > 7200:  # 2 hour limit
+            raise RuntimeError("Video is too long (max 2 hours supported)")
+        
+        if self.asr_profile == "auto":
+            self._apply_profile(select_asr_profile(yt.length))
+        update_progress(f"🤖 Loading transcription model ({self.profile_name}: {self.model_name}{', int8' if self.quantize else ''})...")
+        if not self._initialize_model():
+            raise RuntimeError("Failed to initialize transcription model")
+        
+        texts, segments = [], []
+        skipped_seconds = 0.0
+        index = 0
+        for start, samples in self._stream_audio_windows(yt, window_s, update_progress):
+            end = start + len(samples) / SAMPLING_RATE
+            # Window-level VAD: silent windows never reach Whisper
+            if self.use_vad and is_silent(samples, SAMPLING_RATE):
+                skipped_seconds += end - start
+                continue
+            
+            result = self._run_pipeline({'raw': samples, 'sampling_rate': SAMPLING_RATE})
+            text = result["text"].strip() if isinstance(result, dict) else str(result).strip()
+            if not text:
+                continue
+            
+            window_segments = self._extract_segments(result) or [{'start': 0.0, 'end': end - start, 'text': text}]
+            for segment in window_segments:
+                segment['start'] = start + segment['start'] if segment['start'] is not None else start
+                segment['end'] = start + segment['end'] if segment['end'] is not None else end
+            
+            texts.append(text)
+            segments.extend(window_segments)
+            update_progress(f"💬 Transcribed up to {int(end)//60}:{int(end)%60:02d}")
+            yield {'index': index, 'start': start, 'end': end, 'text': text, 'segments': window_segments}
+            index += 1
+        
+        transcript = " ".join(texts)
+        if not transcript:
+            raise RuntimeError("Transcription produced empty result")
+        
+        self.last_transcript_details = {
+            'video_id': yt.video_id,
+            'segments': segments,
+            'model_name': self.model_name,
+            'source': 'asr',
+            'asr_profile': self.profile_name,
+            'vad': {'skipped_seconds': skipped_seconds} if self.use_vad else None,
+            'streamed': True,
+            'cache_hit': False
+        }
+        try:
+            get_transcript_cache().put(
+                yt.video_id, self.model_name, self._transcript_params(False), transcript, segments=segments,
+                metadata={'title': yt.title, 'length': yt.length, 'source': 'asr', 'asr_profile': self.profile_name, 'streamed': True}
+            )
+        except Exception as cache_error:
+            print(f"Warning: Could not cache transcript: {cache_error}")
+        update_progress("✅ Transcription completed!")
+
+    def _stream_audio_windows(self, yt, window_s: float, update_progress=print) -> Iterator[Tuple[float, object]]:
+        """Decode windows from the stream URL, falling back to a downloaded file if ffmpeg can't read it"""
+        audio_stream = self._select_audio_stream(yt)
+        if not audio_stream:
+            raise RuntimeError("No suitable audio stream found")
+        
+        produced = False
+        try:
+            update_progress("📡 Streaming audio...")
+            for window in iter_audio_windows(audio_stream.url, window_s):
+                produced = True
+                yield window
+            return
+        except RuntimeError as stream_error:
+            if produced:
+                raise
+            print(f"Warning: Could not stream audio directly ({stream_error}); downloading instead")
+        
+        success, message, temp_file = self.download_audio(yt, update_progress)
+        if not success:
+            raise RuntimeError(message)
+        try:
+            yield from iter_audio_windows(temp_file, window_s)
+        finally:
+            self._remove_file(temp_file)
+
+    @staticmethod
+    def _group_segments(segments: list, text: str, window_s: float) -> Iterator[Dict]:
+        """Regroup stored segments into window-sized pieces (one piece if there are no timestamps)"""
+        if not segments or any(segment.get('start') is None for segment in segments):
+            yield {'index': 0, 'start': 0.0, 'end': None, 'text': text, 'segments': segments or []}
+            return
+        
+        group = []
+        index = 0
+        for segment in segments:
+            group.append(segment)
+            if segment['end'] is not None and segment['end'] - group[0]['start'] >= window_s:
+                yield {'index': index, 'start': group[0]['start'], 'end': segment['end'],
+                       'text': " ".join(s['text'] for s in group), 'segments': group}
+                group = []
+                index += 1
+        if group:
+            yield {'index': index, 'start': group[0]['start'], 'end': group[-1]['end'],
+                   'text': " ".join(s['text'] for s in group), 'segments': group}
+
+    def _parallel_workers(self, duration_seconds: Optional[float]) -> int:
+        """Worker processes to use for this much audio, or 0 to transcribe in-process"""
+        if self.asr_workers <= 1 or self.device != -1 or not duration_seconds:
+            return 0
+        workers = min(self.asr_workers, int(duration_seconds // PARALLEL_MIN_SECONDS_PER_WORKER))
+        return workers if workers > 1 else 0
+
+    def _transcribe_parallel(self, audio, workers: int, offset: float = 0.0,
+                             update_progress=print) -> Optional[Tuple[str, list]]:
+        """
+        Transcribe across worker processes (CPU only)
+        
+        Returns:
+            (transcript, segments), or None to transcribe in-process instead
+        """
+        if not workers:
+            return None
+        try:
+            if isinstance(audio, str):
+                audio = load_audio(audio)
+            update_progress(f"🧵 Transcribing on {workers} worker processes...")
+            start_time = time.perf_counter()
+            transcript, segments = get_parallel_asr(workers).transcribe(
+                audio, self.model_name, self.quantize, self.generation_params, offset=offset
+            )
+            elapsed = time.perf_counter() - start_time
+            audio_seconds = len(audio) / SAMPLING_RATE
+            update_progress(f"⏱️ {audio_seconds:.0f}s of audio in {elapsed:.0f}s on {workers} workers "
+                            f"(RTF {elapsed / audio_seconds if audio_seconds else 0:.2f})")
+            return transcript, segments
+        except Exception as e:
+            print(f"Warning: Parallel transcription failed, continuing in-process: {e}")
+            update_progress("ℹ️ Parallel transcription failed - continuing in a single process")
+            return None
+
+    @staticmethod
+    def _pipeline_input(audio):
+        """Paths go to the pipeline as-is; decoded samples skip its own ffmpeg pass"""
+        if isinstance(audio, str):
+            return audio
+        return {'raw': audio, 'sampling_rate': SAMPLING_RATE}
+
+    def _run_pipeline(self, audio_input):
+        """Call the ASR pipeline on a file path or {'raw', 'sampling_rate'} dict"""
+        # The pipeline is shared with every other transcriber using this model
+        with get_asr_registry().inference_lock(self.transcriber):
+            # Use optimized parameters for better results
+            return self.transcriber(
+                audio_input,
+                chunk_length_s=self.generation_params['chunk_length_s'],
+                stride_length_s=self.generation_params['stride_length_s'],
+                return_timestamps=True,  # Segment times are kept in the transcript cache
+                generate_kwargs={
+                    "task": self.generation_params['task'],
+                    "language": self.generation_params['language']
+                }
+            )
+
+    def _transcribe_speech_regions(self, audio, update_progress=print, offset: float = 0.0) -> Optional[Tuple[str, list, dict]]:
+        """
+        VAD pre-pass: transcribe only speech regions and shift their timestamps back
+        (plus offset seconds when audio is a chunk of a longer recording)
+        
+        Returns:
+            (transcript, segments, vad_stats), or None to transcribe the whole file
+        """
+        if isinstance(audio, str):
+            try:
+                audio = load_audio(audio)
+            except RuntimeError as e:
+                print(f"Warning: Skipping voice activity detection: {e}")
+                return None
+        
+        regions = detect_speech_regions(audio, SAMPLING_RATE)
+        stats = speech_coverage(regions, len(audio) / SAMPLING_RATE)
+        if not regions or stats['skipped_fraction'] < MIN_VAD_SKIP_FRACTION:
+            return None
+        
+        update_progress(f"🔇 Skipping {stats['skipped_fraction']:.0%} of the audio as silence ({stats['regions']} speech regions)")
+        
+        texts, segments = [], []
+        start_time = time.perf_counter()
+        for region_start, region_end in regions:
+            clip = audio[int(region_start * SAMPLING_RATE):int(region_end * SAMPLING_RATE)]
+            result = self._run_pipeline({'raw': clip, 'sampling_rate': SAMPLING_RATE})
+            text = result["text"].strip() if isinstance(result, dict) else str(result).strip()
+            if text:
+                texts.append(text)
+            for segment in self._extract_segments(result):
+                segment['start'] = offset + region_start + (segment['start'] if segment['start'] is not None else 0.0)
+                segment['end'] = offset + (region_start + segment['end'] if segment['end'] is not None else region_end)
+                segments.append(segment)
+        
+        # Wall-clock saved, estimated at the speed ASR achieved on the speech we kept
+        stats['asr_seconds'] = time.perf_counter() - start_time
+        stats['estimated_seconds_saved'] = (
+            stats['asr_seconds'] / stats['speech_seconds'] * stats['skipped_seconds'] if stats['speech_seconds'] else 0.0
+        )
+        update_progress(f"⏱️ VAD saved about {stats['estimated_seconds_saved']:.0f}s of transcription")
+        return " ".join(texts), segments, stats
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _transcript_from_captions(self, yt) -> Optional[Tuple[str, list, str, str]]:
+        """
+        Build a transcript from YouTube captions when a usable track exists
+        
+        Prefers a manual English track, then an auto-generated English track
+        that passes the density / tag heuristic.
+        
+        Returns:
+            (transcript, segments, source, caption_code) or None to fall back to ASR
+        """
+        try:
+            captions = list(yt.captions)
+        except Exception as e:
+            print(f"Could not list caption tracks: {e}")
+            return None
+        
+        language = self.generation_params.get('language', 'en')
+        manual = [c for c in captions if c.code == language or c.code.startswith(f"{language}-")]
+        auto = [c for c in captions if c.code == f"a.{language}"]
+        
+        for caption, source in [(c, 'manual_captions') for c in manual] + [(c, 'auto_captions') for c in auto]:
+            try:
+                segments = self._parse_caption_segments(caption)
+            except Exception as e:
+                print(f"Could not fetch caption track {caption.code}: {e}")
+                continue
+            
+            if not segments:
+                continue
+            if source == 'auto_captions' and not self._auto_captions_usable(segments, yt.length):
+                print(f"Auto captions {caption.code} failed quality check")
+                continue
+            
+            transcript = " ".join(s['text'] for s in segments if not self._is_caption_tag(s['text']))
+            if transcript.strip():
+                return transcript.strip(), segments, source, caption.code
+        
+        return None
+
+    @staticmethod
+    def _parse_caption_segments(caption) -> list:
+        """Caption cues as {'start', 'end', 'text'} segments (seconds)"""
+        segments = []
+        for event in caption.json_captions.get('events', []):
+            text = "".join(seg.get('utf8', '') for seg in event.get('segs') or []).replace("\n", " ").strip()
+            if not text:
+                continue
+            start = event.get('tStartMs', 0) / 1000.0
+            segments.append({
+                'start': start,
+                'end': start + event.get('dDurationMs', 0) / 1000.0,
+                'text': text
+            })
+        return segments
+
+    @staticmethod
+    def _is_caption_tag(text: str) -> bool:
+        return bool(re.fullmatch(r'[\[\(][^\]\)]*[\]\)]', text.strip()))
+
+    def _auto_captions_usable(self, segments: list, length_seconds: Optional[int]) -> bool:
+        """Quality heuristic for auto-generated tracks: enough words and not mostly [Music]"""
+        tags = sum(1 for s in segments if self._is_caption_tag(s['text']))
+        if tags / len(segments) > MAX_AUTO_CAPTION_TAG_RATIO:
+            return False
+        
+        words = sum(len(s['text'].split()) for s in segments if not self._is_caption_tag(s['text']))
+        minutes = (length_seconds or segments[-1]['end']) / 60.0
+        return minutes <= 0 or words / minutes >= MIN_AUTO_CAPTION_WPM
+
+    @staticmethod
+    def _extract_segments(result) -> list:
+        """Timestamped segments from a pipeline result ({'start', 'end', 'text'} in seconds)"""
+        if not isinstance(result, dict):
+            return []
+        segments = []
+        for chunk in result.get("chunks") or []:
+            start, end = chunk.get("timestamp") or (None, None)
+            text = (chunk.get("text") or "").strip()
+            if text:
+                segments.append({'start': start, 'end': end, 'text': text})
+        return segments
+
+    def format_transcript_for_processing(self, transcript: str, video_info: dict = None, video_url: str = None) -> str:
+        """Format transcript with video metadata for better processing
+        
+        Pass video_url instead of video_info to reuse the cached video object.
+        """
+        if video_info is None:
+            video_info = self._build_video_info(self._get_youtube(video_url)) if video_url else {}
+        if video_info.get('source_path'):
+            return f"""Local Media Transcript
+======================
+File: {os.path.basename(video_info['source_path'])}
+Title: {video_info.get('title', 'Unknown')}
+Duration: {video_info.get('length', 0)//60}:{video_info.get('length', 0)%60:02d}
+Processed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+Transcript Content:
+==================
+{transcript}
+""".strip()
         formatted_text = f"""YouTube Video Transcript
 ========================
 Video Title: {video_info.get('title', 'Unknown')}
@@ -227,15 +1141,63 @@ Transcript Content:
 """
         return formatted_text.strip()
 
-    def _clean_youtube_url(self, url: str) -> str:
-        """Clean YouTube URL - improved version"""
-        import re
+    def get_passages(self, transcript: str = None, segments: list = None,
+                     target_seconds: float = PASSAGE_TARGET_SECONDS) -> list:
+        """
+        Group timestamped segments into passages for passage-level storage
         
-        if not url:
-            return url
+        Args:
+            transcript: Used only when there are no timestamped segments
+            segments: Defaults to the segments of the last generate_transcript call
+            target_seconds: Preferred passage length; passages end at a sentence boundary after it
         
-        # Remove any extra whitespace
-        url = url.strip()
+        Returns:
+            List of {'passage_index', 'start', 'end', 'text'} dictionaries
+        """
+        if segments is None:
+            segments = self.last_transcript_details.get('segments') or []
+        
+        if not segments or any(segment.get('start') is None for segment in segments):
+            return self._passages_from_text(transcript or " ".join(s.get('text', '') for s in segments))
+        
+        passages, current = [], []
+        for segment in segments:
+            current.append(segment)
+            duration = (segment.get('end') or segment['start']) - current[0]['start']
+            chars = sum(len(s['text']) + 1 for s in current)
+            sentence_end = segment['text'].rstrip().endswith(('.', '!', '?'))
+            if (duration >= target_seconds and sentence_end) or duration >= PASSAGE_MAX_SECONDS or chars >= PASSAGE_MAX_CHARS:
+                passages.append(current)
+                current = []
+        if current:
+            passages.append(current)
+        
+        return [{
+            'passage_index': index,
+            'start': group[0]['start'],
+            'end': group[-1].get('end') or group[-1]['start'],
+            'text': " ".join(s['text'].strip() for s in group)
+        } for index, group in enumerate(passages)]
+
+    @staticmethod
+    def _passages_from_text(transcript: str) -> list:
+        """Sentence-boundary passages without timestamps"""
+        sentences = re.split(r'(?<=[.!?])\s+', (transcript or '').strip())
+        passages, current = [], ""
+        for sentence in sentences:
+            if current and len(current) + len(sentence) + 1 > PASSAGE_MAX_CHARS:
+                passages.append(current)
+                current = ""
+            current = f"{current} {sentence}".strip()
+        if current:
+            passages.append(current)
+        return [{'passage_index': index, 'start': None, 'end': None, 'text': text}
+                for index, text in enumerate(passages)]
+
+    def _extract_video_id(self, url: str) -> Optional[str]:
+        """Extract the 11-character video id from any supported YouTube URL form"""
+        if not url:
+            return None
         
         # Extract video ID using comprehensive regex
         patterns = [
@@ -245,14 +1207,63 @@ Transcript Content:
         ]
         
         for pattern in patterns:
-            match = re.search(pattern, url)
+            match = re.search(pattern, url.strip())
             if match:
-                video_id = match.group(1)
-                return f"https://www.youtube.com/watch?v={video_id}"
+                return match.group(1)
+        return None
+
+    def _clean_youtube_url(self, url: str) -> str:
+        """Clean YouTube URL - improved version"""
+        if not url:
+            return url
+        
+        # Remove any extra whitespace
+        url = url.strip()
+        
+        video_id = self._extract_video_id(url)
+        if video_id:
+            return f"https://www.youtube.com/watch?v={video_id}"
         
         # If no pattern matches, return original URL
         return url
 
+    def _get_youtube(self, video_url: str):
+        """Resolve a YouTube object once per video id and reuse it until the cache TTL expires"""
+        cleaned_url = self._clean_youtube_url(video_url)
+        video_id = self._extract_video_id(cleaned_url)
+        
+        if video_id:
+            yt = video_metadata_cache.get(video_id)
+            if yt is not None:
+                return yt
+        
+        # Use pytubefix with better configuration
+        yt = YouTube(
+            cleaned_url,
+            use_oauth=False,
+            allow_oauth_cache=True
+        )
+        
+        # Force connection to validate
+        yt.check_availability()
+        
+        if video_id:
+            video_metadata_cache.put(video_id, yt)
+        return yt
+
+    def _build_video_info(self, yt) -> dict:
+        """Basic metadata dictionary from a resolved YouTube object"""
+        return {
+            'video_id': yt.video_id,
+            'title': yt.title,
+            'author': yt.author,
+            'length': yt.length,
+            'views': yt.views,
+            'description': yt.description[:200] + "..." if yt.description and len(yt.description) > 200 else (yt.description or ""),
+            'thumbnail_url': yt.thumbnail_url,
+            'publish_date': yt.publish_date.isoformat() if yt.publish_date else None
+        }
+
     def validate_youtube_url(self, url: str) -> Tuple[bool, str]:
         """Validate YouTube URL with improved error handling"""
         if not url:
@@ -272,9 +1283,8 @@ Transcript Content:
             return False, "URL does not appear to be a valid YouTube URL"
         
         try:
-            # Test with pytubefix
-            yt = YouTube(cleaned_url, use_oauth=False, allow_oauth_cache=True)
-            yt.check_availability()
+            # Test with pytubefix (cached for get_video_info/generate_transcript)
+            yt = self._get_youtube(cleaned_url)
             return True, f"Valid YouTube URL: {yt.title}"
             
         except Exception as e: